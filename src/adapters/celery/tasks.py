@@ -12,10 +12,10 @@ def handle_task_error(task, exc, task_id, args, kwargs, einfo):
 
 
 @celery_app.task(name='process_project', bind=True, max_retries=3, on_failure=handle_task_error)
-def process_project_task(self, project_name: str) -> Dict[str, Any]:
+def process_project_task(self, project_name: str, use_cache: bool = True) -> Dict[str, Any]:
     logger.info(f"Starting process_project task for project: {project_name}")
     try:
-        result = celery_app_state.project_processing_service._process_project(project_name)
+        result = celery_app_state.project_processing_service._process_project(project_name, use_cache)
         logger.info(f"Completed process_project task for project: {project_name}")
         return result
     except Exception as exc:
@@ -24,10 +24,11 @@ def process_project_task(self, project_name: str) -> Dict[str, Any]:
 
 
 @celery_app.task(name='process_project_diagram', bind=True, max_retries=3, on_failure=handle_task_error)
-def process_project_diagram_task(self, project_name: str, diagram_type: str) -> Dict[str, Any]:
+def process_project_diagram_task(self, project_name: str, diagram_type: str, use_cache: bool = True) -> Dict[str, Any]:
     logger.info(f"Starting process_project_diagram task for project: {project_name}, diagram: {diagram_type}")
     try:
-        result = celery_app_state.project_processing_service._process_project_diagram(project_name, diagram_type)
+        result = celery_app_state.project_processing_service._process_project_diagram(project_name, diagram_type,
+                                                                                       use_cache)
         logger.info(f"Completed process_project_diagram task for project: {project_name}, diagram: {diagram_type}")
         return result
     except Exception as exc:
@@ -36,10 +37,10 @@ def process_project_diagram_task(self, project_name: str, diagram_type: str) ->
 
 
 @celery_app.task(name='extract_json', bind=True, max_retries=3, on_failure=handle_task_error)
-def extract_json_task(self, project_name: str, diagram_type: str) -> Dict[str, Any]:
+def extract_json_task(self, project_name: str, diagram_type: str, use_cache: bool = True) -> Dict[str, Any]:
     logger.info(f"Starting extract_json task for project: {project_name}, diagram: {diagram_type}")
     try:
-        result = celery_app_state.project_processing_service._extract_json(project_name, diagram_type)
+        result = celery_app_state.project_processing_service._extract_json(project_name, diagram_type, use_cache)
         logger.info(f"Completed extract_json task for project: {project_name}, diagram: {diagram_type}")
         return result
     except Exception as exc:
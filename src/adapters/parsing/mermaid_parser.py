@@ -0,0 +1,310 @@
+# src/adapters/parsing/mermaid_parser.py
+import logging
+import re
+from typing import Dict, List, Any, Optional, Tuple
+
+logger = logging.getLogger("uvicorn.error")
+
+_FENCE_PATTERN = re.compile(r'```(?:mermaid)?\s*(.*?)```', re.DOTALL)
+_WORD_PATTERN = re.compile(r"[^\W\d_][\w'-]*", re.UNICODE)
+_STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'for', 'from', 'has', 'have', 'in', 'into', 'is', 'it',
+    'its', 'must', 'of', 'on', 'or', 'shall', 'should', 'that', 'the', 'their', 'this', 'to', 'use', 'used', 'using',
+    'with', 'will', 'simple', 'au', 'aux', 'avec', 'ce', 'ces', 'dans', 'de', 'des', 'doit', 'du', 'elle', 'en', 'et',
+    'il', 'la', 'le', 'les', 'leur', 'par', 'pour', 'que', 'qui', 'sa', 'se', 'son', 'sur', 'un', 'une',
+}
+
+# requirementDiagram
+_REQUIREMENT_TYPES = ('requirement', 'functionalRequirement', 'interfaceRequirement', 'performanceRequirement',
+                      'physicalRequirement', 'designConstraint', 'element')
+_BLOCK_START_PATTERN = re.compile(r'^(\w+)\s+"?([^"{]+?)"?\s*\{\s*$')
+_FIELD_PATTERN = re.compile(r'^(\w+)\s*:\s*(.*?)\s*$')
+_REQUIREMENT_RELATION_PATTERNS = (
+    (re.compile(r'^(\S+)\s+-\s*(\w+)\s*->\s*(\S+)$'), False),
+    (re.compile(r'^(\S+)\s*<-\s*(\w+)\s*-\s+(\S+)$'), True),
+    (re.compile(r'^(\S+)\s+(contains|copies|derives|satisfies|verifies|refines|traces)\s+(\S+)$'), False),
+)
+
+# classDiagram
+_CLASS_PATTERN = re.compile(r'^class\s+([\w.-]+)(?:~[^~]*~)?(?:\s*\[\s*"?([^"\]]*)"?\s*\])?\s*(\{)?\s*(\})?\s*$')
+_CLASS_RELATION_PATTERN = re.compile(
+    r'^([\w.-]+)\s*(?:"[^"]*"\s*)?(<\|--|--\|>|\*--|--\*|o--|--o|<\.\.|\.\.>|<--|-->|\.\.\|>|<\|\.\.|--|\.\.)\s*'
+    r'(?:"[^"]*"\s*)?([\w.-]+)\s*(?::\s*(.*))?$')
+_CLASS_ANNOTATION_PATTERN = re.compile(r'^<<\s*(\w+)\s*>>\s*([\w.-]+)?\s*$')
+_NOTE_PATTERN = re.compile(r'^note\s+for\s+([\w.-]+)\s+"(.*)"\s*$')
+# Arrow -> (relationship type, whether the arrow points from right to left)
+_CLASS_ARROWS = {
+    '*--': ('composition', False), '--*': ('composition', True),
+    'o--': ('aggregation', False), '--o': ('aggregation', True),
+    '<|--': ('inheritance', True), '--|>': ('inheritance', False),
+    '..|>': ('realization', False), '<|..': ('realization', True),
+    '-->': ('association', False), '<--': ('association', True),
+    '..>': ('dependency', False), '<..': ('dependency', True),
+    '--': ('link', False), '..': ('link', False),
+}
+
+# flowchart / graph (use case diagrams)
+_NODE_SHAPES = (
+    ('([', '])', 'useCase'), ('((', '))', 'actor'), ('[[', ']]', 'subsystem'), ('[(', ')]', 'database'),
+    ('{{', '}}', 'node'), ('[/', '/]', 'node'), ('[\\', '\\]', 'node'), ('>', ']', 'node'),
+    ('[', ']', 'node'), ('(', ')', 'useCase'), ('{', '}', 'decision'),
+)
+# Node ids may contain dashes, but not the "--", "-." or "->" that start an edge written without spaces
+_IDENTIFIER = r'\w+(?:-(?![-.>])\w+)*'
+_NODE_PATTERN = re.compile(rf'({_IDENTIFIER})\s*(\(\[|\(\(|\[\[|\[\(|\{{\{{|\[/|\[\\|>|\[|\(|\{{)')
+_IDENTIFIER_PATTERN = re.compile(_IDENTIFIER)
+_EDGE_PATTERN = re.compile(
+    r'\s*(?:(?:--|==|-\.)\s+(?P<inline>[^|>]+?)\s+(?:-->|==>|\.->)|<?(?:-{2,}|={2,}|-\.+-)[>ox]?)'
+    r'\s*(?:\|(?P<label>[^|]*)\|)?\s*')
+_SKIPPED_FLOWCHART_PREFIXES = ('style ', 'classDef ', 'class ', 'click ', 'linkStyle ', 'direction ', 'end')
+
+
+def parse_mermaid(content: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Entities and relationships of a Mermaid requirement, class or flowchart (use case) diagram, in the structure
+    produced by the LLM extraction. Unknown diagram kinds give empty lists.
+    """
+    lines = _diagram_lines(content)
+    if not lines:
+        return {"entities": [], "relationships": []}
+    header = lines[0].split()[0]
+    if header == 'requirementDiagram':
+        return _parse_requirement_diagram(lines[1:])
+    if header == 'classDiagram':
+        return _parse_class_diagram(lines[1:])
+    if header in ('flowchart', 'graph'):
+        return _parse_flowchart(lines[1:])
+    logger.info(f"Diagramme Mermaid '{header}' non pris en charge par l'analyseur local")
+    return {"entities": [], "relationships": []}
+
+
+def split_diagram(content: str, max_chars: int) -> List[str]:
+    """
+    Splits a diagram into segments of about max_chars characters, each starting with the diagram header.
+
+    Blocks ({ ... }) and subgraphs are never cut, statements keep their order, so relationships mostly stay in the
+    segment of the entities they connect.
+    """
+    lines = _diagram_lines(content)
+    if not lines:
+        return []
+    header, units = lines[0], _statement_units(lines[1:])
+    segments, segment, segment_size = [], [], 0
+    for unit in units:
+        if segment and segment_size + len(unit) > max_chars:
+            segments.append(segment)
+            segment, segment_size = [], 0
+        segment.append(unit)
+        segment_size += len(unit) + 1
+    if segment:
+        segments.append(segment)
+    return ["\n".join([header, *segment]) for segment in segments]
+
+
+def _statement_units(lines: List[str]) -> List[str]:
+    units, unit, depth = [], [], 0
+    for line in lines:
+        unit.append(line)
+        if line.endswith('{') or line.startswith('subgraph '):
+            depth += 1
+        elif depth and (line == '}' or line == 'end'):
+            depth -= 1
+        if depth == 0:
+            units.append("\n".join(unit))
+            unit = []
+    if unit:
+        units.append("\n".join(unit))
+    return units
+
+
+def extract_keywords(*texts: Optional[str], limit: int = 8) -> List[str]:
+    keywords = []
+    for text in texts:
+        for word in _WORD_PATTERN.findall(text or ''):
+            if len(word) > 2 and word.lower() not in _STOPWORDS and word.lower() not in map(str.lower, keywords):
+                keywords.append(word)
+    return keywords[:limit]
+
+
+def _diagram_lines(content: str) -> List[str]:
+    fenced = _FENCE_PATTERN.search(content or '')
+    text = fenced.group(1) if fenced else (content or '')
+    lines = []
+    for line in text.splitlines():
+        line = line.split('%%', 1)[0].strip()
+        if line:
+            lines.append(line)
+    return lines
+
+
+def _entity(name: str, entity_type: str, description: str, keywords: List[str]) -> Dict[str, Any]:
+    return {"name": name, "type": entity_type, "description": description, "keywords": keywords}
+
+
+def _relationship(source: str, target: str, relationship_type: str) -> Dict[str, str]:
+    return {"source": source, "target": target, "type": relationship_type}
+
+
+def _parse_requirement_diagram(lines: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    entities, relationships = [], []
+    block: Optional[Tuple[str, str, Dict[str, str]]] = None
+    for line in lines:
+        if block is not None:
+            if line == '}':
+                entities.append(_requirement_entity(*block))
+                block = None
+            else:
+                field = _FIELD_PATTERN.match(line)
+                if field:
+                    block[2][field.group(1)] = field.group(2).strip('"')
+            continue
+
+        start = _BLOCK_START_PATTERN.match(line)
+        if start and start.group(1) in _REQUIREMENT_TYPES:
+            block = (start.group(1), start.group(2).strip(), {})
+            continue
+        for pattern, reverse in _REQUIREMENT_RELATION_PATTERNS:
+            relation = pattern.match(line)
+            if relation:
+                source, relationship_type, target = relation.groups()
+                if reverse:
+                    source, target = target, source
+                relationships.append(_relationship(source, target, relationship_type))
+                break
+    return {"entities": entities, "relationships": relationships}
+
+
+def _requirement_entity(block_type: str, name: str, fields: Dict[str, str]) -> Dict[str, Any]:
+    if block_type == 'element':
+        description = fields.get('docref') or fields.get('type') or ''
+        return _entity(name, fields.get('type') or 'element', description, extract_keywords(name, description))
+
+    description = fields.get('text', '')
+    keywords = extract_keywords(description)
+    if fields.get('risk'):
+        keywords.append(f"{fields['risk'].capitalize()} risk")
+    if fields.get('verification') or fields.get('verifymethod'):
+        keywords.append(fields.get('verification') or fields.get('verifymethod'))
+    return _entity(name, block_type, description, keywords)
+
+
+def _parse_class_diagram(lines: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    classes: Dict[str, Dict[str, Any]] = {}
+    relationships = []
+
+    def declare(name: str) -> Dict[str, Any]:
+        return classes.setdefault(name, {"label": None, "annotation": None, "members": [], "notes": []})
+
+    current = None
+    for line in lines:
+        if current is not None:
+            if line == '}':
+                current = None
+            else:
+                annotation = _CLASS_ANNOTATION_PATTERN.match(line)
+                if annotation:
+                    current["annotation"] = annotation.group(1)
+                else:
+                    current["members"].append(line)
+            continue
+
+        declaration = _CLASS_PATTERN.match(line)
+        if declaration:
+            name, label, opened, closed = declaration.groups()
+            current = declare(name)
+            current["label"] = label or current["label"]
+            if not opened or closed:
+                current = None
+            continue
+        annotation = _CLASS_ANNOTATION_PATTERN.match(line)
+        if annotation and annotation.group(2):
+            declare(annotation.group(2))["annotation"] = annotation.group(1)
+            continue
+        note = _NOTE_PATTERN.match(line)
+        if note:
+            declare(note.group(1))["notes"].append(note.group(2).replace('\\n', ' '))
+            continue
+        relation = _CLASS_RELATION_PATTERN.match(line)
+        if relation:
+            source, arrow, target, label = relation.groups()
+            relationship_type, reverse = _CLASS_ARROWS[arrow]
+            if reverse:
+                source, target = target, source
+            declare(source)
+            declare(target)
+            relationships.append(_relationship(source, target, (label or '').strip() or relationship_type))
+            continue
+        if ':' in line:
+            # Member declared outside of the class body: "ClassName : +attribute"
+            name, member = line.split(':', 1)
+            if re.fullmatch(r'[\w.-]+', name.strip()):
+                declare(name.strip())["members"].append(member.strip())
+
+    entities = []
+    for name, declared in classes.items():
+        members = [member.strip('+-#~ ') for member in declared["members"]]
+        description = ' '.join(declared["notes"]) or declared["label"] or ''
+        if not description and members:
+            description = f"{name}: {', '.join(members)}"
+        entities.append(_entity(name, declared["annotation"] or 'class', description,
+                                extract_keywords(declared["label"], ' '.join(declared["notes"]), *members)))
+    return {"entities": entities, "relationships": relationships}
+
+
+def _parse_flowchart(lines: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    nodes: Dict[str, Dict[str, Any]] = {}
+    relationships = []
+    for line in lines:
+        if line.startswith('subgraph '):
+            subgraph = line[len('subgraph '):].strip()
+            if _NODE_PATTERN.match(subgraph):
+                node_id, text, _, _ = _read_node(subgraph, 0)
+            else:
+                node_id, text = subgraph, None
+            nodes.setdefault(node_id, {"text": text, "type": 'system'})
+            continue
+        if line.startswith(_SKIPPED_FLOWCHART_PREFIXES):
+            continue
+        for statement in line.split(';'):
+            _parse_flowchart_statement(statement.strip(), nodes, relationships)
+
+    entities = [_entity(node_id, node["type"] or 'node', node["text"] or '', extract_keywords(node["text"]))
+                for node_id, node in nodes.items()]
+    return {"entities": entities, "relationships": relationships}
+
+
+def _parse_flowchart_statement(statement: str, nodes: Dict[str, Dict[str, Any]],
+                               relationships: List[Dict[str, str]]) -> None:
+    """Reads a chain of nodes joined by edges: "a[Text] -->|label| b((Actor)) --> c"."""
+    position, previous, label = 0, None, None
+    while position < len(statement):
+        if _NODE_PATTERN.match(statement, position):
+            node_id, text, node_type, position = _read_node(statement, position)
+        else:
+            identifier = _IDENTIFIER_PATTERN.match(statement, position)
+            if not identifier:
+                return
+            node_id, text, node_type, position = identifier.group(), None, None, identifier.end()
+        node = nodes.setdefault(node_id, {"text": None, "type": None})
+        node["text"] = node["text"] or text
+        node["type"] = node["type"] or node_type
+        if previous is not None:
+            relationships.append(_relationship(previous, node_id, (label or '').strip() or 'link'))
+
+        edge = _EDGE_PATTERN.match(statement, position)
+        if not edge or not edge.group(0).strip():
+            return
+        label = edge.group('label') or edge.group('inline')
+        previous, position = node_id, edge.end()
+
+
+def _read_node(statement: str, position: int) -> Tuple[str, Optional[str], str, int]:
+    """Reads "id<open>text<close>" at position, returns the id, text and type of the node and the next position."""
+    match = _NODE_PATTERN.match(statement, position)
+    node_id, opening = match.group(1), match.group(2)
+    shape_close, node_type = next((close, shape_type) for shape_open, close, shape_type in _NODE_SHAPES
+                                  if shape_open == opening)
+    end = statement.find(shape_close, match.end())
+    if end == -1:
+        return node_id, statement[match.end():].strip().strip('"'), node_type, len(statement)
+    return node_id, statement[match.end():end].strip().strip('"'), node_type, end + len(shape_close)
@@ -0,0 +1,85 @@
+# src/adapters/parsing/streaming_json.py
+import json
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+
+logger = logging.getLogger("uvicorn.error")
+
+# Top-level arrays whose objects are emitted, with the kind of record they hold
+RECORD_KINDS = {"entities": "entity", "relationships": "relationship"}
+
+
+class ExtractionStreamParser:
+    """
+    Incremental parser of the {"entities": [...], "relationships": [...]} extraction output.
+
+    Text is fed as it is received and every object of the entities and relationships arrays is returned as soon as
+    it closes, so a truncated completion still yields all of its complete records. Text around the JSON object
+    (Markdown fences, comments) is ignored.
+    """
+
+    def __init__(self):
+        self._stack: List[str] = []
+        self._array_kinds: List[Optional[str]] = []
+        self._in_string = False
+        self._escape = False
+        self._key: Optional[str] = None
+        self._key_chars: Optional[List[str]] = None
+        self._record: Optional[List[str]] = None
+        self._record_kind: Optional[str] = None
+        self._record_depth = 0
+
+    def feed(self, text: str) -> List[Tuple[str, Dict[str, Any]]]:
+        records = []
+        for char in text:
+            if self._record is not None:
+                self._record.append(char)
+            if self._in_string:
+                self._read_string_char(char)
+                continue
+            if not self._stack and char != '{':
+                continue
+
+            if char == '"':
+                self._in_string = True
+                # Only keys of the root object matter, to know which array is being read
+                self._key_chars = [] if self._record is None and self._stack == ['{'] else None
+            elif char in '{[':
+                if char == '{' and self._record is None and self._stack and self._stack[-1] == '[' \
+                        and self._array_kinds[-1]:
+                    self._record, self._record_kind, self._record_depth = ['{'], self._array_kinds[-1], len(self._stack)
+                self._stack.append(char)
+                if char == '[':
+                    self._array_kinds.append(RECORD_KINDS.get(self._key) if len(self._stack) == 2 else None)
+            elif char in '}]' and self._stack:
+                if self._stack.pop() == '[':
+                    self._array_kinds.pop()
+                if self._record is not None and len(self._stack) == self._record_depth:
+                    record = self._close_record()
+                    if record is not None:
+                        records.append(record)
+        return records
+
+    def _read_string_char(self, char: str) -> None:
+        if self._escape:
+            self._escape = False
+        elif char == '\\':
+            self._escape = True
+            return
+        elif char == '"':
+            self._in_string = False
+            if self._key_chars is not None:
+                self._key = ''.join(self._key_chars)
+                self._key_chars = None
+            return
+        if self._key_chars is not None:
+            self._key_chars.append(char)
+
+    def _close_record(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        text, kind = ''.join(self._record), self._record_kind
+        self._record, self._record_kind = None, None
+        try:
+            return kind, json.loads(text)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Enregistrement JSON invalide ignoré ({kind}) : {e}")
+            return None
@@ -0,0 +1,131 @@
+# src/adapters/persistence/async_neo4j_persistence_adapter.py
+import asyncio
+import logging
+from typing import Dict, List, Any, Optional
+
+from neo4j import AsyncGraphDatabase, AsyncDriver, AsyncSession
+from neo4j.exceptions import Neo4jError, ServiceUnavailable
+from src.adapters.persistence.neo4j_health import Neo4jHealthMonitor
+from src.adapters.persistence.neo4j_schema import Neo4jSchemaManager, SHOW_CONSTRAINTS_QUERY, SHOW_INDEXES_QUERY
+from src.domain.ports.async_neo4j_persistence_adapter_protocol import AsyncNeo4jPersistenceAdapterProtocol
+from src.infrastructure.config import config
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class AsyncNeo4jPersistenceAdapter(AsyncNeo4jPersistenceAdapterProtocol):
+    """
+    Neo4j adapter of the FastAPI request path, built on the asyncio driver so that the health and schema checks do
+    not block the event loop. Graph reads and writes run in Celery workers, with Neo4jPersistenceAdapter.
+
+    The driver is created lazily by connect(), in the event loop that uses it. The health state is cached like in
+    the sync adapter, and refreshed by a probe task scheduled on the loop when it is stale.
+    """
+
+    def __init__(self):
+        self.uri = config.global_config.NEO4J_URI
+        self.user = config.global_config.NEO4J_USER
+        self.password = config.global_config.NEO4J_PASSWORD
+        self.driver: Optional[AsyncDriver] = None
+        self.neo4j_config = config.get_neo4j_config()
+        health_config = self.neo4j_config.get('health', {})
+        self.health = Neo4jHealthMonitor(ttl_seconds=health_config.get('ttl_seconds', 60),
+                                         failure_threshold=health_config.get('failure_threshold', 3),
+                                         reset_timeout_seconds=health_config.get('reset_timeout_seconds', 30))
+        self._probe_task: Optional[asyncio.Task] = None
+
+    async def connect(self) -> None:
+        try:
+            self.driver = AsyncGraphDatabase.driver(
+                self.uri,
+                auth=(self.user, self.password),
+                max_connection_pool_size=self.neo4j_config.get('async_pool_size', 50))
+            await self.driver.verify_connectivity()
+            self.health.record_success()
+            logger.info("Neo4j async connection established successfully")
+        except ServiceUnavailable:
+            logger.warning("Neo4j is not available. Some features will be limited.")
+            await self._discard_driver()
+        except Exception as e:
+            logger.error(f"Failed to connect to Neo4j: {str(e)}")
+            await self._discard_driver()
+
+    async def _discard_driver(self) -> None:
+        self.health.record_failure()
+        if self.driver:
+            await self.driver.close()
+        self.driver = None
+
+    async def ensure_connection(self) -> None:
+        if not self.driver and self.health.allow_request():
+            logger.info("Attempting to reconnect to Neo4j...")
+            await self.connect()
+
+    async def is_connected(self) -> bool:
+        """Cached health state; a stale state is refreshed by a background task, not by this call."""
+        if self.health.is_stale():
+            self._schedule_probe()
+        return self.driver is not None and self.health.is_healthy()
+
+    def _schedule_probe(self) -> None:
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe())
+
+    async def _probe(self) -> None:
+        if not self.driver:
+            await self.connect()
+            return
+        try:
+            await self.driver.verify_connectivity()
+            self.health.record_success()
+        except Exception as e:
+            logger.debug(f"Neo4j health probe failed: {str(e)}")
+            self.health.record_failure()
+
+    async def get_session(self) -> Optional[AsyncSession]:
+        await self.ensure_connection()
+        if self.driver and self.health.allow_request():
+            return self.driver.session()
+        return None
+
+    async def ensure_schema(self) -> Dict[str, Any]:
+        session = await self.get_session()
+        if not session:
+            logger.warning("Unable to create schema: Neo4j is not connected")
+            return {"status": "disconnected"}
+        manager = Neo4jSchemaManager()
+        try:
+            async with session:
+                for element in manager.missing_elements(await self._existing_schema_elements(session)):
+                    try:
+                        await (await session.run(element.create_statement())).consume()
+                        logger.info(f"Neo4j schema: {element.name} created")
+                    except Neo4jError as e:
+                        # Typically duplicates already stored under a uniqueness key
+                        logger.error(f"Neo4j schema: unable to create {element.name}: {str(e)}")
+                return manager.log_report(manager.compare(await self._existing_schema_elements(session)))
+        except Neo4jError as e:
+            logger.error(f"Error creating Neo4j schema: {e}")
+            return {"status": "error", "message": str(e)}
+
+    async def check_schema(self) -> Dict[str, Any]:
+        session = await self.get_session()
+        if not session:
+            return {"status": "disconnected"}
+        async with session:
+            return Neo4jSchemaManager().compare(await self._existing_schema_elements(session))
+
+    @staticmethod
+    async def _existing_schema_elements(session: AsyncSession) -> List[Dict[str, Any]]:
+        constraints = await (await session.run(SHOW_CONSTRAINTS_QUERY)).data()
+        indexes = await (await session.run(SHOW_INDEXES_QUERY)).data()
+        return ([Neo4jSchemaManager.constraint_element(record) for record in constraints] +
+                [Neo4jSchemaManager.index_element(record) for record in indexes])
+
+    async def close_neo4j(self) -> None:
+        if self._probe_task is not None and not self._probe_task.done():
+            self._probe_task.cancel()
+        if self.driver:
+            await self.driver.close()
+            self.driver = None
+            logger.info("Neo4j async connection closed")
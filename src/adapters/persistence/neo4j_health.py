@@ -0,0 +1,119 @@
+# src/adapters/persistence/neo4j_health.py
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class Neo4jHealthMonitor:
+    """
+    Connection health of Neo4j, kept up to date by a background probe so that callers never run one themselves.
+
+    Failed probes and failed operations reported with record_failure count towards a circuit breaker: after
+    failure_threshold consecutive failures, allow_request returns False, letting a single trial request through
+    every reset_timeout_seconds, until a probe or a request succeeds again. The probe thread is started lazily in
+    each process, so the monitor can be created before Celery forks its workers. Without probe, no thread is
+    started and the owner refreshes the state itself when is_stale returns True.
+    """
+
+    def __init__(self, probe: Optional[Callable[[], bool]] = None, interval_seconds: float = 15.0,
+                 ttl_seconds: float = 60.0, failure_threshold: int = 3, reset_timeout_seconds: float = 30.0):
+        self.probe = probe
+        self.interval_seconds = interval_seconds
+        self.ttl_seconds = ttl_seconds
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._lock = threading.Lock()
+        self._healthy = False
+        self._checked_at = 0.0
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._refresh = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def is_healthy(self) -> bool:
+        """Last known state; a state older than ttl_seconds is refreshed in the background."""
+        if self.probe is not None:
+            self._ensure_started()
+            if self.is_stale():
+                self._refresh.set()
+        with self._lock:
+            return self._healthy and self._opened_at is None
+
+    def is_stale(self) -> bool:
+        with self._lock:
+            return time.monotonic() - self._checked_at > self.ttl_seconds
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at >= self.reset_timeout_seconds:
+                # Trial request, the next one is allowed after another timeout unless this one succeeds
+                self._opened_at = now
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("Neo4j is reachable again, circuit breaker closed")
+            self._healthy = True
+            self._checked_at = time.monotonic()
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._healthy = False
+            self._checked_at = time.monotonic()
+            self._failures += 1
+            if self._failures >= self.failure_threshold and self._opened_at is None:
+                self._opened_at = self._checked_at
+                logger.warning(f"Neo4j unreachable ({self._failures} failures), circuit breaker opened")
+
+    def state(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "healthy": self._healthy,
+                "circuit": "open" if self._opened_at is not None else "closed",
+                "consecutive_failures": self._failures,
+                "checked_seconds_ago": round(time.monotonic() - self._checked_at, 1) if self._checked_at else None,
+            }
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._refresh.set()
+
+    def _ensure_started(self) -> None:
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._pid = os.getpid()
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="neo4j-health", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._refresh.wait(self.interval_seconds)
+            self._refresh.clear()
+            if self._stopped.is_set():
+                return
+            try:
+                healthy = self.probe()
+            except Exception as e:
+                logger.debug(f"Neo4j health probe failed: {str(e)}")
+                healthy = False
+            if healthy:
+                self.record_success()
+            else:
+                self.record_failure()
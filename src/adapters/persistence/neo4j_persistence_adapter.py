@@ -4,10 +4,84 @@ from typing import Dict, List, Any, Optional
 
 from neo4j import GraphDatabase, Driver, Session
 from neo4j.exceptions import Neo4jError, ServiceUnavailable
+from src.adapters.persistence.neo4j_health import Neo4jHealthMonitor
+from src.adapters.persistence.neo4j_unit_of_work import Neo4jUnitOfWork
+from src.domain.models.entity_matrix import EntityMatrix
 from src.domain.ports.neo4j_persistence_adapter_protocol import Neo4jPersistenceAdapterProtocol
 from src.infrastructure.config import config
 logger = logging.getLogger("uvicorn.error")
 
+ROLLBACK_QUERY = """
+MATCH (p:Project {name: $project_name})
+DETACH DELETE p
+"""
+
+VECTOR_INDEX_QUERY = """
+CALL db.index.vector.createNodeIndex(
+  'entity_embeddings',
+  'Entity',
+  'embedding',
+  1536,
+  'cosine'
+)
+"""
+
+ENTITIES_FOR_SIMILARITY_QUERY = """
+MATCH (p:Project)-[:HAS_DIAGRAM]->(d:Diagram)-[:CONTAINS_ENTITY]->(e:Entity)
+WHERE e.embedding IS NOT NULL
+AND (($project_name IS NULL) OR (p.name = $project_name))
+OPTIONAL MATCH (e)-[:HAS_KEYWORD]->(k:Keyword)
+RETURN e.id AS id, e.name AS name, e.embedding AS embedding,
+       collect(DISTINCT k.name) AS keywords, d.type AS diagram_type, p.name AS project_name,
+       e.similarity_fingerprint AS similarity_fingerprint
+"""
+
+# Columnar fetch: keyset pagination on the Entity.id uniqueness constraint
+ENTITY_MATRIX_FILTER = """
+MATCH (p:Project)-[:HAS_DIAGRAM]->(d:Diagram)-[:CONTAINS_ENTITY]->(e:Entity)
+WHERE e.embedding IS NOT NULL
+AND (($project_name IS NULL) OR (p.name = $project_name))
+AND (($exclude_diagram_type IS NULL) OR (d.type <> $exclude_diagram_type))
+"""
+
+ENTITY_MATRIX_COUNT_QUERY = ENTITY_MATRIX_FILTER + """
+RETURN count(e) AS count
+"""
+
+ENTITY_MATRIX_PAGE_QUERY = ENTITY_MATRIX_FILTER + """
+AND e.id > $after
+WITH p, d, e ORDER BY e.id LIMIT $page_size
+OPTIONAL MATCH (e)-[:HAS_KEYWORD]->(k:Keyword)
+WITH p, d, e, collect(DISTINCT k.name) AS keywords
+RETURN e.id AS id, e.name AS name, e.embedding AS embedding, keywords, d.type AS diagram_type,
+       p.name AS project_name, e.similarity_fingerprint AS similarity_fingerprint
+ORDER BY id
+"""
+
+SIMILARITY_FINGERPRINTS_QUERY = """
+MATCH (p:Project {name: $project_name})-[:HAS_DIAGRAM]->(d:Diagram {type: $diagram_type})-[:CONTAINS_ENTITY]->(e:Entity)
+WHERE e.embedding IS NOT NULL
+RETURN e.id AS id, e.similarity_fingerprint AS similarity_fingerprint
+"""
+
+# Stored state of a diagram, for diff-based sync. Properties are returned as [key, value] pairs so that embeddings
+# are filtered out in Cypher, without APOC, and not transferred
+DIAGRAM_ENTITIES_STATE_QUERY = """
+MATCH (d:Diagram {id: $project_name + '_' + $diagram_type})
+OPTIONAL MATCH (d)-[:CONTAINS_ENTITY]->(e:Entity)
+OPTIONAL MATCH (e)-[:HAS_KEYWORD]->(k:Keyword)
+WITH e, collect(k.name) AS keywords
+RETURN e.id AS id,
+       [key IN keys(e) WHERE NOT key IN ['embedding', 'similarity_fingerprint'] | [key, e[key]]] AS properties,
+       keywords, e.embedding IS NOT NULL AS has_embedding
+"""
+
+DIAGRAM_RELATIONSHIPS_STATE_QUERY = """
+MATCH (:Diagram {id: $project_name + '_' + $diagram_type})-[:CONTAINS_ENTITY]->(e1:Entity)-[r]->(e2:Entity)
+WHERE type(r) <> 'SIMILAR_TO' AND e2.project_name = $project_name AND e2.diagram_type = $diagram_type
+RETURN e1.name AS source, type(r) AS type, e2.name AS target
+"""
+
 
 # ajouter des transaction sur les requêtes neo4j,par un rollback
 
@@ -17,7 +91,14 @@ class Neo4jPersistenceAdapter(Neo4jPersistenceAdapterProtocol):
         self.user = config.global_config.NEO4J_USER
         self.password = config.global_config.NEO4J_PASSWORD
         self.driver: Optional[Driver] = None
-        self.connect()
+        self.neo4j_config = config.get_neo4j_config()
+        health_config = self.neo4j_config.get('health', {})
+        self.health = Neo4jHealthMonitor(self._probe,
+                                         interval_seconds=health_config.get('probe_interval_seconds', 15),
+                                         ttl_seconds=health_config.get('ttl_seconds', 60),
+                                         failure_threshold=health_config.get('failure_threshold', 3),
+                                         reset_timeout_seconds=health_config.get('reset_timeout_seconds', 30))
+        self._connect_and_record()
     
     def connect(self) -> None:
         try:
@@ -34,24 +115,35 @@ class Neo4jPersistenceAdapter(Neo4jPersistenceAdapterProtocol):
             logger.error(f"Failed to connect to Neo4j: {str(e)}")
             self.driver = None
     
+    def _connect_and_record(self) -> None:
+        self.connect()
+        if self.driver:
+            self.health.record_success()
+        else:
+            self.health.record_failure()
+    
+    def _probe(self) -> bool:
+        """Background liveness check of the health monitor, which also recreates a missing driver."""
+        if not self.driver:
+            self.connect()
+            return self.driver is not None
+        self.driver.verify_connectivity()
+        return True
+    
     def ensure_connection(self) -> None:
-        if not self.is_connected():
+        # The driver reconnects its pooled connections by itself: only a missing driver is recreated, and not
+        # while the circuit breaker is open
+        if not self.driver and self.health.allow_request():
             logger.info("Attempting to reconnect to Neo4j...")
-            self.connect()
+            self._connect_and_record()
     
     def is_connected(self) -> bool:
-        if not self.driver:
-            return False
-        try:
-            with self.driver.session() as session:
-                session.run("RETURN 1")
-            return True
-        except Exception:
-            return False
+        """Cached health state, refreshed by a background probe."""
+        return self.driver is not None and self.health.is_healthy()
     
     def get_session(self) -> Optional[Session]:
         self.ensure_connection()
-        if self.driver:
+        if self.driver and self.health.allow_request():
             return self.driver.session()
         return None
     
@@ -61,12 +153,8 @@ class Neo4jPersistenceAdapter(Neo4jPersistenceAdapterProtocol):
             logger.warning("Unable to perform rollback: Neo4j is not connected")
             return
         
-        query = """
-        MATCH (p:Project {name: $project_name})
-        DETACH DELETE p
-        """
         try:
-            session.run(query, project_name=project_name)
+            session.run(ROLLBACK_QUERY, project_name=project_name)
             logger.info(f"Rollback completed for project {project_name}")
         except Neo4jError as e:
             logger.error(f"Error during rollback for project {project_name}: {str(e)}")
@@ -80,15 +168,7 @@ class Neo4jPersistenceAdapter(Neo4jPersistenceAdapterProtocol):
             return
         
         try:
-            session.run("""
-            CALL db.index.vector.createNodeIndex(
-              'entity_embeddings',
-              'Entity',
-              'embedding',
-              1536,
-              'cosine'
-            )
-            """)
+            session.run(VECTOR_INDEX_QUERY)
             logger.info("Vector index 'entity_embeddings' created successfully.")
         except Neo4jError as e:
             if "An equivalent index already exists" in str(e):
@@ -99,121 +179,104 @@ class Neo4jPersistenceAdapter(Neo4jPersistenceAdapterProtocol):
             session.close()
 
 
+    def unit_of_work(self) -> Neo4jUnitOfWork:
+        """Returns a unit of work writing its mutations in one transaction when committed."""
+        return Neo4jUnitOfWork(self.driver, health_monitor=self.health,
+                               batch_size=self.neo4j_config.get('write_batch_size', 1000),
+                               relationship_batch_size=self.neo4j_config.get('relationship_batch_size', 1000))
+    
     def create_or_update_entities_and_keywords(self, project_name: str, diagram_type: str, entities: List[Dict[str, Any]]):
         if not self.driver:
             logger.warning("Neo4j driver is not connected. Unable to create or update entities and keywords.")
             return
-        
-        query = """
-        MERGE (p:Project {name: $project_name})
-        MERGE (d:Diagram {type: $diagram_type})
-        MERGE (p)-[:HAS_DIAGRAM]->(d)
-        WITH p, d
-        UNWIND $entities AS entity
-        MERGE (e:Entity {id: $project_name + '_' + $diagram_type + '_' + entity.id})
-        SET e += entity,
-            e.project_name = $project_name,
-            e.diagram_type = $diagram_type
-        MERGE (d)-[:CONTAINS_ENTITY]->(e)
-        WITH e, entity
-        UNWIND coalesce(entity.keywords, []) AS keyword
-        MERGE (k:Keyword {name: keyword})
-        MERGE (e)-[:HAS_KEYWORD]->(k)
-        """
-        
-        with self.driver.session() as session:
-            result = session.run(query, project_name=project_name, diagram_type=diagram_type, entities=entities)
-        logger.info(f"Entities and keywords created/updated: {result.consume().counters}")
-
+        unit_of_work = self.unit_of_work()
+        unit_of_work.merge_diagram(project_name, diagram_type)
+        unit_of_work.merge_entities(project_name, diagram_type, entities)
+        unit_of_work.commit()
     
     def create_or_update_project(self, project_name: str, project_type: str):
-        query = """
-        MERGE (p:Project {name: $project_name})
-        SET p.type = $project_type
-        RETURN p
-        """
-        with self.driver.session() as session:
-            session.run(query, project_name=project_name, project_type=project_type)
+        unit_of_work = self.unit_of_work()
+        unit_of_work.merge_project(project_name, project_type)
+        unit_of_work.commit()
     
     def create_or_update_diagram(self, project_name: str, diagram_type: str):
-        query = """
-            MATCH (p:Project {name: $project_name})
-            MERGE (d:Diagram {id: $diagram_id})
-            SET d.type = $diagram_type, d.project_name = $project_name
-            MERGE (p)-[:HAS_DIAGRAM]->(d)
-            RETURN d
-            """
-        diagram_id = f"{project_name}_{diagram_type}"
-        with self.driver.session() as session:
-            session.run(query, project_name=project_name, diagram_id=diagram_id, diagram_type=diagram_type)
+        unit_of_work = self.unit_of_work()
+        unit_of_work.merge_diagram(project_name, diagram_type)
+        unit_of_work.commit()
     
     def update_embeddings(self, project_name: str, diagram_type: str, embeddings: Dict[str, List[float]]):
         if not self.driver:
             logger.warning("Neo4j driver is not connected. Unable to update embeddings.")
             return
-        query = """
-        MATCH (p:Project {name: $project_name})-[:HAS_DIAGRAM]->(d:Diagram {type: $diagram_type})-[:CONTAINS_ENTITY]->(e:Entity)
-        WHERE e.id IN $embedding_ids
-        SET e.embedding = $embeddings[e.id]
-        """
-        with self.driver.session() as session:
-            result = session.run(query,
-                                 project_name=project_name,
-                                 diagram_type=diagram_type,
-                                 embedding_ids=list(embeddings.keys()),
-                                 embeddings=embeddings)
-        logger.info(f"Embeddings updated: {result.consume().counters}")
+        unit_of_work = self.unit_of_work()
+        unit_of_work.set_embeddings(project_name, diagram_type, embeddings)
+        unit_of_work.commit()
     
     def create_relationships(self, project_name: str, diagram_type: str, relationships: List[Dict[str, Any]]):
         if not self.driver:
             logger.warning("Neo4j driver is not connected. Unable to create relationships.")
             return
-        with self.driver.session() as session:
-            for rel in relationships:
-                query = """
-                MATCH (e1:Entity {name: $source, project_name: $project_name, diagram_type: $diagram_type})
-                MATCH (e2:Entity {name: $target, project_name: $project_name, diagram_type: $diagram_type})
-                MERGE (e1)-[r:`%s`]->(e2)
-                """ % rel['type'].upper()
-                result = session.run(query,
-                                     project_name=project_name,
-                                     diagram_type=diagram_type,
-                                     source=rel['source'],
-                                     target=rel['target'])
-                logger.info(f"Relationship created: {result.consume().counters}")
+        unit_of_work = self.unit_of_work()
+        unit_of_work.merge_relationships(project_name, diagram_type, relationships)
+        unit_of_work.commit()
     
     def update_similarity_relationships(self, similarities: List[Dict[str, Any]]):
         if not self.driver:
             logger.warning("Neo4j driver is not connected. Unable to update similarity relationships.")
             return
-        query = """
-        UNWIND $similarities AS sim
-        MATCH (e1:Entity {id: sim.id1})
-        MATCH (e2:Entity {id: sim.id2})
-        MERGE (e1)-[r:SIMILAR_TO]->(e2)
-        SET r.combined_similarity = sim.combined_similarity,
-            r.embedding_similarity = sim.embedding_similarity,
-            r.jaccard_similarity = sim.jaccard_similarity
-        """
-        with self.driver.session() as session:
-            result = session.run(query, similarities=similarities)
-        logger.info(f"Similarity relationships updated: {result.consume().counters}")
+        unit_of_work = self.unit_of_work()
+        unit_of_work.merge_similarities(similarities)
+        unit_of_work.commit()
     
     def close_neo4j(self) -> None:
+        self.health.stop()
         if self.driver:
             self.driver.close()
             logger.info("Neo4j connection closed")
     
     def get_entities_for_similarity(self, project_name: str = None) -> List[Dict[str, Any]]:
-        query = """
-        MATCH (p:Project)-[:HAS_DIAGRAM]->(d:Diagram)-[:CONTAINS_ENTITY]->(e:Entity)
-        WHERE e.embedding IS NOT NULL
-        AND (($project_name IS NULL) OR (p.name = $project_name))
-        OPTIONAL MATCH (e)-[:HAS_KEYWORD]->(k:Keyword)
-        RETURN e.id AS id, e.name AS name, e.embedding AS embedding,
-               collect(DISTINCT k.name) AS keywords, d.type AS diagram_type, p.name AS project_name
-        """
         with self.driver.session() as session:
-            result = session.run(query, project_name=project_name)
+            result = session.run(ENTITIES_FOR_SIMILARITY_QUERY, project_name=project_name)
             return [dict(record) for record in result]
-    
\ No newline at end of file
+    
+    
+    def get_entity_matrix(self, project_name: str = None, exclude_diagram_type: str = None,
+                          reserve: int = 0) -> EntityMatrix:
+        """
+        Entities for similarity calculation in columnar form: records are read page by page straight into a
+        preallocated float32 matrix, with room for reserve more rows.
+        """
+        page_size = self.neo4j_config.get('fetch_page_size', 2000)
+        parameters = {'project_name': project_name, 'exclude_diagram_type': exclude_diagram_type}
+        with self.driver.session() as session:
+            count = session.run(ENTITY_MATRIX_COUNT_QUERY, **parameters).single()['count']
+            matrix = EntityMatrix.allocate(count + reserve)
+            after = ''
+            while True:
+                fetched = 0
+                for record in session.run(ENTITY_MATRIX_PAGE_QUERY, after=after, page_size=page_size, **parameters):
+                    matrix.append(record)
+                    after = record['id']
+                    fetched += 1
+                if fetched < page_size:
+                    break
+        logger.info(f"Entity matrix fetched: {len(matrix)} entities")
+        return matrix
+    
+    def get_similarity_fingerprints(self, project_name: str, diagram_type: str) -> Dict[str, Optional[str]]:
+        with self.driver.session() as session:
+            result = session.run(SIMILARITY_FINGERPRINTS_QUERY, project_name=project_name, diagram_type=diagram_type)
+            return {record['id']: record['similarity_fingerprint'] for record in result}
+    
+    def get_diagram_state(self, project_name: str, diagram_type: str) -> Dict[str, Any]:
+        with self.driver.session() as session:
+            records = session.run(DIAGRAM_ENTITIES_STATE_QUERY, project_name=project_name,
+                                  diagram_type=diagram_type).data()
+            relationships = session.run(DIAGRAM_RELATIONSHIPS_STATE_QUERY, project_name=project_name,
+                                        diagram_type=diagram_type).data()
+        return {
+            'exists': bool(records),
+            'entities': {record['id']: {**record, 'properties': dict(record['properties'])}
+                         for record in records if record['id'] is not None},
+            'relationships': relationships
+        }
@@ -0,0 +1,108 @@
+# src/adapters/persistence/neo4j_schema.py
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Any, Tuple
+
+logger = logging.getLogger("uvicorn.error")
+
+
+@dataclass(frozen=True)
+class SchemaElement:
+    """A constraint or index the persistence adapter relies on."""
+    name: str
+    kind: str  # "unique" (uniqueness constraint) or "index" (range index)
+    label: str
+    properties: Tuple[str, ...]
+
+    def create_statement(self) -> str:
+        properties = ', '.join(f"n.{prop}" for prop in self.properties)
+        if self.kind == "unique":
+            return (f"CREATE CONSTRAINT {self.name} IF NOT EXISTS "
+                    f"FOR (n:{self.label}) REQUIRE ({properties}) IS UNIQUE")
+        return f"CREATE INDEX {self.name} IF NOT EXISTS FOR (n:{self.label}) ON ({properties})"
+
+    def signature(self) -> Tuple[str, str, Tuple[str, ...]]:
+        return self.kind, self.label, self.properties
+
+
+# One element per MERGE / MATCH key of the adapter
+EXPECTED_SCHEMA = [
+    SchemaElement("entity_id_unique", "unique", "Entity", ("id",)),
+    SchemaElement("keyword_name_unique", "unique", "Keyword", ("name",)),
+    SchemaElement("project_name_unique", "unique", "Project", ("name",)),
+    SchemaElement("diagram_id_unique", "unique", "Diagram", ("id",)),
+    SchemaElement("entity_name_scope", "index", "Entity", ("name", "project_name", "diagram_type")),
+]
+
+# Created by ensure_vector_index, only reported when missing
+VECTOR_INDEX = ("vector", "Entity", ("embedding",))
+
+SHOW_CONSTRAINTS_QUERY = """
+SHOW CONSTRAINTS YIELD name, type, labelsOrTypes, properties
+"""
+
+SHOW_INDEXES_QUERY = """
+SHOW INDEXES YIELD name, type, entityType, labelsOrTypes, properties, state, owningConstraint
+WHERE entityType = 'NODE' AND type <> 'LOOKUP' AND owningConstraint IS NULL
+"""
+
+
+class Neo4jSchemaManager:
+    """
+    Compares the database schema, as read with SHOW_CONSTRAINTS_QUERY and SHOW_INDEXES_QUERY, with the expected one
+    and lists the elements to create. The queries are run by the adapter, with its own driver.
+
+    Creation statements are idempotent (IF NOT EXISTS). Elements are compared by label and properties rather than
+    by name, so a constraint created by hand under another name is recognised.
+    """
+
+    def __init__(self, expected: List[SchemaElement] = None):
+        self.expected = expected if expected is not None else EXPECTED_SCHEMA
+
+    def missing_elements(self, elements: List[Dict[str, Any]]) -> List[SchemaElement]:
+        existing = {element["signature"] for element in elements}
+        return [element for element in self.expected if element.signature() not in existing]
+
+    def compare(self, elements: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Lists the expected elements that are missing, the ones that are not online yet, and the indexes and
+        constraints on the graph labels that the code does not expect.
+        """
+        existing = {element["signature"]: element for element in elements}
+        expected_signatures = {element.signature() for element in self.expected} | {VECTOR_INDEX}
+        labels = {element.label for element in self.expected}
+
+        missing = [element.name for element in self.expected if element.signature() not in existing]
+        if VECTOR_INDEX not in existing:
+            missing.append("entity_embeddings")
+        return {
+            "missing": missing,
+            "not_online": [element["name"] for element in elements
+                           if element["signature"] in expected_signatures and element["state"] != "ONLINE"],
+            "unexpected": [element["name"] for element in elements
+                           if element["signature"] not in expected_signatures and element["label"] in labels],
+        }
+
+    @staticmethod
+    def log_report(report: Dict[str, Any]) -> Dict[str, Any]:
+        if report["missing"] or report["not_online"] or report["unexpected"]:
+            logger.warning(f"Neo4j schema drift: {report}")
+        else:
+            logger.info("Neo4j schema is up to date")
+        return report
+
+    @classmethod
+    def constraint_element(cls, record) -> Dict[str, Any]:
+        kind = "unique" if "UNIQUENESS" in record["type"] else record["type"].lower()
+        return cls._element(record, kind, "ONLINE")
+
+    @classmethod
+    def index_element(cls, record) -> Dict[str, Any]:
+        kind = "index" if record["type"] == "RANGE" else record["type"].lower()
+        return cls._element(record, kind, record["state"])
+
+    @staticmethod
+    def _element(record, kind: str, state: str) -> Dict[str, Any]:
+        label = (record["labelsOrTypes"] or [None])[0]
+        properties = tuple(record["properties"] or [])
+        return {"name": record["name"], "label": label, "state": state, "signature": (kind, label, properties)}
@@ -0,0 +1,264 @@
+# src/adapters/persistence/neo4j_unit_of_work.py
+import logging
+from collections import defaultdict
+from typing import Dict, List, Any, Callable, Optional
+
+from neo4j import Driver, ManagedTransaction
+from neo4j.exceptions import ServiceUnavailable, SessionExpired
+from src.adapters.search.keyword_index import entity_keyword_index
+from src.adapters.search.local_vector_store import entity_vector_store
+from src.domain.models.entity import build_entity_id
+
+logger = logging.getLogger("uvicorn.error")
+
+MERGE_PROJECT_QUERY = """
+MERGE (p:Project {name: $project_name})
+SET p.type = coalesce($project_type, p.type)
+"""
+
+MERGE_DIAGRAM_QUERY = """
+MERGE (p:Project {name: $project_name})
+MERGE (d:Diagram {id: $project_name + '_' + $diagram_type})
+SET d.type = $diagram_type, d.project_name = $project_name
+MERGE (p)-[:HAS_DIAGRAM]->(d)
+"""
+
+MERGE_ENTITIES_QUERY = """
+MATCH (d:Diagram {id: $project_name + '_' + $diagram_type})
+UNWIND $rows AS entity
+MERGE (e:Entity {id: $project_name + '_' + $diagram_type + '_' + entity.id})
+SET e += entity
+SET e.id = $project_name + '_' + $diagram_type + '_' + entity.id,
+    e.project_name = $project_name,
+    e.diagram_type = $diagram_type
+MERGE (d)-[:CONTAINS_ENTITY]->(e)
+WITH e, entity
+UNWIND coalesce(entity.keywords, []) AS keyword
+MERGE (k:Keyword {name: keyword})
+MERGE (e)-[:HAS_KEYWORD]->(k)
+"""
+
+SET_EMBEDDINGS_QUERY = """
+UNWIND $rows AS row
+MATCH (e:Entity {id: row.id})
+SET e.embedding = row.embedding
+RETURN e.id AS id, e.name AS name, e.description AS description
+"""
+
+# Relationship types cannot be parameters: one statement per type
+MERGE_RELATIONSHIPS_QUERY = """
+UNWIND $rows AS row
+MATCH (e1:Entity {name: row.source, project_name: $project_name, diagram_type: $diagram_type})
+MATCH (e2:Entity {name: row.target, project_name: $project_name, diagram_type: $diagram_type})
+MERGE (e1)-[r:`%s`]->(e2)
+"""
+
+DELETE_RELATIONSHIPS_QUERY = """
+UNWIND $rows AS row
+MATCH (e1:Entity {name: row.source, project_name: $project_name, diagram_type: $diagram_type})
+      -[r:`%s`]->(e2:Entity {name: row.target, project_name: $project_name, diagram_type: $diagram_type})
+DELETE r
+"""
+
+DELETE_ENTITIES_QUERY = """
+UNWIND $rows AS entity_id
+MATCH (e:Entity {id: entity_id})
+DETACH DELETE e
+"""
+
+UNLINK_KEYWORDS_QUERY = """
+UNWIND $rows AS row
+MATCH (:Entity {id: row.id})-[r:HAS_KEYWORD]->(:Keyword {name: row.keyword})
+DELETE r
+"""
+
+DELETE_SIMILARITIES_QUERY = """
+UNWIND $rows AS entity_id
+MATCH (e:Entity {id: entity_id})-[r:SIMILAR_TO]-()
+DELETE r
+"""
+
+MERGE_SIMILARITIES_QUERY = """
+UNWIND $rows AS sim
+MATCH (e1:Entity {id: sim.id1})
+MATCH (e2:Entity {id: sim.id2})
+MERGE (e1)-[r:SIMILAR_TO]->(e2)
+SET r.combined_similarity = sim.combined_similarity,
+    r.embedding_similarity = sim.embedding_similarity,
+    r.jaccard_similarity = sim.jaccard_similarity
+"""
+
+SET_FINGERPRINTS_QUERY = """
+UNWIND $rows AS row
+MATCH (e:Entity {id: row.id})
+SET e.similarity_fingerprint = row.fingerprint
+"""
+
+
+class _Statement:
+    def __init__(self, query: str, rows: Optional[List[Any]], params: Dict[str, Any], batch_size: int,
+                 on_commit: Optional[Callable[[List[Dict[str, Any]]], None]]):
+        self.query = query
+        self.rows = rows
+        self.params = params
+        self.batch_size = batch_size
+        self.on_commit = on_commit
+
+
+class Neo4jUnitOfWork:
+    """
+    Collects graph mutations and writes them in one managed write transaction.
+
+    Row-based statements are sent as UNWIND batches of batch_size rows. The transaction is retried by the driver
+    on transient errors and either all mutations are written or none. The keyword index and the local vector
+    store are only updated once the transaction is committed.
+    """
+
+    def __init__(self, driver: Driver, batch_size: int = 1000, relationship_batch_size: int = None,
+                 health_monitor=None):
+        self.driver = driver
+        self.health_monitor = health_monitor
+        self.batch_size = batch_size
+        self.relationship_batch_size = relationship_batch_size or batch_size
+        self._statements: List[_Statement] = []
+
+    def add(self, query: str, rows: Optional[List[Any]] = None, batch_size: int = None,
+            on_commit: Callable[[List[Dict[str, Any]]], None] = None, **params: Any) -> None:
+        """
+        Adds a statement. With rows, the query reads them from $rows and is run once per batch; on_commit receives
+        the records it returned once the transaction is committed.
+        """
+        if rows is not None and not rows:
+            return
+        self._statements.append(_Statement(query, rows, params, batch_size or self.batch_size, on_commit))
+
+    def merge_project(self, project_name: str, project_type: str = None) -> None:
+        self.add(MERGE_PROJECT_QUERY, project_name=project_name, project_type=project_type)
+
+    def merge_diagram(self, project_name: str, diagram_type: str) -> None:
+        self.add(MERGE_DIAGRAM_QUERY, project_name=project_name, diagram_type=diagram_type)
+
+    def merge_entities(self, project_name: str, diagram_type: str, entities: List[Dict[str, Any]]) -> None:
+        """Entities of a diagram merged with merge_diagram in the same unit of work, or already stored."""
+        self.add(MERGE_ENTITIES_QUERY, entities, project_name=project_name, diagram_type=diagram_type,
+                 on_commit=lambda records: entity_keyword_index.upsert(
+                     {**entity, 'id': build_entity_id(project_name, diagram_type, entity['id'])}
+                     for entity in entities))
+
+    def set_embeddings(self, project_name: str, diagram_type: str, embeddings: Dict[str, List[float]]) -> None:
+        rows = [{'id': build_entity_id(project_name, diagram_type, entity_id), 'embedding': embedding}
+                for entity_id, embedding in embeddings.items()]
+
+        def update_vector_store(records: List[Dict[str, Any]]) -> None:
+            if entity_vector_store is not None:
+                embeddings_by_id = {row['id']: row['embedding'] for row in rows}
+                entity_vector_store.upsert({**record, 'embedding': embeddings_by_id[record['id']]}
+                                           for record in records)
+
+        self.add(SET_EMBEDDINGS_QUERY, rows, on_commit=update_vector_store)
+
+    def merge_relationships(self, project_name: str, diagram_type: str,
+                            relationships: List[Dict[str, Any]]) -> None:
+        rows_by_type = defaultdict(list)
+        for rel in relationships:
+            rows_by_type[rel['type'].upper()].append({'source': rel['source'], 'target': rel['target']})
+        for rel_type, rows in rows_by_type.items():
+            self.add(MERGE_RELATIONSHIPS_QUERY % rel_type.replace('`', '``'), rows,
+                     batch_size=self.relationship_batch_size, project_name=project_name, diagram_type=diagram_type)
+
+    def delete_relationships(self, project_name: str, diagram_type: str,
+                             relationships: List[Dict[str, Any]]) -> None:
+        rows_by_type = defaultdict(list)
+        for rel in relationships:
+            rows_by_type[rel['type'].upper()].append({'source': rel['source'], 'target': rel['target']})
+        for rel_type, rows in rows_by_type.items():
+            self.add(DELETE_RELATIONSHIPS_QUERY % rel_type.replace('`', '``'), rows,
+                     batch_size=self.relationship_batch_size, project_name=project_name, diagram_type=diagram_type)
+
+    def delete_entities(self, entity_ids: List[str]) -> None:
+        """Deletes entities (by graph id) with their relationships, and removes them from the search indexes."""
+        entity_ids = list(entity_ids)
+
+        def remove_from_indexes(records: List[Dict[str, Any]]) -> None:
+            entity_keyword_index.remove(entity_ids)
+            if entity_vector_store is not None:
+                entity_vector_store.remove(entity_ids)
+
+        self.add(DELETE_ENTITIES_QUERY, entity_ids, on_commit=remove_from_indexes)
+
+    def unlink_keywords(self, rows: List[Dict[str, str]]) -> None:
+        """Removes HAS_KEYWORD relationships, given as {'id': entity graph id, 'keyword': keyword name} rows."""
+        self.add(UNLINK_KEYWORDS_QUERY, rows)
+
+    def delete_similarities(self, entity_ids: List[str]) -> None:
+        self.add(DELETE_SIMILARITIES_QUERY, list(entity_ids))
+
+    def merge_similarities(self, similarities: List[Dict[str, Any]]) -> None:
+        self.add(MERGE_SIMILARITIES_QUERY, similarities)
+
+    def set_similarity_fingerprints(self, fingerprints: Dict[str, str]) -> None:
+        self.add(SET_FINGERPRINTS_QUERY,
+                 [{'id': entity_id, 'fingerprint': fingerprint} for entity_id, fingerprint in fingerprints.items()])
+
+    def commit(self) -> Dict[str, int]:
+        """Writes the collected statements and returns the summed update counters."""
+        if not self.driver:
+            raise RuntimeError("Neo4j is not connected")
+        statements, self._statements = self._statements, []
+        if not statements:
+            return {}
+
+        self._check_circuit()
+        try:
+            with self.driver.session() as session:
+                records, counters = session.execute_write(self._write, statements)
+        except (ServiceUnavailable, SessionExpired):
+            self._record(success=False)
+            raise
+        return self._committed(statements, records, counters)
+
+    def _check_circuit(self) -> None:
+        if self.health_monitor is not None and not self.health_monitor.allow_request():
+            raise ServiceUnavailable("Neo4j is unreachable (circuit breaker open)")
+
+    def _record(self, success: bool) -> None:
+        if self.health_monitor is not None:
+            if success:
+                self.health_monitor.record_success()
+            else:
+                self.health_monitor.record_failure()
+
+    def _committed(self, statements: List[_Statement], records: List[List[Dict[str, Any]]],
+                   counters: Dict[str, int]) -> Dict[str, int]:
+        self._record(success=True)
+        for statement, statement_records in zip(statements, records):
+            if statement.on_commit is not None:
+                statement.on_commit(statement_records)
+        logger.info(f"Unit of work committed: {len(statements)} statements, {counters}")
+        return counters
+
+    @staticmethod
+    def _batch_parameters(statement: _Statement) -> List[Dict[str, Any]]:
+        if statement.rows is None:
+            return [statement.params]
+        return [{**statement.params, 'rows': statement.rows[start:start + statement.batch_size]}
+                for start in range(0, len(statement.rows), statement.batch_size)]
+
+    @staticmethod
+    def _add_counters(counters: Dict[str, int], summary_counters: Any) -> None:
+        for name, value in vars(summary_counters).items():
+            if isinstance(value, int) and not isinstance(value, bool) and value:
+                counters[name] += value
+
+    @classmethod
+    def _write(cls, tx: ManagedTransaction, statements: List[_Statement]):
+        # Called again by the driver on retry: nothing is accumulated outside of this function
+        records, counters = [], defaultdict(int)
+        for statement in statements:
+            statement_records = []
+            for params in cls._batch_parameters(statement):
+                result = tx.run(statement.query, params)
+                statement_records.extend(result.data())
+                cls._add_counters(counters, result.consume().counters)
+            records.append(statement_records)
+        return records, dict(counters)
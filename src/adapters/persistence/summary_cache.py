@@ -0,0 +1,52 @@
+# src/adapters/persistence/summary_cache.py
+import hashlib
+import json
+import logging
+from typing import Dict, Any, Optional
+
+from src.adapters.persistence.sqlite_cache import SQLiteCache
+from src.domain.ports.summary_cache_protocol import SummaryCacheProtocol
+
+logger = logging.getLogger("uvicorn.error")
+
+_READ_BLOCK_SIZE = 1 << 20
+
+
+class SummaryCache(SummaryCacheProtocol):
+    """
+    Document and chunk summaries stored in a SQLiteCache.
+
+    Document keys hash the file bytes together with the model and the settings that shape the summary (chunking,
+    reduction), so changing either invalidates the document summary. Chunk keys only hash the model and the chunk
+    text: with content-defined chunk boundaries, the chunks an edit does not touch keep their text, hence their
+    summary. Chunk summaries are kept whether or not the completion cache is enabled.
+    """
+
+    def __init__(self, cache: SQLiteCache, model_name: str, settings: Dict[str, Any] = None):
+        self.cache = cache
+        self.model_name = model_name
+        self.settings = json.dumps(settings or {}, sort_keys=True, default=str)
+
+    def document_key(self, file_path: str) -> str:
+        digest = hashlib.sha256(f"document\x00{self.model_name}\x00{self.settings}\x00".encode("utf-8"))
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(_READ_BLOCK_SIZE), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def chunk_key(self, text: str) -> str:
+        return hashlib.sha256(f"chunk\x00{self.model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            value = self.cache.get(key)
+            return value.decode("utf-8") if value is not None else None
+        except Exception as e:
+            logger.warning(f"Summary cache unavailable: {str(e)}")
+            return None
+
+    def set(self, key: str, summary: str) -> None:
+        try:
+            self.cache.set(key, summary.encode("utf-8"))
+        except Exception as e:
+            logger.warning(f"Unable to store summary in cache: {str(e)}")
@@ -0,0 +1,122 @@
+# src/adapters/search/keyword_index.py
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Tuple, Any, Iterable, Optional
+
+from src.infrastructure.config import config
+
+logger = logging.getLogger("uvicorn.error")
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class KeywordIndex:
+    """
+    In-process inverted index (token -> entity postings) with BM25 scoring.
+
+    Entities are indexed on their name, description and keywords. The index is built once from the graph, kept
+    up to date by the persistence adapter when entities are written, and rebuilt after ``refresh_seconds`` to
+    pick up writes made by other processes.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, refresh_seconds: Optional[float] = 300):
+        self.k1 = k1
+        self.b = b
+        self.refresh_seconds = refresh_seconds
+        self.loaded_at: Optional[float] = None
+        self._lock = threading.RLock()
+        self._documents: Dict[str, Tuple[str, str]] = {}
+        self._terms: Dict[str, Counter] = {}
+        self._lengths: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+
+    def is_stale(self) -> bool:
+        if self.loaded_at is None:
+            return True
+        return self.refresh_seconds is not None and time.time() - self.loaded_at > self.refresh_seconds
+
+    def replace_all(self, entities: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._documents, self._terms, self._lengths, self._postings = {}, {}, {}, {}
+            self._total_length = 0
+            self._add(entities)
+            self.loaded_at = time.time()
+        logger.info(f"Keyword index built with {len(self._documents)} entities and {len(self._postings)} tokens")
+
+    def upsert(self, entities: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            entities = list(entities)
+            self._remove(entity['id'] for entity in entities)
+            self._add(entities)
+
+    def remove(self, entity_ids: Iterable[str]) -> None:
+        with self._lock:
+            self._remove(entity_ids)
+
+    def search(self, query: str, limit: int) -> List[Tuple[str, str]]:
+        return [(name, description) for name, description, _ in self.search_with_scores(query, limit)]
+
+    def search_with_scores(self, query: str, limit: int) -> List[Tuple[str, str, float]]:
+        """(name, description, BM25 score) of the best matching entities."""
+        query_tokens = set(tokenize(query))
+        with self._lock:
+            if not self._documents:
+                return []
+            document_count = len(self._documents)
+            average_length = self._total_length / document_count
+            scores: Dict[str, float] = {}
+            for token in query_tokens:
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+                idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for entity_id, frequency in postings.items():
+                    length_norm = 1 - self.b + self.b * self._lengths[entity_id] / average_length
+                    scores[entity_id] = scores.get(entity_id, 0.0) + idf * frequency * (self.k1 + 1) / (
+                            frequency + self.k1 * length_norm)
+
+            best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [(*self._documents[entity_id], score) for entity_id, score in best]
+
+    def _add(self, entities: Iterable[Dict[str, Any]]) -> None:
+        for entity in entities:
+            entity_id = entity['id']
+            name = entity.get('name') or ''
+            description = entity.get('description') or ''
+            keywords = entity.get('keywords') or []
+            terms = Counter(tokenize(f"{name} {description} {' '.join(map(str, keywords))}"))
+
+            self._documents[entity_id] = (entity.get('name'), entity.get('description'))
+            self._terms[entity_id] = terms
+            self._lengths[entity_id] = sum(terms.values())
+            self._total_length += self._lengths[entity_id]
+            for token, frequency in terms.items():
+                self._postings.setdefault(token, {})[entity_id] = frequency
+
+    def _remove(self, entity_ids: Iterable[str]) -> None:
+        for entity_id in entity_ids:
+            terms = self._terms.pop(entity_id, None)
+            if terms is None:
+                continue
+            self._documents.pop(entity_id, None)
+            self._total_length -= self._lengths.pop(entity_id)
+            for token in terms:
+                postings = self._postings[token]
+                postings.pop(entity_id, None)
+                if not postings:
+                    del self._postings[token]
+
+
+# Shared by the adapters of a process so that entity writes refresh the index used by the keyword fallback
+entity_keyword_index = KeywordIndex(
+    refresh_seconds=config.get_rag_config().get('keyword_index_refresh_seconds', 300))
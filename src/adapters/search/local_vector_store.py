@@ -0,0 +1,200 @@
+# src/adapters/search/local_vector_store.py
+import fcntl
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Tuple, Any, Iterable, Optional
+
+import numpy as np
+
+from src.infrastructure.config import config
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class LocalVectorStore:
+    """
+    Memory-mapped float32 mirror of the ``entity_embeddings`` vector index.
+
+    Unit-normalized embeddings are stored row by row in ``vectors.f32`` and the entity ids, names and descriptions
+    in ``entities.json``. Writers serialize on a lock file and readers of other processes re-map the files when the
+    metadata changes, so the API and the Celery workers share the same store.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._metadata_path = os.path.join(directory, "entities.json")
+        self._lock_path = os.path.join(directory, ".lock")
+        self._lock = threading.RLock()
+        self._vectors: Optional[np.memmap] = None
+        self._dimension = 0
+        self._ids: List[str] = []
+        self._names: List[str] = []
+        self._descriptions: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._metadata_mtime: Optional[float] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._reload_if_changed()
+            return len(self._ids)
+
+    def search(self, embedding: List[float], k: int) -> List[Tuple[str, str, str, float]]:
+        """
+        :return: (id, name, description, cosine score) of the k nearest entities, best first.
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        with self._lock:
+            self._reload_if_changed()
+            count = len(self._ids)
+            if count == 0 or norm == 0 or len(query) != self._dimension:
+                return []
+            scores = self._vectors[:count] @ (query / norm)
+            k = min(k, count)
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best])]
+            return [(self._ids[row], self._names[row], self._descriptions[row], float(scores[row]))
+                    for row in best.tolist()]
+
+    def upsert(self, entities: Iterable[Dict[str, Any]]) -> None:
+        """Adds or replaces entities given as dicts with ``id``, ``name``, ``description`` and ``embedding``."""
+        entities = [entity for entity in entities if entity.get('embedding')]
+        if not entities:
+            return
+        with self._lock, self._file_lock():
+            self._reload_if_changed()
+            self._write(entities)
+
+    def replace_all(self, entities: Iterable[Dict[str, Any]]) -> None:
+        with self._lock, self._file_lock():
+            self._reset()
+            self._write([entity for entity in entities if entity.get('embedding')])
+
+    def remove(self, entity_ids: Iterable[str]) -> None:
+        with self._lock, self._file_lock():
+            self._reload_if_changed()
+            removed = False
+            for entity_id in entity_ids:
+                row = self._rows.pop(entity_id, None)
+                if row is None:
+                    continue
+                # The last row takes the place of the removed one
+                last = len(self._ids) - 1
+                if row != last:
+                    self._vectors[row] = self._vectors[last]
+                    self._ids[row], self._names[row] = self._ids[last], self._names[last]
+                    self._descriptions[row] = self._descriptions[last]
+                    self._rows[self._ids[row]] = row
+                self._ids.pop()
+                self._names.pop()
+                self._descriptions.pop()
+                removed = True
+            if removed:
+                self._save_metadata()
+
+    def _write(self, entities: List[Dict[str, Any]]) -> None:
+        if not entities:
+            self._save_metadata()
+            return
+        dimension = len(entities[0]['embedding'])
+        if self._dimension and dimension != self._dimension:
+            logger.warning(f"Embedding dimension changed from {self._dimension} to {dimension}, resetting store")
+            self._reset()
+        self._dimension = dimension
+
+        for entity in entities:
+            if len(entity['embedding']) != dimension:
+                logger.warning(f"Ignoring embedding of entity {entity['id']} with {len(entity['embedding'])} "
+                               f"dimensions in local vector store")
+                continue
+            row = self._rows.get(entity['id'])
+            if row is None:
+                row = len(self._ids)
+                self._ensure_capacity(row + 1)
+                self._ids.append(entity['id'])
+                self._names.append(entity.get('name'))
+                self._descriptions.append(entity.get('description'))
+                self._rows[entity['id']] = row
+            else:
+                self._names[row] = entity.get('name')
+                self._descriptions[row] = entity.get('description')
+            vector = np.asarray(entity['embedding'], dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            self._vectors[row] = vector / norm if norm > 0 else vector
+
+        self._vectors.flush()
+        self._save_metadata()
+
+    def _ensure_capacity(self, rows: int) -> None:
+        capacity = len(self._vectors) if self._vectors is not None else 0
+        if rows <= capacity:
+            return
+        capacity = max(rows, capacity * 2, 1024)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vectors_path, "ab") as file:
+            file.truncate(capacity * self._dimension * 4)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self._dimension))
+
+    def _save_metadata(self) -> None:
+        temporary_path = f"{self._metadata_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump({"dimension": self._dimension, "ids": self._ids, "names": self._names,
+                       "descriptions": self._descriptions}, file, ensure_ascii=False)
+        os.replace(temporary_path, self._metadata_path)
+        self._metadata_mtime = os.stat(self._metadata_path).st_mtime
+
+    def _reload_if_changed(self) -> None:
+        try:
+            mtime = os.stat(self._metadata_path).st_mtime
+        except FileNotFoundError:
+            return
+        if mtime == self._metadata_mtime:
+            return
+
+        with open(self._metadata_path, "r", encoding="utf-8") as file:
+            metadata = json.load(file)
+        self._dimension = metadata["dimension"]
+        self._ids = metadata["ids"]
+        self._names = metadata["names"]
+        self._descriptions = metadata["descriptions"]
+        self._rows = {entity_id: row for row, entity_id in enumerate(self._ids)}
+        self._vectors = None
+        if self._dimension:
+            capacity = os.path.getsize(self._vectors_path) // (self._dimension * 4)
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+",
+                                      shape=(capacity, self._dimension))
+        self._metadata_mtime = mtime
+
+    def _reset(self) -> None:
+        self._vectors = None
+        self._dimension = 0
+        self._ids, self._names, self._descriptions, self._rows = [], [], [], {}
+        if os.path.exists(self._vectors_path):
+            os.remove(self._vectors_path)
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self._lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _create_entity_vector_store() -> Optional[LocalVectorStore]:
+    store_config = config.get_rag_config().get('local_vector_store', {})
+    if not store_config.get('enabled', False):
+        return None
+    return LocalVectorStore(store_config.get('path', '.cache/vector_store'))
+
+
+# Shared by the adapters of a process, kept in sync by Neo4jPersistenceAdapter.update_embeddings
+entity_vector_store = _create_entity_vector_store()
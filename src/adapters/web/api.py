@@ -12,7 +12,7 @@ from src.infrastructure.dependencies import (
     get_project_manager,
     get_project_processing_service,
     get_neo4j_processing_service,
-    get_neo4j_adapter,
+    get_async_neo4j_adapter,
     get_async_task_adapter
 )
 from src.infrastructure.app_state import app_state, AppState
@@ -28,6 +28,8 @@ async def lifespan(app: FastAPI):
         # Initialisation des propriétés cached si nécessaire
         _ = app_state.project_manager
         _ = app_state.neo4j_adapter
+        await app_state.async_neo4j_adapter.connect()
+        await app_state.async_neo4j_adapter.ensure_schema()
         
         # Initialisation de CeleryAppState
         _ = celery_app_state.project_processing_service
@@ -41,6 +43,7 @@ async def lifespan(app: FastAPI):
     yield
     
     app_state.close_neo4j()
+    await app_state.close_async_neo4j()
     logger.info("Application state cleaned up.")
 
 
@@ -56,21 +59,31 @@ app.add_middleware(
 
 
 @app.get("/test-neo4j-connection")
-async def test_neo4j_connection(neo4j_adapter=Depends(get_neo4j_adapter)) -> Dict[str, Any]:
-    is_connected = neo4j_adapter.is_connected()
+async def test_neo4j_connection(neo4j_adapter=Depends(get_async_neo4j_adapter)) -> Dict[str, Any]:
+    is_connected = await neo4j_adapter.is_connected()
     return {
         "status": "connected" if is_connected else "disconnected",
         "message": "Neo4j connection successful" if is_connected else "Unable to connect to Neo4j"
     }
 
 
+@app.get("/neo4j-schema")
+async def neo4j_schema(neo4j_adapter=Depends(get_async_neo4j_adapter)) -> Dict[str, Any]:
+    try:
+        return await neo4j_adapter.check_schema()
+    except Exception as e:
+        logger.exception(f"Error checking Neo4j schema: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/process/{project_name}")
 async def process_project(
         project_name: str,
+        use_cache: bool = True,
         project_processing_service=Depends(get_project_processing_service)
 ) -> Dict[str, Any]:
     try:
-        return await project_processing_service.process_project(project_name)
+        return await project_processing_service.process_project(project_name, use_cache)
     except Exception as e:
         logger.exception(f"Error starting project processing: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -80,13 +93,14 @@ async def process_project(
 async def process_project_diagram(
         project_name: str,
         diagram_type: str,
+        use_cache: bool = True,
         project_manager=Depends(get_project_manager),
         project_processing_service=Depends(get_project_processing_service)
 ) -> Dict[str, Any]:
     if diagram_type not in project_manager.get_diagram_types():
         raise HTTPException(status_code=400, detail=f"Invalid diagram type: {diagram_type}")
     try:
-        return await project_processing_service.process_project_diagram(project_name, diagram_type)
+        return await project_processing_service.process_project_diagram(project_name, diagram_type, use_cache)
     except Exception as e:
         logger.exception(f"Error starting diagram processing: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -96,13 +110,14 @@ async def process_project_diagram(
 async def extract_json(
         project_name: str,
         diagram_type: str,
+        use_cache: bool = True,
         project_manager=Depends(get_project_manager),
         project_processing_service=Depends(get_project_processing_service)
 ) -> Dict[str, Any]:
     if diagram_type not in project_manager.get_diagram_types():
         raise HTTPException(status_code=400, detail=f"Invalid diagram type: {diagram_type}")
     try:
-        return await project_processing_service.extract_json(project_name, diagram_type)
+        return await project_processing_service.extract_json(project_name, diagram_type, use_cache)
     except Exception as e:
         logger.exception(f"Error starting JSON extraction: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -114,9 +129,9 @@ async def process_neo4j_data(
         diagram_type: str,
         project_manager=Depends(get_project_manager),
         neo4j_processing_service=Depends(get_neo4j_processing_service),
-        neo4j_adapter=Depends(get_neo4j_adapter)
+        neo4j_adapter=Depends(get_async_neo4j_adapter)
 ) -> Dict[str, Any]:
-    if not neo4j_adapter.is_connected():
+    if not await neo4j_adapter.is_connected():
         return {"status": "error", "message": "Neo4j is not available. Please try again later."}
     if diagram_type not in project_manager.get_diagram_types():
         raise HTTPException(status_code=400, detail=f"Invalid diagram type: {diagram_type}")
@@ -0,0 +1,92 @@
+# src/adapters/web/cached_embedding_adapter.py
+import hashlib
+import logging
+from typing import List, Dict, Any
+
+import numpy as np
+
+from src.adapters.persistence.sqlite_cache import SQLiteCache
+from src.domain.ports.embedding_adapter_protocol import EmbeddingAdapterProtocol
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class CachedEmbeddingAdapter(EmbeddingAdapterProtocol):
+    """
+    Content-addressed cache in front of an embedding adapter.
+
+    Embeddings are keyed by model name and a hash of the text, so unchanged descriptions and repeated queries are
+    never sent to the embedding API twice.
+    """
+
+    def __init__(self, embedding_adapter: EmbeddingAdapterProtocol, cache: SQLiteCache, model_name: str):
+        self.embedding_adapter = embedding_adapter
+        self.cache = cache
+        self.model_name = model_name
+
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        cached = self._load(keys)
+        missing = list({key: text for key, text in zip(keys, texts) if key not in cached}.items())
+
+        if missing:
+            embeddings = self.embedding_adapter.get_embeddings([text for _, text in missing])
+            if len(embeddings) != len(missing):
+                return []
+            computed = {key: embedding for (key, _), embedding in zip(missing, embeddings)}
+            self._store(computed)
+            cached.update(computed)
+
+        return [cached[key] for key in keys]
+
+    def get_query_embedding(self, query: str) -> List[float]:
+        key = self._key(query)
+        cached = self._load([key])
+        if key in cached:
+            return cached[key]
+
+        embedding = self.embedding_adapter.get_query_embedding(query)
+        if embedding:
+            self._store({key: embedding})
+        return embedding
+
+    def get_embeddings_dict(self, entities: List[Dict[str, Any]], diagram_type: str) -> Dict[str, List[float]]:
+        keyed_entities = [{**entity, 'id': entity.get('id', f"{diagram_type}_{index}")}
+                          for index, entity in enumerate(entities) if 'description' in entity]
+        keys = {entity['id']: self._key(entity['description']) for entity in keyed_entities}
+        cached = self._load(list(keys.values()))
+
+        missing_entities = [entity for entity in keyed_entities if keys[entity['id']] not in cached]
+        computed = {}
+        if missing_entities:
+            computed = self.embedding_adapter.get_embeddings_dict(missing_entities, diagram_type)
+            self._store({keys[entity_id]: embedding for entity_id, embedding in computed.items()})
+
+        logger.info(f"Embedding cache: {len(keyed_entities) - len(missing_entities)} hits, "
+                    f"{len(missing_entities)} misses ({self.cache.stats()})")
+        embeddings_dict = {}
+        for entity in keyed_entities:
+            entity_id = entity['id']
+            if entity_id in computed:
+                embeddings_dict[entity_id] = computed[entity_id]
+            elif keys[entity_id] in cached:
+                embeddings_dict[entity_id] = cached[keys[entity_id]]
+        return embeddings_dict
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _load(self, keys: List[str]) -> Dict[str, List[float]]:
+        try:
+            return {key: np.frombuffer(value, dtype=np.float64).tolist()
+                    for key, value in self.cache.get_many(keys).items()}
+        except Exception as e:
+            logger.warning(f"Embedding cache unavailable: {str(e)}")
+            return {}
+
+    def _store(self, embeddings: Dict[str, List[float]]) -> None:
+        try:
+            self.cache.set_many({key: np.asarray(embedding, dtype=np.float64).tobytes()
+                                 for key, embedding in embeddings.items() if embedding})
+        except Exception as e:
+            logger.warning(f"Unable to store embeddings in cache: {str(e)}")
@@ -0,0 +1,123 @@
+# src/adapters/web/completion_cache.py
+import hashlib
+import logging
+import os
+import threading
+from typing import Any, Callable, Iterator, Optional
+
+from src.adapters.persistence.sqlite_cache import SQLiteCache
+from src.infrastructure.config import config
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class CompletionCache:
+    """
+    Disk cache of LLM completions, keyed by model, temperature and a hash of the rendered prompt.
+
+    Only deterministic calls (temperature 0) are cached. The SQLite connection is opened lazily in each process,
+    so the cache can be created before Celery forks its workers.
+    """
+
+    def __init__(self, path: str, max_entries: int = 20000, ttl_seconds: Optional[float] = None,
+                 enabled: bool = True):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._cache: Optional[SQLiteCache] = None
+        self._pid: Optional[int] = None
+
+    def complete(self, chat_model: Any, prompt_value: Any, use_cache: bool = True) -> str:
+        """Invokes the chat model on a rendered prompt and returns the completion text."""
+        return self.get_or_create(chat_model, "completion", prompt_value.to_string(),
+                                  lambda: chat_model.invoke(prompt_value).content, use_cache)
+
+    def stream(self, chat_model: Any, prompt_value: Any, use_cache: bool = True) -> Iterator[str]:
+        """
+        Streams the completion text of a rendered prompt. A cached completion is yielded at once, a streamed one
+        is stored when the stream completes.
+        """
+        if not self._is_cacheable(chat_model):
+            for chunk in chat_model.stream(prompt_value):
+                yield chunk.content
+            return
+
+        key = self._key(chat_model, "completion", prompt_value.to_string())
+        cached = self._load(key) if use_cache else None
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        for chunk in chat_model.stream(prompt_value):
+            chunks.append(chunk.content)
+            yield chunk.content
+        if any(chunks):
+            self._store(key, ''.join(chunks))
+
+    def get_or_create(self, chat_model: Any, kind: str, prompt: str, create: Callable[[], str],
+                      use_cache: bool = True) -> str:
+        """
+        Returns the cached output of ``create`` for this model and prompt, calling it on a miss.
+
+        :param kind: Distinguishes outputs of different chains built on the same input text.
+        :param use_cache: False bypasses the cache for this call (the fresh result is still stored).
+        """
+        if not self._is_cacheable(chat_model):
+            return create()
+
+        key = self._key(chat_model, kind, prompt)
+        if use_cache:
+            cached = self._load(key)
+            if cached is not None:
+                logger.debug(f"Completion cache hit for {kind} ({key[:12]})")
+                return cached
+
+        result = create()
+        if isinstance(result, str) and result:
+            self._store(key, result)
+        return result
+
+    def _is_cacheable(self, chat_model: Any) -> bool:
+        return self.enabled and getattr(chat_model, 'temperature', None) == 0
+
+    @staticmethod
+    def _key(chat_model: Any, kind: str, prompt: str) -> str:
+        model_name = getattr(chat_model, 'model_name', None) or getattr(chat_model, 'model', '')
+        payload = f"{kind}\x00{model_name}\x00{chat_model.temperature}\x00{prompt}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _get_cache(self) -> SQLiteCache:
+        with self._lock:
+            if self._cache is None or self._pid != os.getpid():
+                self._cache = SQLiteCache(self.path, max_entries=self.max_entries, ttl_seconds=self.ttl_seconds,
+                                          table="completions")
+                self._pid = os.getpid()
+            return self._cache
+
+    def _load(self, key: str) -> Optional[str]:
+        try:
+            value = self._get_cache().get(key)
+            return value.decode("utf-8") if value is not None else None
+        except Exception as e:
+            logger.warning(f"Completion cache unavailable: {str(e)}")
+            return None
+
+    def _store(self, key: str, completion: str) -> None:
+        try:
+            self._get_cache().set(key, completion.encode("utf-8"))
+        except Exception as e:
+            logger.warning(f"Unable to store completion in cache: {str(e)}")
+
+
+def _create_completion_cache() -> CompletionCache:
+    cache_config = config.get_completion_cache_config()
+    return CompletionCache(cache_config.get('path', '.cache/completions.sqlite3'),
+                           max_entries=cache_config.get('max_entries', 20000),
+                           ttl_seconds=cache_config.get('ttl_seconds'),
+                           enabled=cache_config.get('enabled', False))
+
+
+# Shared by the LLM adapters of a process
+completion_cache = _create_completion_cache()
@@ -1,12 +1,16 @@
 import logging
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Union, Iterable, Iterator
 from pathlib import Path
-from PyPDF2 import PdfReader
+import tiktoken
 from docx import Document as DocxDocument
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.docstore.document import Document
 from langchain.chains.summarize import load_summarize_chain
 
+from src.adapters.web.completion_cache import completion_cache
+from src.adapters.web.paragraph_text_splitter import ParagraphTextSplitter
+from src.adapters.web.pdf_extraction import ParallelPdfExtractor
+from src.adapters.web.token_text_splitter import TiktokenTextSplitter
 from src.domain.ports.document_adapter_protocol import DocumentAdapterProtocol
 from src.infrastructure.config import config
 
@@ -16,15 +20,46 @@ logger = logging.getLogger("uvicorn.error")
 class DocumentAdapter(DocumentAdapterProtocol):
     def __init__(self, openai_chat: Any):
         self.openai_chat = openai_chat
+        self.completion_cache = completion_cache
         self.text_splitter_config = config.get_text_splitter_config()
+        self._encoding = None
         self.text_splitter = self._create_text_splitter()
+        self.pdf_extractor = self._create_pdf_extractor()
     
-    def _create_text_splitter(self) -> RecursiveCharacterTextSplitter:
-        return RecursiveCharacterTextSplitter(
-            chunk_size=self.text_splitter_config["chunk_size"],
-            chunk_overlap=self.text_splitter_config["chunk_overlap"],
-            length_function=len,
-            separators=self.text_splitter_config.get("separators", ["\n\n", "\n", " ", ""])
+    def _create_text_splitter(self, chunk_size: int = None, chunk_overlap: int = None) -> Union[
+            RecursiveCharacterTextSplitter, TiktokenTextSplitter, ParagraphTextSplitter]:
+        chunk_size = chunk_size if chunk_size is not None else self.text_splitter_config["chunk_size"]
+        chunk_overlap = chunk_overlap if chunk_overlap is not None else self.text_splitter_config["chunk_overlap"]
+        encoding = self._get_encoding() if self._measures_tokens() else None
+        if encoding is not None:
+            window_splitter = TiktokenTextSplitter(encoding, chunk_size, chunk_overlap)
+            length_function = self.count_tokens
+        else:
+            if self._measures_tokens():
+                # Same estimate of 4 characters per token as count_tokens
+                chunk_size, chunk_overlap = chunk_size * 4, chunk_overlap * 4
+            window_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                length_function=len,
+                separators=self.text_splitter_config.get("separators", ["\n\n", "\n", " ", ""])
+            )
+            length_function = len
+        if self.text_splitter_config.get("boundaries", "windows") == "paragraphs":
+            return ParagraphTextSplitter(window_splitter, length_function, chunk_size)
+        return window_splitter
+    
+    def _measures_tokens(self) -> bool:
+        return self.text_splitter_config.get("length_unit", "characters") == "tokens"
+    
+    @staticmethod
+    def _create_pdf_extractor() -> ParallelPdfExtractor:
+        extraction_config = config.get_processing_config().get("pdf_extraction", {})
+        return ParallelPdfExtractor(
+            enabled=extraction_config.get("parallel", True),
+            min_pages=extraction_config.get("min_pages", 40),
+            max_workers=extraction_config.get("max_workers", 0),
+            pages_per_task=extraction_config.get("pages_per_task", 16)
         )
     
     def load_document(self, file_path: str) -> str:
@@ -43,37 +78,115 @@ class DocumentAdapter(DocumentAdapterProtocol):
             logger.error(f"Error loading document {file_path}: {str(e)}")
             raise
     
-    @staticmethod
-    def _load_pdf(file_path: Path) -> str:
-        with file_path.open("rb") as file:
-            pdf_reader = PdfReader(file)
-            return "\n".join(page.extract_text() for page in pdf_reader.pages)
+    def stream_document(self, file_path: str) -> Iterator[str]:
+        """Yields the pages of a PDF or the paragraphs of a DOCX as they are read."""
+        logger.info(f"Starting streamed document loading: {file_path}")
+        file_path = Path(file_path)
+        if file_path.suffix == ".pdf":
+            yield from self._iter_pdf_pages(file_path)
+        elif file_path.suffix == ".docx":
+            yield from self._iter_docx_paragraphs(file_path)
+        else:
+            raise ValueError(f"Unsupported file format: {file_path.suffix}")
+        logger.info(f"Document streamed successfully: {file_path}")
+    
+    def _load_pdf(self, file_path: Path) -> str:
+        return "\n".join(self._iter_pdf_pages(file_path))
+    
+    @classmethod
+    def _load_docx(cls, file_path: Path) -> str:
+        return "\n".join(cls._iter_docx_paragraphs(file_path))
+    
+    def _iter_pdf_pages(self, file_path: Path) -> Iterator[str]:
+        return self.pdf_extractor.iter_pages(file_path)
     
     @staticmethod
-    def _load_docx(file_path: Path) -> str:
+    def _iter_docx_paragraphs(file_path: Path) -> Iterator[str]:
         docx_doc = DocxDocument(file_path)
-        return "\n".join(para.text for para in docx_doc.paragraphs)
+        for para in docx_doc.paragraphs:
+            yield para.text
     
     def split_text(self, text: str, chunk_size: int = None, chunk_overlap: int = None) -> List[Document]:
         logger.info("Starting text splitting")
         try:
-            chunk_size = chunk_size or self.text_splitter_config["chunk_size"]
-            chunk_overlap = chunk_overlap or self.text_splitter_config["chunk_overlap"]
+            text_splitter = self.text_splitter
+            if chunk_size is not None or chunk_overlap is not None:
+                text_splitter = self._create_text_splitter(chunk_size, chunk_overlap)
             
-            chunks = self.text_splitter.split_text(text)
+            chunks = text_splitter.split_text(text)
             logger.info(f"Text split into {len(chunks)} chunks")
             return [Document(page_content=chunk) for chunk in chunks]
         except Exception as e:
             logger.error(f"Error during text splitting: {str(e)}")
             raise
     
-    def process_document(self, doc: Union[Document, List[Document]]) -> Dict[str, str]:
+    def split_stream(self, segments: Iterable[str]) -> Iterator[Document]:
+        """
+        Splits a stream of pages or paragraphs into chunks, yielding each chunk as soon as the text following it
+        has been read.
+
+        Segments are buffered until they cover a few chunks. The last chunk of each split is carried over to the
+        next one, so chunks keep the configured size and overlap across buffer boundaries.
+        """
+        flush_size = self.text_splitter_config["chunk_size"] * 4
+        if self._measures_tokens():
+            flush_size *= 4
+        buffer, buffer_size, chunk_count = [], 0, 0
+        for segment in segments:
+            buffer.append(segment)
+            buffer_size += len(segment) + 1
+            if buffer_size < flush_size:
+                continue
+            chunks = self.text_splitter.split_text("\n".join(buffer))
+            for chunk in chunks[:-1]:
+                chunk_count += 1
+                yield Document(page_content=chunk)
+            buffer = chunks[-1:]
+            buffer_size = sum(len(chunk) for chunk in buffer)
+        
+        if buffer:
+            for chunk in self.text_splitter.split_text("\n".join(buffer)):
+                chunk_count += 1
+                yield Document(page_content=chunk)
+        logger.info(f"Text stream split into {chunk_count} chunks")
+    
+    def process_document(self, doc: Union[Document, List[Document]], use_cache: bool = True) -> Dict[str, str]:
         logger.info("Starting document processing")
         try:
-            chain = load_summarize_chain(self.openai_chat, chain_type="stuff")
-            result = chain.invoke([doc] if isinstance(doc, Document) else doc)
+            docs = [doc] if isinstance(doc, Document) else doc
+            summary = self.completion_cache.get_or_create(
+                self.openai_chat, "summarize:stuff", "\n\n".join(d.page_content for d in docs),
+                lambda: self._summarize(docs), use_cache)
             logger.info("Document processed successfully")
-            return {"summary": result['output_text'] if isinstance(result, dict) else result}
+            return {"summary": summary}
         except Exception as e:
             logger.error(f"Error during document processing: {str(e)}")
             raise
+    
+    def summarize_texts(self, texts: List[str], use_cache: bool = True) -> str:
+        """Summary of several texts at once, used to reduce chunk summaries."""
+        return self.process_document([Document(page_content=text) for text in texts], use_cache)["summary"]
+    
+    def count_tokens(self, text: str) -> int:
+        encoding = self._get_encoding()
+        if encoding is None:
+            # Rough estimate of 4 characters per token
+            return len(text) // 4 + 1
+        return len(encoding.encode(text, disallowed_special=()))
+    
+    def _get_encoding(self):
+        if self._encoding is None:
+            try:
+                try:
+                    self._encoding = tiktoken.encoding_for_model(self.openai_chat.model_name)
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                logger.warning(f"Tokenizer unavailable, estimating token counts: {str(e)}")
+                self._encoding = False
+        return self._encoding or None
+    
+    def _summarize(self, docs: List[Document]) -> str:
+        chain = load_summarize_chain(self.openai_chat, chain_type="stuff")
+        result = chain.invoke(docs)
+        return result['output_text'] if isinstance(result, dict) else result
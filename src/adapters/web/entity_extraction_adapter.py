@@ -2,10 +2,15 @@
 import logging
 import json
 import re
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Iterator, Tuple
 from langchain.prompts import ChatPromptTemplate
 
+from src.adapters.parsing.mermaid_parser import parse_mermaid, split_diagram
+from src.adapters.parsing.streaming_json import ExtractionStreamParser
+from src.adapters.web.completion_cache import completion_cache
 from src.domain.ports.entity_extraction_adapter_protocol import EntityExtractionAdapterProtocol
+from src.infrastructure.config import config
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -13,13 +18,137 @@ logger = logging.getLogger("uvicorn.error")
 class EntityExtractionAdapter(EntityExtractionAdapterProtocol):
     def __init__(self, openai_chat):
         self.openai_chat = openai_chat
+        self.completion_cache = completion_cache
+        self.extraction_config = config.get_entity_extraction_config()
 
-    def extract_entities_and_relationships(self, diagram_content: str) -> Dict[str, Any]:
+    def extract_entities_and_relationships(self, diagram_content: str, use_cache: bool = True) -> Dict[str, Any]:
+        if self.extraction_config.get('mode', 'parser') == 'parser':
+            parsed_content = parse_mermaid(diagram_content)
+            if parsed_content["entities"]:
+                if self.extraction_config.get('enrich_missing', True):
+                    self._enrich_missing_fields(parsed_content["entities"], diagram_content, use_cache)
+                self._log_extraction_results(parsed_content)
+                return parsed_content
+            logger.info("Aucune entité trouvée par l'analyseur Mermaid, extraction par le LLM")
+        return self._extract_with_llm(diagram_content, use_cache)
+
+    def stream_entities_and_relationships(self, diagram_content: str,
+                                          use_cache: bool = True) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yields ("entity", entity) and ("relationship", relationship) records as soon as they are available.
+
+        With the local parser, relationships and complete entities are yielded at once and the other entities as
+        the enrichment completion streams in. The LLM completion of a diagram, or of the parser fallback, is parsed
+        incrementally; segments of large diagrams share entities, so they are merged before being yielded.
+        """
+        counts = {"entity": 0, "relationship": 0}
+        try:
+            for kind, record in self._stream_records(diagram_content, use_cache):
+                counts[kind] += 1
+                yield kind, record
+        except Exception as e:
+            logger.exception(f"Erreur lors de l'extraction en flux des entités et relations : {str(e)}")
+        logger.info(f"Extraction en flux : {counts['entity']} entités et {counts['relationship']} relations trouvées")
+
+    def _stream_records(self, diagram_content: str, use_cache: bool) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        if self.extraction_config.get('mode', 'parser') == 'parser':
+            parsed_content = parse_mermaid(diagram_content)
+            if parsed_content["entities"]:
+                yield from self._stream_parsed_content(parsed_content, diagram_content, use_cache)
+                return
+            logger.info("Aucune entité trouvée par l'analyseur Mermaid, extraction par le LLM")
+
+        if len(diagram_content) > self.extraction_config.get('max_segment_chars', 6000):
+            extracted = self._extract_with_llm(diagram_content, use_cache)
+            yield from (("entity", entity) for entity in extracted.get("entities", []))
+            yield from (("relationship", relationship) for relationship in extracted.get("relationships", []))
+            return
+
+        parser = ExtractionStreamParser()
+        prompt = self._create_prompt_template()
+        for text in self.completion_cache.stream(self.openai_chat, prompt.invoke({"content": diagram_content}),
+                                                 use_cache):
+            yield from parser.feed(text)
+
+    def _stream_parsed_content(self, parsed_content: Dict[str, Any], diagram_content: str,
+                               use_cache: bool) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        entities = parsed_content["entities"]
+        incomplete = self._incomplete_entities(entities) if self.extraction_config.get('enrich_missing', True) else []
+        yield from (("entity", entity) for entity in entities if not any(entity is other for other in incomplete))
+        yield from (("relationship", relationship) for relationship in parsed_content["relationships"])
+        if not incomplete:
+            return
+
+        remaining = list(incomplete)
+        try:
+            parser = ExtractionStreamParser()
+            for text in self.completion_cache.stream(
+                    self.openai_chat, self._enrichment_prompt(diagram_content, incomplete), use_cache):
+                for kind, enrichment in parser.feed(text):
+                    for entity in [entity for entity in remaining if entity["name"] == enrichment.get("name")]:
+                        remaining.remove(entity)
+                        self._apply_enrichment(entity, enrichment)
+                        yield "entity", entity
+        except Exception as e:
+            logger.warning(f"Enrichissement des entités impossible : {str(e)}")
+        yield from (("entity", entity) for entity in remaining)
+        logger.info(f"{len(incomplete) - len(remaining)} entités complétées par le LLM")
+
+    def _extract_with_llm(self, diagram_content: str, use_cache: bool) -> Dict[str, Any]:
+        max_segment_chars = self.extraction_config.get('max_segment_chars', 6000)
+        if len(diagram_content) <= max_segment_chars:
+            return self._extract_segment(diagram_content, use_cache)
+
+        segments = split_diagram(diagram_content, max_segment_chars)
+        logger.info(f"Extraction du diagramme en {len(segments)} segments")
+        with ThreadPoolExecutor(max_workers=self.extraction_config.get('max_parallel_segments', 4)) as executor:
+            results = list(executor.map(lambda segment: self._extract_segment(segment, use_cache), segments))
+        merged_content = self._merge_results(results)
+        self._log_extraction_results(merged_content)
+        return merged_content
+
+    @staticmethod
+    def _merge_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Merges segment extractions: entities are deduplicated by name (case insensitive), keeping the longest
+        description and every keyword, and relationships are rewritten on the merged names and deduplicated.
+        """
+        entities: Dict[str, Dict[str, Any]] = {}
+        for result in results:
+            for entity in result.get("entities", []):
+                if not entity.get("name"):
+                    continue
+                key = entity["name"].strip().lower()
+                merged = entities.get(key)
+                if merged is None:
+                    entities[key] = {**entity, "keywords": list(entity.get("keywords") or [])}
+                    continue
+                if len(entity.get("description") or "") > len(merged.get("description") or ""):
+                    merged["description"] = entity["description"]
+                merged["type"] = merged.get("type") or entity.get("type")
+                merged["keywords"] += [keyword for keyword in entity.get("keywords") or []
+                                       if keyword not in merged["keywords"]]
+
+        relationships, seen = [], set()
+        for result in results:
+            for relationship in result.get("relationships", []):
+                source, target = relationship.get("source"), relationship.get("target")
+                if not source or not target:
+                    continue
+                source = entities.get(source.strip().lower(), {}).get("name", source)
+                target = entities.get(target.strip().lower(), {}).get("name", target)
+                key = (source, target, relationship.get("type"))
+                if key not in seen:
+                    seen.add(key)
+                    relationships.append({**relationship, "source": source, "target": target})
+        return {"entities": list(entities.values()), "relationships": relationships}
+
+    def _extract_segment(self, diagram_content: str, use_cache: bool) -> Dict[str, Any]:
         try:
             prompt = self._create_prompt_template()
-            chain = prompt | self.openai_chat
-            result = chain.invoke({"content": diagram_content})
-            return self._process_result(result.content)
+            result = self.completion_cache.complete(self.openai_chat, prompt.invoke({"content": diagram_content}),
+                                                    use_cache)
+            return self._process_result(result)
         except Exception as e:
             logger.exception(f"Erreur lors de l'extraction des entités et relations : {str(e)}")
             return {"entities": [], "relationships": []}
@@ -54,6 +183,58 @@ class EntityExtractionAdapter(EntityExtractionAdapterProtocol):
         Assurez-vous que la sortie est un JSON valide sans aucun texte supplémentaire.
         """)
 
+    def _enrich_missing_fields(self, entities: List[Dict[str, Any]], diagram_content: str, use_cache: bool) -> None:
+        """Asks the LLM for the descriptions and keywords that the diagram does not provide."""
+        incomplete = self._incomplete_entities(entities)
+        if not incomplete:
+            return
+        try:
+            result = self.completion_cache.complete(self.openai_chat,
+                                                    self._enrichment_prompt(diagram_content, incomplete), use_cache)
+            enriched = {entity.get("name"): entity for entity in self._process_result(result).get("entities", [])}
+        except Exception as e:
+            logger.warning(f"Enrichissement des entités impossible : {str(e)}")
+            return
+        for entity in incomplete:
+            self._apply_enrichment(entity, enriched.get(entity["name"], {}))
+        logger.info(f"{len(incomplete)} entités complétées par le LLM")
+
+    @staticmethod
+    def _incomplete_entities(entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [entity for entity in entities if not entity.get("description") or not entity.get("keywords")]
+
+    @staticmethod
+    def _apply_enrichment(entity: Dict[str, Any], enrichment: Dict[str, Any]) -> None:
+        entity["description"] = entity.get("description") or enrichment.get("description", "")
+        entity["keywords"] = entity.get("keywords") or enrichment.get("keywords", [])
+
+    def _enrichment_prompt(self, diagram_content: str, incomplete: List[Dict[str, Any]]):
+        prompt = self._create_enrichment_prompt_template()
+        return prompt.invoke({"content": diagram_content, "names": ", ".join(e["name"] for e in incomplete)})
+
+    def _create_enrichment_prompt_template(self) -> ChatPromptTemplate:
+        return ChatPromptTemplate.from_template("""
+        Dans le diagramme suivant :
+
+        {content}
+
+        Décrivez les entités suivantes : {names}
+
+        Fournissez la sortie au format JSON avec la structure suivante :
+        {{
+            "entities": [
+                {{
+                    "name": "<nom_entité>",
+                    "description": "<description_entité>",
+                    "keywords": ["<mot_clé1>", "<mot_clé2>", ...]
+                }},
+                ...
+            ]
+        }}
+
+        Assurez-vous que la sortie est un JSON valide sans aucun texte supplémentaire.
+        """)
+
     def _process_result(self, result_content: str) -> Dict[str, Any]:
         try:
             json_content = self._extract_json_content(result_content)
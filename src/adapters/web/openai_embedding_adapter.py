@@ -1,5 +1,8 @@
 import logging
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Tuple
+
+import tiktoken
 from langchain_openai import OpenAIEmbeddings
 
 from src.domain.ports.embedding_adapter_protocol import EmbeddingAdapterProtocol
@@ -8,20 +11,26 @@ logger = logging.getLogger("uvicorn.error")
 
 
 class OpenAIEmbeddingAdapter(EmbeddingAdapterProtocol):
-    def __init__(self, embeddings_model: OpenAIEmbeddings):
+    def __init__(self, embeddings_model: OpenAIEmbeddings, batch_config: Dict[str, Any] = None):
         self.embeddings_model = embeddings_model
+        batch_config = batch_config or {}
+        self.max_batch_tokens = batch_config.get('max_batch_tokens', 100000)
+        self.max_batch_size = batch_config.get('max_batch_size', 512)
+        self.max_concurrency = batch_config.get('max_concurrency', 4)
+        self._encoding = None
     
     @classmethod
-    def create(cls, api_key: str):
+    def create(cls, api_key: str, batch_config: Dict[str, Any] = None):
         embeddings_model = OpenAIEmbeddings(openai_api_key=api_key)
-        return cls(embeddings_model)
+        return cls(embeddings_model, batch_config)
+    
+    @property
+    def model_name(self) -> str:
+        return self.embeddings_model.model
     
     def get_embeddings(self, texts: List[str]) -> List[List[float]]:
         try:
-            embeddings = self.embeddings_model.embed_documents(texts)
-            if not all(isinstance(emb, list) and all(isinstance(x, float) for x in emb) for emb in embeddings):
-                raise ValueError("Invalid embedding format")
-            return embeddings
+            return self._embed_batch(texts)
         except Exception as e:
             logger.error(f"Error generating embeddings: {str(e)}", exc_info=True)
             return []
@@ -34,16 +43,76 @@ class OpenAIEmbeddingAdapter(EmbeddingAdapterProtocol):
             return []
     
     def get_embeddings_dict(self, entities: List[Dict[str, Any]], diagram_type: str) -> Dict[str, List[float]]:
+        items = [(entity.get('id', f"{diagram_type}_{index}"), entity['description'])
+                 for index, entity in enumerate(entities) if 'description' in entity]
+        batches = self._pack_batches(items)
+        logger.info(f"Embedding {len(items)} entities in {len(batches)} batches")
+        
         embeddings_dict = {}
-        for index, entity in enumerate(entities):
-            if 'description' in entity:
-                entity_id = entity.get('id', f"{diagram_type}_{index}")
-                try:
-                    embedding = self.get_embeddings([entity['description']])[0]
-                    embeddings_dict[entity_id] = embedding
-                    logger.debug(f"Generated embedding for entity {entity_id}: {embedding[:5]}...")
-                except Exception as e:
-                    logger.error(f"Error generating embedding for entity {entity_id}: {str(e)}", exc_info=True)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            for batch_embeddings in executor.map(self._embed_isolated, batches):
+                embeddings_dict.update(batch_embeddings)
         
         logger.info(f"Successfully generated embeddings for {len(embeddings_dict)} entities")
-        return embeddings_dict
\ No newline at end of file
+        return embeddings_dict
+    
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        embeddings = self.embeddings_model.embed_documents(texts)
+        if len(embeddings) != len(texts) or (embeddings and not embeddings[0]):
+            raise ValueError("Invalid embedding format")
+        dimension = len(embeddings[0]) if embeddings else 0
+        if any(len(embedding) != dimension for embedding in embeddings):
+            raise ValueError("Invalid embedding format")
+        return embeddings
+    
+    def _embed_isolated(self, batch: List[Tuple[str, str]]) -> Dict[str, List[float]]:
+        """
+        Embeds a batch, splitting it in halves on failure so that a bad description only loses its own embedding.
+        """
+        try:
+            embeddings = self._embed_batch([description for _, description in batch])
+            batch_embeddings = {entity_id: embedding for (entity_id, _), embedding in zip(batch, embeddings)}
+            logger.debug(f"Generated embeddings for entities {list(batch_embeddings)}")
+            return batch_embeddings
+        except Exception as e:
+            if len(batch) == 1:
+                logger.error(f"Error generating embedding for entity {batch[0][0]}: {str(e)}", exc_info=True)
+                return {}
+            logger.warning(f"Embedding batch of {len(batch)} entities failed, retrying in halves: {str(e)}")
+            middle = len(batch) // 2
+            return {**self._embed_isolated(batch[:middle]), **self._embed_isolated(batch[middle:])}
+    
+    def _pack_batches(self, items: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+        batches = []
+        batch, batch_tokens = [], 0
+        for entity_id, description in items:
+            tokens = self._count_tokens(description)
+            if batch and (batch_tokens + tokens > self.max_batch_tokens or len(batch) >= self.max_batch_size):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append((entity_id, description))
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _count_tokens(self, text: Any) -> int:
+        if not isinstance(text, str):
+            return 1
+        encoding = self._get_encoding()
+        if encoding is None:
+            # Rough estimate of 4 characters per token
+            return len(text) // 4 + 1
+        return len(encoding.encode(text, disallowed_special=()))
+    
+    def _get_encoding(self):
+        if self._encoding is None:
+            try:
+                try:
+                    self._encoding = tiktoken.encoding_for_model(self.model_name)
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                logger.warning(f"Tokenizer unavailable, estimating token counts: {str(e)}")
+                self._encoding = False
+        return self._encoding or None
@@ -0,0 +1,51 @@
+# src/adapters/web/paragraph_text_splitter.py
+import hashlib
+import re
+from typing import Any, Callable, List
+
+# Markdown headings and numbered section titles ("2.", "3.1 Exigences")
+_HEADING_PATTERN = re.compile(r'^(?:#{1,6}\s|\d+(?:\.\d+)*\.?\s+\S.{0,80}$)')
+
+
+class ParagraphTextSplitter:
+    """
+    Splits a text into chunks of whole paragraphs, with boundaries defined by the content rather than by offsets.
+
+    A chunk ends before a heading, or after a paragraph chosen by the hash of its own text, with a probability
+    proportional to its length so that chunks average half of chunk_size. Inserting or editing a paragraph then
+    only changes the chunk that holds it: the following chunks start at the same paragraphs and keep their text.
+    Chunks are also ended when the next paragraph would not fit, and paragraphs longer than chunk_size are cut by
+    the window splitter, the only chunks that overlap.
+    """
+
+    def __init__(self, window_splitter: Any, length_function: Callable[[str], int], chunk_size: int):
+        self.window_splitter = window_splitter
+        self.length_function = length_function
+        self.chunk_size = chunk_size
+        self.anchor_interval = max(chunk_size // 2, 1)
+
+    def split_text(self, text: str) -> List[str]:
+        chunks, paragraphs, size = [], [], 0
+        for paragraph in (line.strip() for line in text.split("\n")):
+            if not paragraph:
+                continue
+            length = self.length_function(paragraph)
+            if paragraphs and (size + length > self.chunk_size or _HEADING_PATTERN.match(paragraph)):
+                chunks.append("\n".join(paragraphs))
+                paragraphs, size = [], 0
+            if length > self.chunk_size:
+                chunks.extend(self.window_splitter.split_text(paragraph))
+                continue
+            paragraphs.append(paragraph)
+            size += length + 1
+            if self._is_anchor(paragraph, length):
+                chunks.append("\n".join(paragraphs))
+                paragraphs, size = [], 0
+        if paragraphs:
+            chunks.append("\n".join(paragraphs))
+        return chunks
+
+    def _is_anchor(self, paragraph: str, length: int) -> bool:
+        # A stable hash, unlike hash(), so the same text is cut the same way in every process
+        digest = hashlib.blake2b(paragraph.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big") % self.anchor_interval < length
@@ -0,0 +1,71 @@
+# src/adapters/web/pdf_extraction.py
+import logging
+import math
+import os
+from collections import deque
+from pathlib import Path
+from typing import List, Iterator, Tuple
+
+from billiard import get_context
+from PyPDF2 import PdfReader
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def extract_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop) of a PDF. Runs in the worker processes, so it only depends on PyPDF2."""
+    with open(file_path, "rb") as file:
+        pdf_reader = PdfReader(file)
+        return [pdf_reader.pages[index].extract_text() for index in range(start, stop)]
+
+
+class ParallelPdfExtractor:
+    """
+    Extracts the text of large PDFs with a process pool, one page range per task, yielding pages in order.
+
+    The pool comes from billiard, Celery's fork of multiprocessing, which unlike the standard library lets daemonic
+    processes start children: documents are summarized inside Celery prefork workers. Small files and single-core
+    hosts use serial extraction.
+    """
+
+    def __init__(self, enabled: bool = True, min_pages: int = 40, max_workers: int = 0, pages_per_task: int = 16):
+        self.enabled = enabled
+        self.min_pages = min_pages
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.pages_per_task = pages_per_task
+
+    def iter_pages(self, file_path: Path) -> Iterator[str]:
+        with file_path.open("rb") as file:
+            pdf_reader = PdfReader(file)
+            page_count = len(pdf_reader.pages)
+            if not self._use_process_pool(page_count):
+                for page in pdf_reader.pages:
+                    yield page.extract_text()
+                return
+
+        logger.info(f"Extracting {page_count} pages of {file_path} with {self.max_workers} processes")
+        yield from self._iter_pages_parallel(str(file_path), page_count)
+
+    def _use_process_pool(self, page_count: int) -> bool:
+        return self.enabled and self.max_workers > 1 and page_count >= self.min_pages
+
+    def _iter_pages_parallel(self, file_path: str, page_count: int) -> Iterator[str]:
+        ranges = self._page_ranges(page_count)
+        pending = deque()
+        # Spawned workers do not inherit the threads and open connections of this process
+        pool = get_context("spawn").Pool(processes=self.max_workers)
+        try:
+            for start, stop in ranges:
+                pending.append(pool.apply_async(extract_page_range, (file_path, start, stop)))
+                if len(pending) >= 2 * self.max_workers:
+                    yield from pending.popleft().get()
+            while pending:
+                yield from pending.popleft().get()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _page_ranges(self, page_count: int) -> List[Tuple[int, int]]:
+        # Enough ranges to balance the workers, but not so small that reopening the file dominates
+        size = max(self.pages_per_task, math.ceil(page_count / (4 * self.max_workers)))
+        return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
@@ -1,14 +1,47 @@
 import logging
 from typing import Dict, List, Tuple, Optional
-import re
 from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
 from tenacity import retry, stop_after_attempt, wait_random_exponential
 
+from src.adapters.search.keyword_index import entity_keyword_index
+from src.adapters.web.completion_cache import completion_cache
+from src.adapters.search.local_vector_store import entity_vector_store
 from src.infrastructure.config import config
 
 logger = logging.getLogger("uvicorn.error")
 
+# Graph expansion of seed entities: seeds keep their score, expanded nodes get the score of their best seed
+# decayed once per hop
+_GRAPH_EXPANSION = """
+CALL apoc.path.expandConfig(seed, {
+    minLevel: 0,
+    maxLevel: $max_depth,
+    relationshipFilter: '>',
+    labelFilter: '+Entity',
+    uniqueness: 'NODE_GLOBAL',
+    bfs: true
+})
+YIELD path
+WITH last(nodes(path)) AS node, length(path) AS hops, seed_score * $hop_decay ^ length(path) AS score
+WITH node, min(hops) AS hops, max(score) AS score
+RETURN node.name AS name, node.description AS description, score, hops
+ORDER BY score DESC
+"""
+
+# Vector lookup and graph expansion in one statement
+HYBRID_SEARCH_QUERY = """
+CALL db.index.vector.queryNodes('entity_embeddings', $k, $embedding)
+YIELD node AS seed, score AS seed_score
+""" + _GRAPH_EXPANSION
+
+# Graph expansion of seeds found by the local vector store
+SEED_EXPANSION_QUERY = """
+UNWIND $seeds AS seed_row
+MATCH (seed:Entity {id: seed_row.id})
+WITH seed, seed_row.score AS seed_score
+""" + _GRAPH_EXPANSION
+
 
 class RAGAdapter:
     def __init__(self, embedding_adapter, neo4j_adapter):
@@ -16,20 +49,25 @@ class RAGAdapter:
         self.openai_temperature = config.global_config.OPENAI_TEMPERATURE
         self.embedding_adapter = embedding_adapter
         self.neo4j_adapter = neo4j_adapter
+        self.rag_config = config.get_rag_config()
+        self.keyword_index = entity_keyword_index
+        self.vector_store = entity_vector_store
+        self.completion_cache = completion_cache
         self.openai_chat = ChatOpenAI(
             model_name=self.openai_model,
             temperature=self.openai_temperature,
             openai_api_key=config.global_config.OPENAI_API_KEY
         )
     
-    def fallback_generation(self, prompt_template: str, content: str) -> str:
+    def fallback_generation(self, prompt_template: str, content: str, use_cache: bool = True) -> str:
         prompt = PromptTemplate.from_template(prompt_template)
-        chain = prompt | self.openai_chat
-        result = chain.invoke({"content": content})
-        return result.content
+        return self.completion_cache.complete(self.openai_chat, prompt.invoke({"content": content}), use_cache)
     
-    def hybrid_search_with_fallback(self, query: str, semantic_top_k: int = 5, graph_depth: int = 2) -> List[
-        Tuple[str, str]]:
+    def hybrid_search_with_fallback(self, query: str, semantic_top_k: int = 5, graph_depth: int = 2,
+                                    with_scores: bool = False) -> List[Tuple]:
+        if self.rag_config.get('retrieval_mode', 'single_query') == 'single_query':
+            return self.single_query_hybrid_search(query, semantic_top_k, graph_depth, with_scores)
+        
         if not self.neo4j_adapter.is_connected():
             logger.warning("Neo4j n'est pas connecté. Utilisation de la recherche par mot-clé comme solution de repli.")
             return self.keyword_search_fallback(query, semantic_top_k)
@@ -63,45 +101,138 @@ class RAGAdapter:
         
         except Exception as e:
             logger.warning(f"Erreur lors de la recherche vectorielle : {str(e)}")
-            return self.keyword_search_fallback(query, semantic_top_k)
+            query_embedding = self.embedding_adapter.get_query_embedding(query)
+            if not query_embedding:
+                return self.keyword_search_fallback(query, semantic_top_k)
+            return self.local_hybrid_search(query, query_embedding, semantic_top_k, graph_depth)
     
-    def keyword_search_fallback(self, query: str, limit: int) -> List[Tuple[str, str]]:
-        results = []
-        query_keywords = set(re.findall(r'\w+', query.lower()))
+    def single_query_hybrid_search(self, query: str, semantic_top_k: int = 5, graph_depth: int = 2,
+                                   with_scores: bool = False) -> List[Tuple]:
+        """
+        Hybrid search in a single round trip, without liveness probe: driver errors trigger the fallbacks.
+
+        :return: (name, description) tuples ordered by score, or (name, description, score, hops) tuples when
+                 with_scores is set.
+        """
+        self.neo4j_adapter.ensure_connection()
         
-        with self.neo4j_adapter.get_session() as session:
-            entities = session.run("""
-            MATCH (e:Entity)
-            RETURN e.name AS name, e.description AS description, e.keywords AS keywords
-            """).data()
-            
-            for entity in entities:
-                entity_keywords = set(entity.get('keywords', []))
-                entity_text = f"{entity['name']} {entity['description']}".lower()
-                entity_text_keywords = set(re.findall(r'\w+', entity_text))
-                
-                keyword_match_score = len(query_keywords.intersection(entity_keywords))
-                text_match_score = len(query_keywords.intersection(entity_text_keywords))
-                
-                total_score = keyword_match_score + text_match_score
-                
-                if total_score > 0:
-                    results.append((total_score, entity['name'], entity['description']))
+        query_embedding = self.embedding_adapter.get_query_embedding(query)
+        if not query_embedding:
+            logger.warning("Embedding de la requête indisponible. Utilisation de la recherche par mot-clé.")
+            return self.keyword_search_fallback(query, semantic_top_k, with_scores)
+        
+        # Cached health state: skips Neo4j at once while it is known to be down
+        if self._use_local_vector_store_first() or not self.neo4j_adapter.is_connected():
+            return self.local_hybrid_search(query, query_embedding, semantic_top_k, graph_depth, with_scores)
+        
+        try:
+            records = self._read(HYBRID_SEARCH_QUERY,
+                                 k=semantic_top_k,
+                                 embedding=query_embedding,
+                                 max_depth=graph_depth,
+                                 hop_decay=self.rag_config.get('hop_decay', 0.5))
+        except Exception as e:
+            logger.warning(f"Erreur lors de la recherche hybride : {str(e)}")
+            return self.local_hybrid_search(query, query_embedding, semantic_top_k, graph_depth, with_scores)
         
-        results.sort(reverse=True, key=lambda x: x[0])
-        return [(name, description) for _, name, description in results[:limit]]
+        return self._format_scored_results(records, with_scores)
+    
+    def local_hybrid_search(self, query: str, query_embedding: List[float], semantic_top_k: int = 5,
+                            graph_depth: int = 2, with_scores: bool = False) -> List[Tuple]:
+        """
+        Vector search on the local store, expanded through the graph when Neo4j answers.
+
+        Falls back to keyword search when the local store is disabled or empty.
+        """
+        if self.vector_store is None:
+            return self.keyword_search_fallback(query, semantic_top_k, with_scores)
+        self._bootstrap_vector_store()
+        seeds = self.vector_store.search(query_embedding, semantic_top_k)
+        if not seeds:
+            return self.keyword_search_fallback(query, semantic_top_k, with_scores)
+        
+        records = [{'name': name, 'description': description, 'score': score, 'hops': 0}
+                   for _, name, description, score in seeds]
+        if self.neo4j_adapter.is_connected() and graph_depth > 0:
+            try:
+                records = self._read(SEED_EXPANSION_QUERY,
+                                     seeds=[{'id': entity_id, 'score': score} for entity_id, _, _, score in seeds],
+                                     max_depth=graph_depth,
+                                     hop_decay=self.rag_config.get('hop_decay', 0.5)) or records
+            except Exception as e:
+                logger.warning(f"Expansion du graphe impossible, résultats vectoriels locaux seuls : {str(e)}")
+        return self._format_scored_results(records, with_scores)
+    
+    def _bootstrap_vector_store(self) -> None:
+        """Fills an empty local store from the embeddings stored in the graph."""
+        if len(self.vector_store) or not self.neo4j_adapter.is_connected():
+            return
+        try:
+            entities = self._read("""
+            MATCH (e:Entity)
+            WHERE e.embedding IS NOT NULL
+            RETURN e.id AS id, e.name AS name, e.description AS description, e.embedding AS embedding
+            """)
+            self.vector_store.replace_all(entities)
+            logger.info(f"Local vector store loaded with {len(self.vector_store)} entities")
+        except Exception as e:
+            logger.warning(f"Erreur lors du chargement du store vectoriel local : {str(e)}")
+    
+    def _read(self, query: str, **parameters) -> List[Dict]:
+        """Runs a query in a session of the adapter, which refuses it while the circuit breaker is open."""
+        session = self.neo4j_adapter.get_session()
+        if session is None:
+            raise ConnectionError("Neo4j n'est pas disponible")
+        with session:
+            return session.run(query, **parameters).data()
+    
+    def _use_local_vector_store_first(self) -> bool:
+        store_config = self.rag_config.get('local_vector_store', {})
+        return self.vector_store is not None and store_config.get('primary', False)
+    
+    @staticmethod
+    def _format_scored_results(records: List[Dict], with_scores: bool) -> List[Tuple]:
+        results = {}
+        for record in records:
+            results.setdefault((record['name'], record['description']), (record['score'], record['hops']))
+        logger.debug(f"Résultats de la recherche hybride : {list(results)[:5]}...")
+        if with_scores:
+            return [(name, description, score, hops) for (name, description), (score, hops) in results.items()]
+        return list(results)
+    
+    def keyword_search_fallback(self, query: str, limit: int, with_scores: bool = False) -> List[Tuple]:
+        """(name, description) tuples, or (name, description, BM25 score, 0 hops) tuples when with_scores is set."""
+        self._refresh_keyword_index()
+        if with_scores:
+            return [(name, description, score, 0)
+                    for name, description, score in self.keyword_index.search_with_scores(query, limit)]
+        return self.keyword_index.search(query, limit)
+    
+    def _refresh_keyword_index(self) -> None:
+        if not self.keyword_index.is_stale():
+            return
+        if not self.neo4j_adapter.is_connected():
+            logger.warning("Neo4j n'est pas connecté. Recherche par mot-clé sur l'index existant.")
+            return
+        try:
+            entities = self._read("""
+            MATCH (e:Entity)
+            RETURN e.id AS id, e.name AS name, e.description AS description, e.keywords AS keywords
+            """)
+            self.keyword_index.replace_all(entities)
+        except Exception as e:
+            logger.warning(f"Erreur lors du chargement de l'index de mots-clés : {str(e)}")
     
     @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(5))
-    def rag_pipeline(self, content: str, prompt_template: str) -> Tuple[Optional[str], bool]:
+    def rag_pipeline(self, content: str, prompt_template: str, use_cache: bool = True) -> Tuple[Optional[str], bool]:
         try:
             relevant_entities = self.hybrid_search_with_fallback(content)
             context = "Entités pertinentes trouvées :\n" + "\n".join(
                 [f"- {name}: {description}" for name, description in relevant_entities])
             enriched_prompt = f"{context}\n\n{prompt_template}\n\nContenu à analyser :\n{content}"
             prompt = PromptTemplate.from_template(enriched_prompt)
-            chain = prompt | self.openai_chat
-            result = chain.invoke({"content": content})
-            return result.content, True
+            result = self.completion_cache.complete(self.openai_chat, prompt.invoke({"content": content}), use_cache)
+            return result, True
         except Exception as e:
             logger.error(f"Erreur lors de la génération avec RAG : {str(e)}")
             return None, False
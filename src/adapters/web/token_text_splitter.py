@@ -0,0 +1,44 @@
+# src/adapters/web/token_text_splitter.py
+from itertools import accumulate
+from typing import List
+
+
+class TiktokenTextSplitter:
+    """
+    Splits a text into windows of chunk_size tokens overlapping by chunk_overlap tokens.
+
+    The text is encoded once and the token array is sliced, instead of measuring candidate substrings again and
+    again as a length_function based splitter does. A token can hold part of a UTF-8 character, so window
+    boundaries are moved back to the start of a character and windows are decoded from the bytes of the text.
+    """
+
+    def __init__(self, encoding, chunk_size: int, chunk_overlap: int = 0):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(f"Chunk overlap ({chunk_overlap}) must be smaller than chunk size ({chunk_size})")
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+    def split_text(self, text: str) -> List[str]:
+        tokens = self.encoding.encode(text, disallowed_special=())
+        token_bytes = self.encoding.decode_tokens_bytes(tokens)
+        data = b"".join(token_bytes)
+        offsets = list(accumulate((len(token) for token in token_bytes), initial=0))
+        step = self.chunk_size - self.chunk_overlap
+        chunks = []
+        for start in range(0, len(tokens), step):
+            stop = min(start + self.chunk_size, len(tokens))
+            chunk = data[self._character_start(data, offsets, start):
+                         self._character_start(data, offsets, stop)].decode("utf-8").strip()
+            if chunk:
+                chunks.append(chunk)
+            if start + self.chunk_size >= len(tokens):
+                break
+        return chunks
+
+    @staticmethod
+    def _character_start(data: bytes, offsets: List[int], index: int) -> int:
+        """Byte offset of token index, moved back to the first token that starts a character."""
+        while index > 0 and offsets[index] < len(data) and 0x80 <= data[offsets[index]] < 0xC0:
+            index -= 1
+        return offsets[index]
@@ -0,0 +1,23 @@
+from src.adapters.persistence.sqlite_cache import SQLiteCache
+from src.adapters.persistence.summary_cache import SummaryCache
+from src.application.services.document_service import DocumentService
+from src.domain.ports.document_adapter_protocol import DocumentAdapterProtocol
+from src.infrastructure.config import config
+
+
+class DocumentServiceFactory:
+    @staticmethod
+    def create_document_service(document_adapter: DocumentAdapterProtocol, model_name: str) -> DocumentService:
+        summarization_config = config.get_summarization_config()
+        cache_config = config.get_summary_cache_config()
+        if not cache_config.get('enabled', False):
+            return DocumentService(document_adapter, summarization_config=summarization_config)
+        cache = SQLiteCache(cache_config.get('path', '.cache/summaries.sqlite3'),
+                            max_entries=cache_config.get('max_entries', 50000),
+                            ttl_seconds=cache_config.get('ttl_seconds'),
+                            table='summaries')
+        settings = {'text_splitter': config.get_text_splitter_config(),
+                    'streaming_ingestion': config.get_processing_config().get('streaming_ingestion', True),
+                    'token_budget': summarization_config.get('token_budget'),
+                    'reduce_group_tokens': summarization_config.get('reduce_group_tokens')}
+        return DocumentService(document_adapter, SummaryCache(cache, model_name, settings), summarization_config)
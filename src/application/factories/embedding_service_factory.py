@@ -1,7 +1,17 @@
+from src.adapters.persistence.sqlite_cache import SQLiteCache
+from src.adapters.web.cached_embedding_adapter import CachedEmbeddingAdapter
 from src.adapters.web.openai_embedding_adapter import OpenAIEmbeddingAdapter
+from src.infrastructure.config import config
 
 
 class EmbeddingServiceFactory:
     @staticmethod
     def create_embedding_service(api_key: str):
-        return OpenAIEmbeddingAdapter.create(api_key)
+        embedding_adapter = OpenAIEmbeddingAdapter.create(api_key, config.get_embedding_config())
+        cache_config = config.get_embedding_cache_config()
+        if not cache_config.get('enabled', False):
+            return embedding_adapter
+        cache = SQLiteCache(cache_config.get('path', '.cache/embeddings.sqlite3'),
+                            max_entries=cache_config.get('max_entries', 200000),
+                            table='embeddings')
+        return CachedEmbeddingAdapter(embedding_adapter, cache, embedding_adapter.model_name)
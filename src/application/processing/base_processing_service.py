@@ -1,13 +1,13 @@
 import logging
 from typing import Dict, Any
 
+from src.application.factories.document_service_factory import DocumentServiceFactory
 from src.application.factories.embedding_service_factory import EmbeddingServiceFactory
 from src.infrastructure.config import config
 from src.adapters.persistence.neo4j_persistence_adapter import Neo4jPersistenceAdapter
 from src.adapters.web.document_adapter import DocumentAdapter
 from src.adapters.web.entity_extraction_adapter import EntityExtractionAdapter
 from src.adapters.web.rag_adapter import RAGAdapter
-from src.application.services.document_service import DocumentService
 from src.application.services.entity_extraction_service import EntityExtractionService
 from src.application.services.project_management_service import ProjectManagementService
 from src.application.services.rag_service import RAGService
@@ -26,7 +26,8 @@ class BaseProcessingService:
         self.document_adapter = DocumentAdapter(self.rag_adapter.openai_chat)
         self.entity_extraction_adapter = EntityExtractionAdapter(self.rag_adapter.openai_chat)
         self.rag_service = RAGService(self.rag_adapter)
-        self.document_service = DocumentService(self.document_adapter)
+        self.document_service = DocumentServiceFactory.create_document_service(self.document_adapter,
+                                                                               self.rag_adapter.openai_model)
         self.entity_extraction_service = EntityExtractionService(self.entity_extraction_adapter)
     
     async def _send_task(self, task_name: str, project_name: str, operation: str, diagram_type: str = None) -> Dict[
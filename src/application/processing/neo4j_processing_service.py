@@ -1,6 +1,6 @@
 import logging
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple, Union
 
 from src.application.services.project_management_service import ProjectManagementService
 from src.application.services.similarity_processing_service import SimilarityService
@@ -8,6 +8,9 @@ from src.domain.ports.embedding_adapter_protocol import EmbeddingAdapterProtocol
 from src.domain.ports.neo4j_persistence_adapter_protocol import Neo4jPersistenceAdapterProtocol
 from src.domain.ports.async_task_protocol import AsyncTaskProtocol
 from src.application.factories.embedding_service_factory import EmbeddingServiceFactory
+from src.application.services.graph_diff import assign_stored_ids, diff_diagram
+from src.domain.models.entity import build_entity_id
+from src.domain.models.entity_matrix import EntityMatrix
 from src.infrastructure.config import config
 
 logger = logging.getLogger("uvicorn.error")
@@ -41,6 +44,9 @@ class Neo4jProcessingService:
         self.neo4j_adapter = neo4j_adapter
         self.similarity_service = similarity_service
         self.async_task_adapter = async_task_adapter
+        self.incremental_similarity = config.get_similarity_config().get('incremental', False)
+        self.columnar_fetch = config.get_similarity_config().get('columnar_fetch', False)
+        self.graph_sync = config.get_neo4j_config().get('graph_sync', 'merge')
     
     @staticmethod
     def _add_temp_ids_to_entities(entities: List[Dict[str, Any]], diagram_type: str) -> List[Dict[str, Any]]:
@@ -59,18 +65,29 @@ class Neo4jProcessingService:
             data = _process_json_file(entities_path)
             entities = self._add_temp_ids_to_entities(data['entities'], diagram_type)
             relationships = data.get('relationships', [])
+            stored = None
+            if self.graph_sync == 'diff':
+                # Stored entities keep their id, so positional temporary ids do not shift when the diagram changes
+                stored = self.neo4j_adapter.get_diagram_state(project_name, diagram_type)
+                entities = assign_stored_ids(project_name, diagram_type, stored, entities)
             
             embeddings = self.embedding_adapter.get_embeddings_dict(entities, diagram_type)
             
-            all_entities = self.neo4j_adapter.get_entities_for_similarity(project_name)
-            similarities = self.similarity_service.calculate_similarities(all_entities)
+            corpus, removed_ids = self._build_similarity_corpus(project_name, diagram_type, entities, embeddings)
             
-            self.neo4j_adapter.create_or_update_project(project_name, project['type'])
-            self.neo4j_adapter.create_or_update_diagram(project_name, diagram_type)
-            self.neo4j_adapter.create_or_update_entities_and_keywords(project_name, diagram_type, entities)
-            self.neo4j_adapter.update_embeddings(project_name, diagram_type, embeddings)
-            self.neo4j_adapter.create_relationships(project_name, diagram_type, relationships)
-            self.neo4j_adapter.update_similarity_relationships(similarities)
+            # All the writes of the diagram in one transaction
+            unit_of_work = self.neo4j_adapter.unit_of_work()
+            if self.graph_sync == 'diff':
+                self._stage_diagram_diff(unit_of_work, project_name, project['type'], diagram_type, stored,
+                                         entities, embeddings, relationships)
+            else:
+                unit_of_work.merge_project(project_name, project['type'])
+                unit_of_work.merge_diagram(project_name, diagram_type)
+                unit_of_work.merge_entities(project_name, diagram_type, entities)
+                unit_of_work.set_embeddings(project_name, diagram_type, embeddings)
+                unit_of_work.merge_relationships(project_name, diagram_type, relationships)
+            self._update_similarities(unit_of_work, corpus, removed_ids)
+            unit_of_work.commit()
             
             logger.info(f"Neo4j data processing completed for project: {project_name}, diagram: {diagram_type}")
             return {"status": "completed",
@@ -80,6 +97,81 @@ class Neo4jProcessingService:
             return {"status": "failed",
                     "message": f"Neo4j data processing failed for {project_name}, {diagram_type}. Error: {str(e)}"}
     
+    @staticmethod
+    def _stage_diagram_diff(unit_of_work, project_name: str, project_type: str, diagram_type: str,
+                            stored: Dict[str, Any], entities: List[Dict[str, Any]],
+                            embeddings: Dict[str, List[float]], relationships: List[Dict[str, Any]]) -> None:
+        """Stages only the writes that differ from the stored graph of the diagram."""
+        diff = diff_diagram(project_name, diagram_type, stored, entities, relationships)
+        logger.info(f"Graph diff for {project_name}, {diagram_type}: {diff.summary()}")
+        
+        if not stored['exists']:
+            unit_of_work.merge_project(project_name, project_type)
+            unit_of_work.merge_diagram(project_name, diagram_type)
+        # Relationships are matched by entity name: removed ones are deleted first, new ones once the entities exist
+        unit_of_work.delete_relationships(project_name, diagram_type, diff.deleted_relationships)
+        unit_of_work.delete_entities(diff.deleted_ids)
+        unit_of_work.unlink_keywords(diff.unlinked_keywords)
+        unit_of_work.merge_entities(project_name, diagram_type, diff.created + diff.updated)
+        unit_of_work.set_embeddings(project_name, diagram_type, {entity_id: embeddings[entity_id]
+                                                                 for entity_id in diff.embedding_ids
+                                                                 if entity_id in embeddings})
+        unit_of_work.merge_relationships(project_name, diagram_type, diff.created_relationships)
+    
+    def _build_similarity_corpus(self, project_name: str, diagram_type: str, entities: List[Dict[str, Any]],
+                                 embeddings: Dict[str, List[float]]
+                                 ) -> Tuple[Union[List[Dict[str, Any]], EntityMatrix], List[str]]:
+        """
+        Returns the project entities as they will be once the diagram is written, and the ids of the entities
+        that disappeared from the diagram. With columnar_fetch, the corpus is an EntityMatrix filled by the adapter.
+        """
+        if self.columnar_fetch:
+            stored_fingerprints = self.neo4j_adapter.get_similarity_fingerprints(project_name, diagram_type)
+            corpus = self.neo4j_adapter.get_entity_matrix(project_name, exclude_diagram_type=diagram_type,
+                                                          reserve=len(embeddings))
+        else:
+            stored_entities = self.neo4j_adapter.get_entities_for_similarity(project_name)
+            stored_fingerprints = {entity['id']: entity.get('similarity_fingerprint') for entity in stored_entities
+                                   if entity['diagram_type'] == diagram_type}
+            corpus = [entity for entity in stored_entities if entity['diagram_type'] != diagram_type]
+        
+        current_ids = set()
+        for entity in entities:
+            if entity['id'] not in embeddings:
+                continue
+            entity_id = build_entity_id(project_name, diagram_type, entity['id'])
+            current_ids.add(entity_id)
+            corpus.append({
+                'id': entity_id,
+                'name': entity['name'],
+                'embedding': embeddings[entity['id']],
+                'keywords': entity.get('keywords', []),
+                'diagram_type': diagram_type,
+                'project_name': project_name,
+                'similarity_fingerprint': stored_fingerprints.get(entity_id)
+            })
+        
+        removed_ids = [entity_id for entity_id in stored_fingerprints if entity_id not in current_ids]
+        return corpus, removed_ids
+    
+    def _update_similarities(self, unit_of_work, corpus: Union[List[Dict[str, Any]], EntityMatrix],
+                             removed_ids: List[str]) -> None:
+        if removed_ids:
+            unit_of_work.delete_similarities(removed_ids)
+        
+        if not self.incremental_similarity:
+            similarities = self.similarity_service.calculate_similarities(corpus)
+            unit_of_work.merge_similarities(similarities)
+            return
+        
+        result = self.similarity_service.calculate_incremental_similarities(corpus)
+        if not result.changed_ids:
+            logger.info("No entity changed, similarity relationships are up to date")
+            return
+        unit_of_work.delete_similarities(result.changed_ids)
+        unit_of_work.merge_similarities(result.similarities)
+        unit_of_work.set_similarity_fingerprints(result.fingerprints)
+    
     def _process_entire_project(self, project_name: str) -> Dict[str, Any]:
         try:
             logger.info(f"Starting Neo4j data processing for entire project: {project_name}")
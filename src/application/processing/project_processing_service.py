@@ -1,15 +1,17 @@
 import json
 import logging
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
 
+from src.application.factories.document_service_factory import DocumentServiceFactory
 from src.application.factories.embedding_service_factory import EmbeddingServiceFactory
 from src.infrastructure.config import config
 from src.adapters.persistence.neo4j_persistence_adapter import Neo4jPersistenceAdapter
 from src.adapters.web.document_adapter import DocumentAdapter
 from src.adapters.web.entity_extraction_adapter import EntityExtractionAdapter
 from src.adapters.web.rag_adapter import RAGAdapter
-from src.application.services.document_service import DocumentService
 from src.application.services.entity_extraction_service import EntityExtractionService
+from src.application.services.graph_diff import StoredIdAssigner
 from src.application.services.project_management_service import ProjectManagementService
 from src.application.services.rag_service import RAGService
 from src.domain.ports.async_task_protocol import AsyncTaskProtocol
@@ -27,24 +29,32 @@ class ProjectProcessingService:
         self.document_adapter = DocumentAdapter(self.rag_adapter.openai_chat)
         self.entity_extraction_adapter = EntityExtractionAdapter(self.rag_adapter.openai_chat)
         self.rag_service = RAGService(self.rag_adapter)
-        self.document_service = DocumentService(self.document_adapter)
+        self.document_service = DocumentServiceFactory.create_document_service(self.document_adapter,
+                                                                               self.rag_adapter.openai_model)
         self.entity_extraction_service = EntityExtractionService(self.entity_extraction_adapter)
+        self.processing_config = config.get_processing_config()
+        self.max_parallel_diagrams = self.processing_config.get('max_parallel_diagrams', 3)
+        self.extraction_config = config.get_entity_extraction_config()
+        self.graph_sync = config.get_neo4j_config().get('graph_sync', 'merge')
     
-    async def process_project(self, project_name: str) -> Dict[str, Any]:
-        return await self._send_task('process_project', project_name, "Project processing")
+    async def process_project(self, project_name: str, use_cache: bool = True) -> Dict[str, Any]:
+        return await self._send_task('process_project', project_name, "Project processing",
+                                     kwargs={'use_cache': use_cache})
     
-    async def process_project_diagram(self, project_name: str, diagram_type: str) -> Dict[str, Any]:
+    async def process_project_diagram(self, project_name: str, diagram_type: str,
+                                      use_cache: bool = True) -> Dict[str, Any]:
         return await self._send_task('process_project_diagram', project_name, f"Project diagram processing",
-                                     diagram_type)
+                                     diagram_type, kwargs={'use_cache': use_cache})
     
-    async def extract_json(self, project_name: str, diagram_type: str) -> Dict[str, Any]:
-        return await self._send_task('extract_json', project_name, "JSON extraction", diagram_type)
+    async def extract_json(self, project_name: str, diagram_type: str, use_cache: bool = True) -> Dict[str, Any]:
+        return await self._send_task('extract_json', project_name, "JSON extraction", diagram_type,
+                                     kwargs={'use_cache': use_cache})
     
-    async def _send_task(self, task_name: str, project_name: str, operation: str, diagram_type: str = None) -> Dict[
-        str, Any]:
+    async def _send_task(self, task_name: str, project_name: str, operation: str, diagram_type: str = None,
+                         kwargs: Dict[str, Any] = None) -> Dict[str, Any]:
         try:
             args = [project_name] if diagram_type is None else [project_name, diagram_type]
-            task = self.async_task_adapter.send_task(task_name, args=args)
+            task = self.async_task_adapter.send_task(task_name, args=args, kwargs=kwargs)
             return {
                 "status": "processing",
                 "message": f"{operation} started: {project_name}" + (f", {diagram_type}" if diagram_type else ""),
@@ -54,34 +64,37 @@ class ProjectProcessingService:
             logger.exception(f"Error during {operation.lower()} initiation: {str(e)}")
             return {"status": "error", "message": f"Error initiating {operation.lower()}: {str(e)}"}
     
-    def _process_project(self, project_name: str) -> Dict[str, Any]:
+    def _process_project(self, project_name: str, use_cache: bool = True) -> Dict[str, Any]:
         try:
             self.project_manager.find_project(project_name)
             diagram_types = self.project_manager.get_diagram_types()
-            summary = self._prepare_project_summary(project_name)
-            results = [self._process_diagram(project_name, diagram_type, summary) for diagram_type in diagram_types]
+            summary = self._prepare_project_summary(project_name, use_cache)
+            # Diagram types are independent: their RAG and LLM calls run concurrently, results keep their order
+            max_workers = max(1, min(self.max_parallel_diagrams, len(diagram_types)))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(
+                    lambda diagram_type: self._process_diagram(project_name, diagram_type, summary, use_cache),
+                    diagram_types))
             return {"status": "completed", "message": f"Project processing completed: {project_name}",
                     "results": results}
         except Exception as e:
             logger.exception(f"Error occurred during processing of project {project_name}")
             return {"status": "error", "message": f"Error during processing {project_name}: {str(e)}"}
     
-    def _process_project_diagram(self, project_name: str, diagram_type: str) -> Dict[str, Any]:
+    def _process_project_diagram(self, project_name: str, diagram_type: str, use_cache: bool = True) -> Dict[str, Any]:
         try:
             self.project_manager.find_project(project_name)
-            summary = self._prepare_project_summary(project_name)
-            return self._process_diagram(project_name, diagram_type, summary)
+            summary = self._prepare_project_summary(project_name, use_cache)
+            return self._process_diagram(project_name, diagram_type, summary, use_cache)
         except Exception as e:
             logger.exception(f"Error during project diagram processing: {str(e)}")
             return {"status": "error", "message": f"Error during processing {project_name}, {diagram_type}: {str(e)}"}
     
-    def _extract_json(self, project_name: str, diagram_type: str) -> Dict[str, Any]:
+    def _extract_json(self, project_name: str, diagram_type: str, use_cache: bool = True) -> Dict[str, Any]:
         try:
             diagram_content = self._read_diagram_content(project_name, diagram_type)
-            entities = self.entity_extraction_service.extract_entities_and_relationships(
-                diagram_content['mermaid_syntax'])
-            entities_path = self.project_manager.get_project_entities_path(project_name, diagram_type)
-            self.project_manager.save_entities_and_relationships(entities, entities_path)
+            entities = self._extract_and_save_entities(project_name, diagram_type, diagram_content['mermaid_syntax'],
+                                                       use_cache)
             return {"status": "completed", "message": f"JSON extraction completed: {project_name}, {diagram_type}",
                     "entities": entities}
         except Exception as e:
@@ -89,18 +102,18 @@ class ProjectProcessingService:
             return {"status": "error",
                     "message": f"Error during JSON extraction {project_name}, {diagram_type}: {str(e)}"}
     
-    def _prepare_project_summary(self, project_name: str) -> str:
+    def _prepare_project_summary(self, project_name: str, use_cache: bool = True) -> str:
         input_path = self.project_manager.get_project_input_path(project_name)
-        content = self.document_service.load_document(input_path)
-        docs = self.document_service.split_text(content)
-        return self.document_service.summarize_text_parallel(docs)
+        return self.document_service.summarize_document(
+            input_path, use_cache=use_cache, streaming=self.processing_config.get('streaming_ingestion', True))
     
     def _read_diagram_content(self, project_name: str, diagram_type: str) -> Dict[str, Any]:
         output_path = self.project_manager.get_project_output_path(project_name, diagram_type)
         with open(output_path, 'r', encoding='utf-8') as f:
             return json.load(f)
     
-    def _process_diagram(self, project_name: str, diagram_type: str, summary: str) -> Dict[str, Any]:
+    def _process_diagram(self, project_name: str, diagram_type: str, summary: str,
+                         use_cache: bool = True) -> Dict[str, Any]:
         prompt_path = self.project_manager.get_project_prompt_path(project_name, diagram_type)
         prompt_template = self.project_manager.read_prompt_template(prompt_path)
         
@@ -109,7 +122,8 @@ class ProjectProcessingService:
             return {"status": "error", "message": f"Error reading prompt for {diagram_type}"}
         
         try:
-            diagram_content = self.rag_service.generate_with_fallback(prompt_template, content=summary)
+            diagram_content = self.rag_service.generate_with_fallback(prompt_template, content=summary,
+                                                                      use_cache=use_cache)
             diagram_data = {
                 "project_name": project_name,
                 "diagram_type": diagram_type,
@@ -119,15 +133,73 @@ class ProjectProcessingService:
             output_path = self.project_manager.get_project_output_path(project_name, diagram_type)
             self.project_manager.save_json(diagram_data, output_path)
             
-            entities = self.entity_extraction_service.extract_entities_and_relationships(diagram_content)
-            entities_path = self.project_manager.get_project_entities_path(project_name, diagram_type)
-            self.project_manager.save_entities_and_relationships(entities, entities_path)
+            self._extract_and_save_entities(project_name, diagram_type, diagram_content, use_cache)
             
             return {"status": "completed", "message": f"Diagram processing completed: {project_name}, {diagram_type}"}
         except Exception as e:
             logger.exception(f"Error during diagram processing: {str(e)}")
             return {"status": "error", "message": f"Error during diagram processing: {str(e)}"}
     
+    def _extract_and_save_entities(self, project_name: str, diagram_type: str, diagram_content: str,
+                                   use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Extracts the entities of a diagram into its entities file. In streaming mode, records are written to the
+        file, and optionally to Neo4j, as soon as the extraction produces them.
+        """
+        entities_path = self.project_manager.get_project_entities_path(project_name, diagram_type)
+        if not self.extraction_config.get('streaming', True):
+            entities = self.entity_extraction_service.extract_entities_and_relationships(diagram_content, use_cache)
+            self.project_manager.save_entities_and_relationships(entities, entities_path)
+            return entities
+        
+        extracted = {"entities": [], "relationships": []}
+        stream_to_neo4j = self.extraction_config.get('stream_to_neo4j', False)
+        batch_size = self.extraction_config.get('neo4j_batch_size', 100)
+        batch = []
+        id_assigner = self._create_id_assigner(project_name, diagram_type) if stream_to_neo4j else None
+        with self.project_manager.open_entities_writer(entities_path) as writer:
+            records = self.entity_extraction_service.stream_entities_and_relationships(diagram_content, use_cache)
+            for kind, record in records:
+                if kind == "relationship":
+                    writer.add_relationship(record)
+                    extracted["relationships"].append(record)
+                    continue
+                writer.add_entity(record)
+                if stream_to_neo4j:
+                    # Same ids as the Neo4j processing of the entities file
+                    batch.append({**record, 'id': record.get('id', f"{diagram_type}_{len(extracted['entities'])}")})
+                    if len(batch) >= batch_size:
+                        self._write_entities_to_neo4j(project_name, diagram_type, id_assigner, batch)
+                        batch = []
+                extracted["entities"].append(record)
+        
+        if stream_to_neo4j:
+            self._write_entities_to_neo4j(project_name, diagram_type, id_assigner, batch, extracted["relationships"])
+        return extracted
+    
+    def _create_id_assigner(self, project_name: str, diagram_type: str):
+        if self.graph_sync != 'diff':
+            return None
+        try:
+            return StoredIdAssigner(project_name, diagram_type,
+                                    self.neo4j_adapter.get_diagram_state(project_name, diagram_type))
+        except Exception as e:
+            logger.warning(f"Reading the stored diagram for streamed ids failed: {str(e)}")
+            return None
+    
+    def _write_entities_to_neo4j(self, project_name: str, diagram_type: str, id_assigner: Optional[StoredIdAssigner],
+                                 entities: List[Dict[str, Any]], relationships: List[Dict[str, Any]] = None) -> None:
+        # Ids are assigned before the write, like the diff sync of the Neo4j processing does for the entities file
+        if id_assigner is not None:
+            entities = id_assigner.assign(entities)
+        try:
+            if entities:
+                self.neo4j_adapter.create_or_update_entities_and_keywords(project_name, diagram_type, entities)
+            if relationships:
+                self.neo4j_adapter.create_relationships(project_name, diagram_type, relationships)
+        except Exception as e:
+            logger.warning(f"Streaming extracted records to Neo4j failed: {str(e)}")
+    
     async def monitor_task(self, task_id: str) -> Dict[str, Any]:
         try:
             return await self.async_task_adapter.monitor_task(task_id, self.update_processing_status)
@@ -0,0 +1,82 @@
+# src/application/services/adaptive_concurrency.py
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for OpenAI rate-limit errors, whether raised by the SDK or wrapped by an HTTP client."""
+    if type(error).__name__ == "RateLimitError":
+        return True
+    status_code = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status_code == 429
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Bounds the number of concurrent calls with additive-increase / multiplicative-decrease.
+
+    The limit grows by one after as many successful calls as the current limit and is halved when a call is rate
+    limited. Rate-limited calls are retried with jittered exponential backoff.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 16, max_retries: int = 5,
+                 backoff_seconds: float = 2.0, max_backoff_seconds: float = 60.0):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._active = 0
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def call(self, function: Callable[..., Any], *args: Any) -> Any:
+        for attempt in range(self.max_retries + 1):
+            self._acquire()
+            try:
+                result = function(*args)
+            except Exception as e:
+                self._release(success=False)
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                self._decrease()
+                delay = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+                continue
+            self._release(success=True)
+            return result
+
+    def _acquire(self) -> None:
+        with self._condition:
+            while self._active >= self.limit:
+                self._condition.wait()
+            self._active += 1
+
+    def _release(self, success: bool) -> None:
+        with self._condition:
+            self._active -= 1
+            if success:
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self._successes = 0
+            self._condition.notify_all()
+
+    def _decrease(self) -> None:
+        with self._condition:
+            # Calls that were in flight together hit the same rate limit: halve once per backoff period
+            now = time.monotonic()
+            if now - self._last_decrease < self.backoff_seconds:
+                return
+            self._last_decrease = now
+            self._successes = 0
+            if self.limit > self.minimum:
+                self.limit = max(self.minimum, self.limit // 2)
+                logger.warning(f"Rate limited, concurrency reduced to {self.limit}")
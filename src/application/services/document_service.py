@@ -1,8 +1,11 @@
 # src/application/services/document_service.py
 
 from src.domain.ports.document_adapter_protocol import DocumentAdapterProtocol
+from src.domain.ports.summary_cache_protocol import SummaryCacheProtocol
+from src.application.services.adaptive_concurrency import AdaptiveConcurrencyLimiter
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
-from typing import List, Any
+from typing import List, Dict, Any, Callable, Iterable, Optional
 import logging
 import os
 
@@ -11,8 +14,16 @@ logger = logging.getLogger("uvicorn.error")
 
 
 class DocumentService:
-    def __init__(self, document_adapter: DocumentAdapterProtocol):
+    def __init__(self, document_adapter: DocumentAdapterProtocol, summary_cache: Optional[SummaryCacheProtocol] = None,
+                 summarization_config: Dict[str, Any] = None):
         self.document_adapter = document_adapter
+        self.summary_cache = summary_cache
+        summarization_config = summarization_config or {}
+        self.token_budget = summarization_config.get('token_budget')
+        self.reduce_group_tokens = summarization_config.get('reduce_group_tokens', 6000)
+        self.max_reduce_rounds = summarization_config.get('max_reduce_rounds', 5)
+        concurrency_config = summarization_config.get('concurrency')
+        self.concurrency_limiter = AdaptiveConcurrencyLimiter(**concurrency_config) if concurrency_config else None
 
     def load_document(self, file_path: str) -> str:
         logger.info(f"Tentative de chargement du document : {file_path}")
@@ -21,6 +32,14 @@ class DocumentService:
             raise FileNotFoundError(f"Le fichier n'existe pas : {file_path}")
         return self.document_adapter.load_document(file_path)
 
+    def stream_document_chunks(self, file_path: str) -> Iterable[Any]:
+        """Chunks of a document, read and split lazily."""
+        logger.info(f"Tentative de lecture en flux du document : {file_path}")
+        if not os.path.exists(file_path):
+            logger.error(f"Le fichier n'existe pas : {file_path}")
+            raise FileNotFoundError(f"Le fichier n'existe pas : {file_path}")
+        return self.document_adapter.split_stream(self.document_adapter.stream_document(file_path))
+
     def split_text(self, text: str, chunk_size: int = None, chunk_overlap: int = None) -> List[Any]:
         """
 
@@ -30,18 +49,119 @@ class DocumentService:
         """
         return self.document_adapter.split_text(text, chunk_size, chunk_overlap)
 
-    def summarize_text_parallel(self, docs: List[Any], max_workers: int = 5) -> str:
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            summaries = list(executor.map(self.document_adapter.process_document, docs))
-
-        processed_summaries = []
-        for summary in summaries:
-            if isinstance(summary, dict):
-                summary_text = summary.get('summary', '')
-                processed_summaries.append(str(summary_text))
-            elif isinstance(summary, str):
-                processed_summaries.append(summary)
-            else:
-                processed_summaries.append(str(summary))
-
-        return " ".join(processed_summaries)
\ No newline at end of file
+    def summarize_document(self, file_path: str, max_workers: int = 5, use_cache: bool = True,
+                           streaming: bool = True) -> str:
+        """
+        Summary of a document file, reused from the summary cache while the file is unchanged.
+
+        When the file changed, only the chunks whose text changed are summarized again, the others come from the
+        summary cache. With a token budget, the chunk summaries are then reduced in rounds until they fit in it.
+        """
+        document_key = None
+        if self.summary_cache is not None and os.path.exists(file_path):
+            document_key = self.summary_cache.document_key(file_path)
+            cached = self.summary_cache.get(document_key) if use_cache else None
+            if cached is not None:
+                logger.info(f"Résumé du document {file_path} repris du cache")
+                return cached
+
+        if streaming:
+            summaries = self._map_stream(self.stream_document_chunks(file_path), max_workers, use_cache)
+        else:
+            docs = self.split_text(self.load_document(file_path))
+            summaries = self._map_parallel(docs, max_workers, use_cache)
+        summary = self.reduce_summaries(summaries, max_workers, use_cache) if self.token_budget else " ".join(summaries)
+
+        if document_key is not None and summary:
+            self.summary_cache.set(document_key, summary)
+        return summary
+
+    def summarize_text_parallel(self, docs: List[Any], max_workers: int = 5, use_cache: bool = True) -> str:
+        return " ".join(self._map_parallel(docs, max_workers, use_cache))
+
+    def summarize_stream(self, docs: Iterable[Any], max_workers: int = 5, use_cache: bool = True) -> str:
+        """
+        Summarizes chunks as they are produced, keeping at most 2 * max_workers of them in flight so that the
+        reading of the document is throttled by the summarization.
+        """
+        return " ".join(self._map_stream(docs, max_workers, use_cache))
+
+    def reduce_summaries(self, summaries: List[str], max_workers: int = 5, use_cache: bool = True) -> str:
+        """
+        Summarizes groups of summaries, round after round, until their total size fits in the token budget.
+
+        Each group holds at most reduce_group_tokens tokens and, while there are several summaries, at least two of
+        them, so every round shrinks the text.
+        """
+        for round_number in range(1, self.max_reduce_rounds + 1):
+            counts = [self.document_adapter.count_tokens(summary) for summary in summaries]
+            if sum(counts) <= self.token_budget:
+                break
+            groups = self._group_summaries(summaries, counts)
+            logger.info(f"Réduction {round_number} : {len(summaries)} résumés ({sum(counts)} tokens) "
+                        f"en {len(groups)} groupes")
+            with ThreadPoolExecutor(max_workers=self._pool_size(max_workers)) as executor:
+                summaries = list(executor.map(
+                    lambda group: self._limited(self.document_adapter.summarize_texts, group, use_cache), groups))
+        return " ".join(summaries)
+
+    def _group_summaries(self, summaries: List[str], counts: List[int]) -> List[List[str]]:
+        groups, group, group_tokens = [], [], 0
+        for summary, count in zip(summaries, counts):
+            if len(group) >= 2 and group_tokens + count > self.reduce_group_tokens:
+                groups.append(group)
+                group, group_tokens = [], 0
+            group.append(summary)
+            group_tokens += count
+        if len(group) == 1 and groups:
+            groups[-1].extend(group)
+        elif group:
+            groups.append(group)
+        return groups
+
+    def _map_parallel(self, docs: List[Any], max_workers: int, use_cache: bool) -> List[str]:
+        with ThreadPoolExecutor(max_workers=self._pool_size(max_workers)) as executor:
+            return list(executor.map(lambda doc: self._summarize_chunk(doc, use_cache), docs))
+
+    def _map_stream(self, docs: Iterable[Any], max_workers: int, use_cache: bool) -> List[str]:
+        summaries = []
+        pending = deque()
+        pool_size = self._pool_size(max_workers)
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            for doc in docs:
+                pending.append(executor.submit(self._summarize_chunk, doc, use_cache))
+                if len(pending) >= 2 * pool_size:
+                    summaries.append(pending.popleft().result())
+            while pending:
+                summaries.append(pending.popleft().result())
+        return summaries
+
+    def _pool_size(self, max_workers: int) -> int:
+        # The limiter decides how many calls run at once, the pool only has to allow its maximum
+        return self.concurrency_limiter.maximum if self.concurrency_limiter else max_workers
+
+    def _limited(self, function: Callable[..., Any], *args: Any) -> Any:
+        if self.concurrency_limiter is None:
+            return function(*args)
+        return self.concurrency_limiter.call(function, *args)
+
+    def _summarize_chunk(self, doc: Any, use_cache: bool) -> str:
+        if self.summary_cache is None:
+            return self._summary_text(self._limited(self.document_adapter.process_document, doc, use_cache))
+
+        chunk_key = self.summary_cache.chunk_key(doc.page_content)
+        cached = self.summary_cache.get(chunk_key) if use_cache else None
+        if cached is not None:
+            return cached
+        summary = self._summary_text(self._limited(self.document_adapter.process_document, doc, use_cache))
+        if summary:
+            self.summary_cache.set(chunk_key, summary)
+        return summary
+
+    @staticmethod
+    def _summary_text(summary: Any) -> str:
+        if isinstance(summary, dict):
+            return str(summary.get('summary', ''))
+        if isinstance(summary, str):
+            return summary
+        return str(summary)
@@ -0,0 +1,132 @@
+# src/application/services/entity_ann_index.py
+import logging
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class EntityANNIndex:
+    """
+    In-process IVF (inverted file) index over unit-normalized entity embeddings.
+
+    Embeddings are clustered with a few rounds of spherical k-means, each entity is stored in the list of its
+    closest centroid, and a search only scans the ``n_probe`` lists closest to the query. ``n_probe`` is the
+    recall vs speed knob: probing every list is an exact search.
+    """
+
+    def __init__(self, n_lists: int = 0, n_probe: int = 8, train_iterations: int = 10,
+                 max_training_points: int = 50000, block_size: int = 4096, seed: int = 0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_iterations = train_iterations
+        self.max_training_points = max_training_points
+        self.block_size = block_size
+        self.seed = seed
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        self.positions = np.empty(0, dtype=np.int64)
+        self.centroids = np.empty((0, 0), dtype=np.float32)
+        self.list_members = np.empty(0, dtype=np.int64)
+        self.list_indptr = np.zeros(1, dtype=np.int64)
+
+    def build(self, vectors: np.ndarray, valid: np.ndarray) -> None:
+        """
+        Index the valid rows of ``vectors``, which must be unit-normalized float32 embeddings.
+
+        Search results are expressed as row positions in ``vectors``.
+        """
+        self.positions = np.flatnonzero(valid)
+        self.vectors = vectors[self.positions]
+        size = len(self.positions)
+        if size == 0:
+            return
+
+        n_lists = min(self.n_lists or int(math.sqrt(size)), size)
+        self.centroids = self._train(n_lists)
+        assignments = self._nearest_centroids(self.vectors, 1)[:, 0]
+
+        self.list_members = np.argsort(assignments, kind='stable')
+        self.list_indptr = np.concatenate(([0], np.cumsum(np.bincount(assignments, minlength=n_lists))))
+        logger.info(f"ANN index built: {size} entities in {n_lists} lists, probing {self.n_probe}")
+
+    def _train(self, n_lists: int) -> np.ndarray:
+        rng = np.random.default_rng(self.seed)
+        size = len(self.vectors)
+        sample = self.vectors[rng.choice(size, min(size, max(self.max_training_points, n_lists)), replace=False)]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+        for _ in range(self.train_iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            norms = np.linalg.norm(sums, axis=1)
+            # Empty lists keep their previous centroid
+            filled = norms > 0
+            centroids[filled] = sums[filled] / norms[filled, None]
+        return centroids
+
+    def _nearest_centroids(self, queries: np.ndarray, count: int) -> np.ndarray:
+        count = min(count, len(self.centroids))
+        nearest = np.empty((len(queries), count), dtype=np.int64)
+        for start in range(0, len(queries), self.block_size):
+            scores = queries[start:start + self.block_size] @ self.centroids.T
+            if count == 1:
+                nearest[start:start + self.block_size, 0] = np.argmax(scores, axis=1)
+            else:
+                nearest[start:start + self.block_size] = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+        return nearest
+
+    def candidate_pairs(self, top_k: int,
+                        rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Search the ``top_k`` approximate neighbours of every indexed entity, or only of the given ``rows``.
+
+        :param rows: Optional. Row positions in the indexed ``vectors`` of the entities to search for.
+        :return: Deduplicated pairs as (left, right, cosine) arrays, with left < right and sorted by (left, right).
+        """
+        size = len(self.positions)
+        queries = np.arange(size, dtype=np.int64) if rows is None else np.flatnonzero(np.isin(self.positions, rows))
+        if size < 2 or top_k <= 0 or len(queries) == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0, dtype=np.float32)
+
+        probes = self._nearest_centroids(self.vectors[queries], self.n_probe)
+        probe_queries = np.repeat(queries, probes.shape[1])
+        probe_lists = probes.ravel()
+        order = np.argsort(probe_lists, kind='stable')
+        probe_queries, probe_lists = probe_queries[order], probe_lists[order]
+        boundaries = np.searchsorted(probe_lists, np.arange(len(self.centroids) + 1))
+
+        found_queries, found_members, found_scores = [], [], []
+        for list_id in range(len(self.centroids)):
+            queries = probe_queries[boundaries[list_id]:boundaries[list_id + 1]]
+            members = self.list_members[self.list_indptr[list_id]:self.list_indptr[list_id + 1]]
+            if len(queries) == 0 or len(members) == 0:
+                continue
+            for start in range(0, len(queries), self.block_size):
+                block = queries[start:start + self.block_size]
+                scores = self.vectors[block] @ self.vectors[members].T
+                scores[block[:, None] == members[None, :]] = -np.inf
+                keep = min(top_k, len(members))
+                best = np.argpartition(-scores, keep - 1, axis=1)[:, :keep]
+                found_queries.append(np.repeat(block, keep))
+                found_members.append(members[best].ravel())
+                found_scores.append(np.take_along_axis(scores, best, axis=1).ravel())
+
+        queries = np.concatenate(found_queries)
+        members = np.concatenate(found_members)
+        scores = np.concatenate(found_scores)
+
+        # Keep the top_k best members of every query across all the probed lists
+        order = np.lexsort((-scores, queries))
+        queries, members, scores = queries[order], members[order], scores[order]
+        first = np.searchsorted(queries, queries, side='left')
+        keep = (np.arange(len(queries)) - first < top_k) & np.isfinite(scores)
+        queries, members, scores = queries[keep], members[keep], scores[keep]
+
+        left = self.positions[np.minimum(queries, members)]
+        right = self.positions[np.maximum(queries, members)]
+        _, unique = np.unique(left * (self.positions[-1] + 1) + right, return_index=True)
+        return left[unique], right[unique], scores[unique]
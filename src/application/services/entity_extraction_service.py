@@ -1,5 +1,6 @@
 # src/application/services/entity_extraction_service.py
 from src.domain.ports.entity_extraction_adapter_protocol import EntityExtractionAdapterProtocol
+from typing import Dict, Any, Iterator, Tuple
 import logging
 
 logger = logging.getLogger("uvicorn.error")
@@ -9,14 +10,21 @@ class EntityExtractionService:
     def __init__(self, entity_extraction_adapter: EntityExtractionAdapterProtocol):
         self.entity_extraction_adapter = entity_extraction_adapter
 
-    def extract_entities_and_relationships(self, diagram_content):
+    def extract_entities_and_relationships(self, diagram_content, use_cache: bool = True):
         if not diagram_content:
             logger.warning("Le contenu du diagramme est vide")
             return {"entities": [], "relationships": []}
 
-        result = self.entity_extraction_adapter.extract_entities_and_relationships(diagram_content)
+        result = self.entity_extraction_adapter.extract_entities_and_relationships(diagram_content, use_cache)
 
         if not result.get("entities") and not result.get("relationships"):
             logger.warning("Aucune entité ou relation n'a été extraite")
 
         return result
+
+    def stream_entities_and_relationships(self, diagram_content,
+                                          use_cache: bool = True) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        if not diagram_content:
+            logger.warning("Le contenu du diagramme est vide")
+            return iter(())
+        return self.entity_extraction_adapter.stream_entities_and_relationships(diagram_content, use_cache)
@@ -0,0 +1,125 @@
+# src/application/services/graph_diff.py
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Set, Tuple
+
+from src.domain.models.entity import build_entity_id
+
+
+@dataclass
+class GraphDiff:
+    """Writes needed to bring the stored graph of a diagram to a new extraction result."""
+    created: List[Dict[str, Any]] = field(default_factory=list)
+    updated: List[Dict[str, Any]] = field(default_factory=list)
+    deleted_ids: List[str] = field(default_factory=list)
+    unlinked_keywords: List[Dict[str, str]] = field(default_factory=list)
+    embedding_ids: List[str] = field(default_factory=list)
+    created_relationships: List[Dict[str, str]] = field(default_factory=list)
+    deleted_relationships: List[Dict[str, str]] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            'created': len(self.created),
+            'updated': len(self.updated),
+            'deleted': len(self.deleted_ids),
+            'unlinked_keywords': len(self.unlinked_keywords),
+            'created_relationships': len(self.created_relationships),
+            'deleted_relationships': len(self.deleted_relationships),
+        }
+
+
+def _relationship_key(relationship: Dict[str, Any]) -> Tuple[str, str, str]:
+    return relationship['source'], relationship['type'].upper(), relationship['target']
+
+
+def _entity_key(entity: Dict[str, Any]) -> Tuple[str, str]:
+    return entity.get('name'), entity.get('type')
+
+
+class StoredIdAssigner:
+    """
+    Assigns the ids of assign_stored_ids to entities that arrive in batches, as when extracted records are streamed
+    to Neo4j. Stored matches and new ids are consumed across batches, so the ids are the same as for a single call
+    on all the entities.
+    """
+
+    def __init__(self, project_name: str, diagram_type: str, stored: Dict[str, Any]):
+        prefix = build_entity_id(project_name, diagram_type, '')
+        self.diagram_type = diagram_type
+        self.stored_ids: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+        for entity_id in sorted(stored.get('entities', {})):
+            self.stored_ids[_entity_key(stored['entities'][entity_id]['properties'])].append(entity_id[len(prefix):])
+        self.used_ids = {entity_id[len(prefix):] for entity_id in stored.get('entities', {})}
+        self.next_index = 0
+
+    def assign(self, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        assigned = []
+        for entity in entities:
+            matches = self.stored_ids.get(_entity_key(entity))
+            if matches:
+                assigned.append({**entity, 'id': matches.pop(0)})
+                continue
+            while f"{self.diagram_type}_{self.next_index}" in self.used_ids:
+                self.next_index += 1
+            self.used_ids.add(f"{self.diagram_type}_{self.next_index}")
+            assigned.append({**entity, 'id': f"{self.diagram_type}_{self.next_index}"})
+        return assigned
+
+
+def assign_stored_ids(project_name: str, diagram_type: str, stored: Dict[str, Any],
+                      entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Gives every entity the id of the stored entity with the same name and type, so that inserting or removing an
+    entity in the diagram does not shift the ids of the others. Entities without a stored match get an id that no
+    stored entity uses.
+    """
+    return StoredIdAssigner(project_name, diagram_type, stored).assign(entities)
+
+
+def diff_diagram(project_name: str, diagram_type: str, stored: Dict[str, Any], entities: List[Dict[str, Any]],
+                 relationships: List[Dict[str, Any]]) -> GraphDiff:
+    """
+    Compares the stored state of a diagram (as returned by the adapter's get_diagram_state) with the entities and
+    relationships of its entities file, whose ids must come from assign_stored_ids.
+
+    An entity is updated when one of its properties differs from the stored node, properties that are no longer
+    extracted being left as they are, like SET += does. Its keywords are merged again and the ones it lost are
+    unlinked. Embeddings are only written for created and updated entities, and for stored ones without embedding.
+
+    Relationships are matched by entity name, like in the Cypher statements. Deleting an entity also deletes the
+    relationships of its node, so the current relationships that involve its name are created again.
+    """
+    diff = GraphDiff()
+    stored_entities = stored.get('entities', {})
+    current_ids: Set[str] = set()
+    for entity in entities:
+        entity_id = build_entity_id(project_name, diagram_type, entity['id'])
+        current_ids.add(entity_id)
+        stored_entity = stored_entities.get(entity_id)
+        if stored_entity is None:
+            diff.created.append(entity)
+            diff.embedding_ids.append(entity['id'])
+            continue
+
+        properties = stored_entity['properties']
+        if any(properties.get(key) != value for key, value in entity.items() if key != 'id'):
+            diff.updated.append(entity)
+            diff.embedding_ids.append(entity['id'])
+            keywords = set(entity.get('keywords') or [])
+            diff.unlinked_keywords.extend({'id': entity_id, 'keyword': keyword}
+                                          for keyword in stored_entity['keywords'] if keyword not in keywords)
+        elif not stored_entity['has_embedding']:
+            diff.embedding_ids.append(entity['id'])
+
+    diff.deleted_ids = [entity_id for entity_id in stored_entities if entity_id not in current_ids]
+    deleted_names = {stored_entities[entity_id]['properties'].get('name') for entity_id in diff.deleted_ids}
+
+    stored_relationships = {_relationship_key(relationship) for relationship in stored.get('relationships', [])}
+    current_relationships = {_relationship_key(relationship) for relationship in relationships}
+    kept_relationships = {(source, rel_type, target) for source, rel_type, target in stored_relationships
+                          if source not in deleted_names and target not in deleted_names}
+    diff.created_relationships = [{'source': source, 'type': rel_type, 'target': target}
+                                  for source, rel_type, target in current_relationships - kept_relationships]
+    diff.deleted_relationships = [{'source': source, 'type': rel_type, 'target': target}
+                                  for source, rel_type, target in stored_relationships - current_relationships]
+    return diff
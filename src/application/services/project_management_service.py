@@ -9,6 +9,52 @@ from src.infrastructure.config import config
 logger = logging.getLogger("uvicorn.error")
 
 
+class EntitiesFileWriter:
+    """
+    Writes an entities and relationships file record by record.
+
+    Entities are written as they arrive. Relationships come after them in the extraction output and are kept until
+    the writer is closed. The file is written under a temporary name and renamed on close, so readers never see a
+    partial file; closing after an error keeps every record received so far.
+    """
+    
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.entity_count = 0
+        self.relationships: List[Dict[str, Any]] = []
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._temporary_path = f"{file_path}.tmp"
+        self._file = open(self._temporary_path, 'w', encoding='utf-8')
+        self._file.write('{\n  "entities": [')
+    
+    def add_entity(self, entity: Dict[str, Any]) -> None:
+        separator = "," if self.entity_count else ""
+        self._file.write(f"{separator}\n    {json.dumps(entity, ensure_ascii=False)}")
+        self.entity_count += 1
+    
+    def add_relationship(self, relationship: Dict[str, Any]) -> None:
+        self.relationships.append(relationship)
+    
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        relationships = ",".join(f"\n    {json.dumps(relationship, ensure_ascii=False)}"
+                                 for relationship in self.relationships)
+        self._file.write(f'\n  ],\n  "relationships": [{relationships}\n  ]\n}}\n')
+        self._file.close()
+        os.replace(self._temporary_path, self.file_path)
+        logger.info(f"Entities and relationships saved: {self.file_path} "
+                    f"({self.entity_count} entities, {len(self.relationships)} relationships)")
+    
+    def __enter__(self) -> "EntitiesFileWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
 class ProjectManagementService:
     def __init__(self):
         self.config = config
@@ -77,6 +123,10 @@ class ProjectManagementService:
         logger.debug(
             f"Number of entities: {len(data.get('entities', []))}, Number of relationships: {len(data.get('relationships', []))}")
     
+    @staticmethod
+    def open_entities_writer(file_path: str) -> EntitiesFileWriter:
+        return EntitiesFileWriter(file_path)
+    
     def _save_file(self, file_path: str, content: str, file_type: str) -> None:
         try:
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
@@ -6,14 +6,14 @@ class RAGService:
     def __init__(self, rag_adapter: RAGAdapterProtocol):
         self.rag_adapter = rag_adapter
     
-    def generate_with_fallback(self, prompt_template: str, content: str) -> str:
-        rag_result, rag_success = self.rag_adapter.rag_pipeline(content, prompt_template)
+    def generate_with_fallback(self, prompt_template: str, content: str, use_cache: bool = True) -> str:
+        rag_result, rag_success = self.rag_adapter.rag_pipeline(content, prompt_template, use_cache)
         if rag_success:
             return rag_result
         
         # Fallback mechanism
-        return self.fallback_generation(prompt_template, content)
+        return self.fallback_generation(prompt_template, content, use_cache)
     
-    def fallback_generation(self, prompt_template: str, content: str) -> str:
+    def fallback_generation(self, prompt_template: str, content: str, use_cache: bool = True) -> str:
         # This method should be implemented in RAGAdapter
-        return self.rag_adapter.fallback_generation(prompt_template, content)
\ No newline at end of file
+        return self.rag_adapter.fallback_generation(prompt_template, content, use_cache)
\ No newline at end of file
@@ -0,0 +1,229 @@
+# src/application/services/similarity_engine.py
+import logging
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from src.application.services.entity_ann_index import EntityANNIndex
+from src.domain.models.entity_matrix import EntityMatrix
+
+logger = logging.getLogger("uvicorn.error")
+
+# Scores are screened in float32 with this margin below the threshold, candidates are then re-scored exactly
+SCREENING_MARGIN = 1e-4
+
+
+def _encode(values: Sequence[Any]) -> np.ndarray:
+    codes: Dict[str, int] = {}
+    return np.fromiter((codes.setdefault(f"{value}", len(codes)) for value in values),
+                       dtype=np.int64, count=len(values))
+
+
+class _PreparedMatrix:
+    """Pre-normalized float32 embeddings plus integer-coded contextual sets."""
+
+    def __init__(self, matrix: EntityMatrix):
+        self.matrix = matrix
+        self.size = len(matrix)
+        vectors = matrix.vectors
+
+        # Row norms computed exactly like np.linalg.norm on a single vector, so exact re-scoring matches it
+        self.norms = np.fromiter((np.linalg.norm(np.asarray(vector, dtype=np.float64)) for vector in vectors),
+                                 dtype=np.float64, count=self.size)
+        self.valid = np.isfinite(self.norms) & (self.norms > 0)
+        safe_norms = np.where(self.valid, self.norms, 1.0)
+        if vectors.dtype == np.float32:
+            # Columnar fetch: normalized without a float64 copy of the matrix
+            self.unit = vectors / safe_norms[:, None].astype(np.float32)
+        else:
+            self.unit = (vectors / safe_norms[:, None]).astype(np.float32, copy=False)
+        self.unit[~self.valid] = 0.0
+
+        self.id_codes = _encode(matrix.ids)
+        self.project_codes = _encode(matrix.project_names)
+        self.diagram_codes = _encode(matrix.diagram_types)
+        self.name_codes = _encode(matrix.names)
+        self._build_keyword_postings(matrix.keywords)
+
+    def _build_keyword_postings(self, keywords: Sequence[Sequence[str]]) -> None:
+        vocabulary: Dict[str, int] = {}
+        entity_keywords = [sorted({vocabulary.setdefault(f"{kw}", len(vocabulary)) for kw in entity_kws})
+                           for entity_kws in keywords]
+        counts = np.fromiter((len(kws) for kws in entity_keywords), dtype=np.int64, count=self.size)
+
+        # Contextual set = project + diagram + entity name + distinct keywords
+        self.set_sizes = counts + 3
+        self.entity_indptr = np.concatenate(([0], np.cumsum(counts)))
+        self.entity_keywords = np.fromiter((kw for kws in entity_keywords for kw in kws), dtype=np.int64,
+                                           count=int(counts.sum()))
+
+        # Inverted postings: keyword -> entities, sorted by keyword
+        owners = np.repeat(np.arange(self.size, dtype=np.int64), counts)
+        order = np.argsort(self.entity_keywords, kind='stable')
+        self.keyword_entities = owners[order]
+        keyword_counts = np.bincount(self.entity_keywords, minlength=len(vocabulary))
+        self.keyword_indptr = np.concatenate(([0], np.cumsum(keyword_counts)))
+
+    def keyword_sets(self) -> List[frozenset]:
+        return [frozenset(self.entity_keywords[start:stop].tolist())
+                for start, stop in zip(self.entity_indptr[:-1].tolist(), self.entity_indptr[1:].tolist())]
+
+    def keyword_overlap(self, rows: np.ndarray, col_start: int = 0) -> np.ndarray:
+        """Number of shared keywords between the given rows and the columns [col_start, n)."""
+        width = self.size - col_start
+        starts = self.entity_indptr[rows]
+        counts = self.entity_indptr[rows + 1] - starts
+        keywords = self.entity_keywords[_ranges(starts, counts)]
+        local_rows = np.repeat(np.arange(len(rows), dtype=np.int64), counts)
+
+        lengths = self.keyword_indptr[keywords + 1] - self.keyword_indptr[keywords]
+        cols = self.keyword_entities[_ranges(self.keyword_indptr[keywords], lengths)]
+        local_rows = np.repeat(local_rows, lengths)
+
+        keep = cols >= col_start
+        flat = local_rows[keep] * width + (cols[keep] - col_start)
+        return np.bincount(flat, minlength=len(rows) * width).reshape(len(rows), width)
+
+
+def _ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Concatenation of np.arange(start, start + length) for every (start, length)."""
+    total = int(lengths.sum())
+    offsets = np.arange(total, dtype=np.int64) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts, lengths) + offsets
+
+
+class SimilarityEngine:
+    """
+    Block-matrix implementation of the combined similarity of SimilarityService.
+
+    Cosine scores are computed tile by tile on pre-normalized float32 embeddings and the threshold is applied
+    with a vectorized mask. Only the pairs passing the mask are re-scored in float64 and turned into result
+    records, so the records are identical to the ones of the pairwise implementation.
+    """
+
+    def __init__(self, embedding_weight: float, keyword_weight: float, threshold: float, block_size: int = 512):
+        self.embedding_weight = embedding_weight
+        self.keyword_weight = keyword_weight
+        self.threshold = threshold
+        self.block_size = block_size
+
+    def calculate_similarities(self, matrix: EntityMatrix) -> List[Dict[str, Any]]:
+        prepared = _PreparedMatrix(matrix)
+        similarities = []
+        for row_start in range(0, prepared.size, self.block_size):
+            rows = np.arange(row_start, min(row_start + self.block_size, prepared.size))
+            # Only the upper triangle is needed: columns start at the first row of the block
+            pair_mask = rows[:, None] < np.arange(row_start, prepared.size)[None, :]
+            similarities.extend(self._score_rows(prepared, rows, row_start, pair_mask))
+        return similarities
+
+    def calculate_row_similarities(self, matrix: EntityMatrix, rows: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Score the given rows against every entity of the matrix.
+
+        Pairs between two of the given rows are only scored once. Records are oriented like in
+        calculate_similarities, the entity coming first in the matrix being ``id1``.
+        """
+        prepared = _PreparedMatrix(matrix)
+        rows = np.unique(rows)
+        selected = np.zeros(prepared.size, dtype=bool)
+        selected[rows] = True
+        cols = np.arange(prepared.size)
+
+        similarities = []
+        for block_start in range(0, len(rows), self.block_size):
+            block = rows[block_start:block_start + self.block_size]
+            pair_mask = cols[None, :] != block[:, None]
+            pair_mask &= ~(selected[None, :] & (cols[None, :] < block[:, None]))
+            similarities.extend(self._score_rows(prepared, block, 0, pair_mask))
+        return similarities
+
+    def calculate_candidate_similarities(self, matrix: EntityMatrix, index: EntityANNIndex, top_k: int,
+                                         rows: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """
+        Score only the pairs made of each entity, or each of the given rows, and its ``top_k`` approximate
+        neighbours from ``index``.
+
+        Records are built exactly like in calculate_similarities, for the subset of pairs found by the index.
+        """
+        prepared = _PreparedMatrix(matrix)
+        index.build(prepared.unit, prepared.valid)
+        left, right, scores = index.candidate_pairs(top_k, rows)
+        logger.info(f"Scoring {len(left)} candidate pairs from the ANN index")
+
+        keyword_sets = prepared.keyword_sets()
+        intersection = np.fromiter((len(keyword_sets[i] & keyword_sets[j])
+                                    for i, j in zip(left.tolist(), right.tolist())), dtype=np.int32, count=len(left))
+        for codes in (prepared.project_codes, prepared.diagram_codes, prepared.name_codes):
+            intersection += codes[left] == codes[right]
+        union = prepared.set_sizes[left] + prepared.set_sizes[right] - intersection
+
+        mask = self._screen(scores, intersection, union)
+        mask &= prepared.id_codes[left] != prepared.id_codes[right]
+
+        similarities = []
+        for position in np.flatnonzero(mask).tolist():
+            similarity = self._exact_similarity(prepared, int(left[position]), int(right[position]),
+                                                int(intersection[position]), int(union[position]))
+            if similarity is not None:
+                similarities.append(similarity)
+        return similarities
+
+    def _screen(self, scores: np.ndarray, intersection: np.ndarray, union: np.ndarray) -> np.ndarray:
+        """Turn float32 cosine scores into combined scores in place and return the candidate mask."""
+        jaccard = np.true_divide(intersection, union, dtype=np.float32)
+        scores *= self.embedding_weight
+        scores += self.keyword_weight * jaccard
+        scores /= self.embedding_weight + self.keyword_weight
+        return scores > self.threshold - SCREENING_MARGIN
+
+    def _score_rows(self, prepared: _PreparedMatrix, rows: np.ndarray, col_start: int,
+                    pair_mask: np.ndarray) -> List[Dict[str, Any]]:
+        cols = slice(col_start, prepared.size)
+        scores = prepared.unit[rows] @ prepared.unit[cols].T
+
+        intersection = prepared.keyword_overlap(rows, col_start).astype(np.int32)
+        for codes in (prepared.project_codes, prepared.diagram_codes, prepared.name_codes):
+            intersection += codes[rows, None] == codes[None, cols]
+        union = prepared.set_sizes[rows, None] + prepared.set_sizes[None, cols] - intersection
+
+        mask = self._screen(scores, intersection, union)
+        mask &= pair_mask
+        mask &= prepared.valid[rows, None] & prepared.valid[None, cols]
+        mask &= prepared.id_codes[rows, None] != prepared.id_codes[None, cols]
+
+        local_rows, local_cols = np.nonzero(mask)
+        similarities = []
+        for local_row, local_col in zip(local_rows.tolist(), local_cols.tolist()):
+            i, j = int(rows[local_row]), col_start + local_col
+            similarity = self._exact_similarity(prepared, min(i, j), max(i, j),
+                                                int(intersection[local_row, local_col]),
+                                                int(union[local_row, local_col]))
+            if similarity is not None:
+                similarities.append(similarity)
+        return similarities
+
+    def _exact_similarity(self, prepared: _PreparedMatrix, i: int, j: int, intersection: int,
+                          union: int) -> Optional[Dict[str, Any]]:
+        vectors = prepared.matrix.vectors
+        embedding_similarity = np.dot(np.asarray(vectors[i], dtype=np.float64),
+                                      np.asarray(vectors[j], dtype=np.float64)) / (prepared.norms[i] * prepared.norms[j])
+        jaccard_similarity = intersection / union if union != 0 else 0.0
+        combined_similarity = (self.embedding_weight * embedding_similarity
+                               + self.keyword_weight * jaccard_similarity) / (
+                                      self.embedding_weight + self.keyword_weight)
+        if not combined_similarity > self.threshold:
+            return None
+
+        matrix = prepared.matrix
+        return {
+            'id1': matrix.ids[i],
+            'id2': matrix.ids[j],
+            'project_name1': matrix.project_names[i],
+            'project_name2': matrix.project_names[j],
+            'diagram_type1': matrix.diagram_types[i],
+            'diagram_type2': matrix.diagram_types[j],
+            'combined_similarity': combined_similarity,
+            'embedding_similarity': embedding_similarity,
+            'jaccard_similarity': jaccard_similarity
+        }
@@ -1,42 +1,107 @@
+import hashlib
 import numpy as np
-from typing import List, Dict, Any, Set
+from dataclasses import dataclass
+from typing import List, Dict, Any, Set, Union
 import logging
 
+from src.application.services.entity_ann_index import EntityANNIndex
+from src.application.services.similarity_engine import SimilarityEngine, EntityMatrix
+
 logger = logging.getLogger("uvicorn.error")
 
 
+@dataclass
+class IncrementalSimilarityResult:
+    similarities: List[Dict[str, Any]]
+    changed_ids: List[str]
+    fingerprints: Dict[str, str]
+
+
 class SimilarityService:
-    def __init__(self, embedding_weight: float, keyword_weight: float, threshold: float):
+    def __init__(self, embedding_weight: float, keyword_weight: float, threshold: float, block_size: int = 512,
+                 ann_config: Dict[str, Any] = None):
         self.embedding_weight = embedding_weight
         self.keyword_weight = keyword_weight
         self.threshold = threshold
+        self.engine = SimilarityEngine(embedding_weight, keyword_weight, threshold, block_size)
+        self.ann_config = ann_config or {}
     
     @classmethod
     def create(cls, config: dict):
         return cls(
             embedding_weight=config['embedding_weight'],
             keyword_weight=config['keyword_weight'],
-            threshold=config['threshold']
+            threshold=config['threshold'],
+            block_size=config.get('block_size', 512),
+            ann_config=config.get('ann')
         )
     
-    def calculate_similarities(self, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def calculate_similarities(self, entities: Union[List[Dict[str, Any]], EntityMatrix]) -> List[Dict[str, Any]]:
         logger.info(f"Calculating similarities for {len(entities)} entities")
-        similarities = []
-        for i, entity1 in enumerate(entities):
-            for j, entity2 in enumerate(entities[i + 1:], start=i + 1):
-                if entity1['id'] != entity2['id']:
-                    similarity = self._calculate_entity_similarity(entity1, entity2)
-                    logger.debug(
-                        f"Similarity between {entity1['id']} and {entity2['id']}: {similarity['combined_similarity']}")
-                    if similarity['combined_similarity'] > self.threshold:
-                        similarities.append(similarity)
-                    else:
-                        logger.debug(
-                            f"Similarity below threshold: {similarity['combined_similarity']} < {self.threshold}")
-        
+        matrix = self._as_matrix(entities)
+        if self._use_ann_index(len(matrix)):
+            similarities = self.engine.calculate_candidate_similarities(
+                matrix, self._create_ann_index(), self.ann_config.get('top_k', 50))
+        else:
+            similarities = self.engine.calculate_similarities(matrix)
         logger.info(f"Found {len(similarities)} similarities above threshold")
         return similarities
     
+    def calculate_incremental_similarities(self, entities: Union[List[Dict[str, Any]], EntityMatrix]
+                                           ) -> IncrementalSimilarityResult:
+        """
+        Score only the entities whose fingerprint differs from their stored ``similarity_fingerprint``.
+
+        The fingerprint covers the embedding, the contextual set (project, diagram, name and keywords) and the
+        scoring parameters, so a pair needs re-scoring only when one of its two entities changed. Changed
+        entities are scored against the whole corpus, or against their nearest neighbours from the ANN index when
+        the corpus is large enough for it.
+        """
+        matrix = self._as_matrix(entities)
+        changed_rows = []
+        fingerprints = {}
+        for row in range(len(matrix)):
+            entity = matrix.row(row)
+            fingerprint = self._fingerprint(entity, matrix.vectors[row])
+            if fingerprint != entity['similarity_fingerprint']:
+                changed_rows.append(row)
+                fingerprints[entity['id']] = fingerprint
+        
+        logger.info(f"Calculating incremental similarities for {len(changed_rows)} changed entities "
+                    f"out of {len(matrix)}")
+        rows = np.array(changed_rows, dtype=np.int64)
+        if not changed_rows:
+            similarities = []
+        elif self._use_ann_index(len(matrix)):
+            similarities = self.engine.calculate_candidate_similarities(
+                matrix, self._create_ann_index(), self.ann_config.get('top_k', 50), rows)
+        else:
+            similarities = self.engine.calculate_row_similarities(matrix, rows)
+        logger.info(f"Found {len(similarities)} similarities above threshold")
+        return IncrementalSimilarityResult(similarities, list(fingerprints), fingerprints)
+    
+    @staticmethod
+    def _as_matrix(entities: Union[List[Dict[str, Any]], EntityMatrix]) -> EntityMatrix:
+        # An EntityMatrix (columnar fetch from Neo4j) is scored as is, without copying its vectors
+        return entities if isinstance(entities, EntityMatrix) else EntityMatrix.from_entities(entities)
+    
+    def _fingerprint(self, entity: Dict[str, Any], vector: np.ndarray) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{self.embedding_weight}|{self.keyword_weight}|{self.threshold}".encode())
+        digest.update(np.ascontiguousarray(vector, dtype=np.float64).tobytes())
+        contextual_set = sorted(self._create_contextual_set(entity))
+        digest.update("\x1f".join(contextual_set).encode())
+        return digest.hexdigest()
+    
+    def _use_ann_index(self, entity_count: int) -> bool:
+        return self.ann_config.get('enabled', False) and entity_count >= self.ann_config.get('min_entities', 5000)
+    
+    def _create_ann_index(self) -> EntityANNIndex:
+        return EntityANNIndex(
+            n_lists=self.ann_config.get('n_lists', 0),
+            n_probe=self.ann_config.get('n_probe', 8)
+        )
+    
     def _calculate_entity_similarity(self, entity1: Dict[str, Any], entity2: Dict[str, Any]) -> Dict[str, Any]:
         embedding_similarity = self._cosine_similarity(entity1['embedding'], entity2['embedding'])
         jaccard_similarity = self._contextual_jaccard_similarity(entity1, entity2)
@@ -10,3 +10,8 @@ class Entity:
         self.type = entity_type
         self.description = description
         self.keywords = keywords
+
+
+def build_entity_id(project_name: str, diagram_type: str, entity_id: str) -> str:
+    """Identifier of an entity in the graph, unique across projects and diagrams."""
+    return f"{project_name}_{diagram_type}_{entity_id}"
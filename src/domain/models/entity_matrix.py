@@ -0,0 +1,106 @@
+import logging
+from collections import Counter
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class EntityMatrix:
+    """
+    Columnar view of the entities compared by the similarity engine.
+
+    Embeddings are stacked in a single (n, dim) matrix while the fields used by the contextual Jaccard
+    similarity are kept in parallel sequences, in the same order as the source entities.
+
+    A matrix created by allocate() is filled row by row with append(): vectors is then a view on the first rows of
+    a preallocated buffer, grown only when its capacity is exceeded.
+    """
+
+    def __init__(self, ids: Sequence[str], names: Sequence[str], project_names: Sequence[str],
+                 diagram_types: Sequence[str], keywords: Sequence[Sequence[str]], vectors: np.ndarray,
+                 fingerprints: Optional[Sequence[Optional[str]]] = None):
+        self.ids = ids
+        self.names = names
+        self.project_names = project_names
+        self.diagram_types = diagram_types
+        self.keywords = keywords
+        self.vectors = vectors
+        self.fingerprints = fingerprints if fingerprints is not None else [None] * len(ids)
+        self._buffer: Optional[np.ndarray] = vectors
+        self._capacity = len(vectors)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_entities(cls, entities: List[Dict[str, Any]]) -> "EntityMatrix":
+        dimension = _dominant_dimension(entities)
+        vectors = np.zeros((len(entities), dimension), dtype=np.float64)
+        for index, entity in enumerate(entities):
+            embedding = entity['embedding']
+            if len(embedding) == dimension:
+                vectors[index] = embedding
+            else:
+                # Left as a zero vector, which the engine treats as invalid
+                logger.warning(f"Ignoring embedding of entity {entity['id']}: "
+                               f"expected {dimension} dimensions, got {len(embedding)}")
+
+        return cls(
+            ids=[entity['id'] for entity in entities],
+            names=[entity['name'] for entity in entities],
+            project_names=[entity['project_name'] for entity in entities],
+            diagram_types=[entity['diagram_type'] for entity in entities],
+            keywords=[entity['keywords'] for entity in entities],
+            vectors=vectors,
+            fingerprints=[entity.get('similarity_fingerprint') for entity in entities]
+        )
+
+    @classmethod
+    def allocate(cls, capacity: int, dimension: Optional[int] = None, dtype=np.float32) -> "EntityMatrix":
+        """Empty matrix with room for capacity rows; without dimension, the first embedding appended sets it."""
+        matrix = cls([], [], [], [], [], np.zeros((0, dimension or 0), dtype=dtype), [])
+        matrix._buffer = np.zeros((capacity, dimension), dtype=dtype) if dimension is not None else None
+        matrix._capacity = capacity
+        return matrix
+
+    def append(self, entity: Dict[str, Any]) -> None:
+        """Adds an entity with the fields of from_entities, writing its embedding into the buffer."""
+        row = len(self.ids)
+        embedding = entity['embedding']
+        if self._buffer is None:
+            self._buffer = np.zeros((max(self._capacity, 1), len(embedding)), dtype=self.vectors.dtype)
+        if row == len(self._buffer):
+            grown = np.zeros((max(16, 2 * row), self._buffer.shape[1]), dtype=self._buffer.dtype)
+            grown[:row] = self._buffer[:row]
+            self._buffer = grown
+        if len(embedding) == self._buffer.shape[1]:
+            self._buffer[row] = embedding
+        else:
+            self._buffer[row] = 0.0
+            logger.warning(f"Ignoring embedding of entity {entity['id']}: "
+                           f"expected {self._buffer.shape[1]} dimensions, got {len(embedding)}")
+        self.ids.append(entity['id'])
+        self.names.append(entity['name'])
+        self.project_names.append(entity['project_name'])
+        self.diagram_types.append(entity['diagram_type'])
+        self.keywords.append(entity['keywords'])
+        self.fingerprints.append(entity.get('similarity_fingerprint'))
+        self.vectors = self._buffer[:row + 1]
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """The fields of an entity, without its embedding."""
+        return {
+            'id': self.ids[index],
+            'name': self.names[index],
+            'project_name': self.project_names[index],
+            'diagram_type': self.diagram_types[index],
+            'keywords': self.keywords[index],
+            'similarity_fingerprint': self.fingerprints[index]
+        }
+
+
+def _dominant_dimension(entities: List[Dict[str, Any]]) -> int:
+    dimensions = Counter(len(entity['embedding']) for entity in entities)
+    return dimensions.most_common(1)[0][0] if dimensions else 0
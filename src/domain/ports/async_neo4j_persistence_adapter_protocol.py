@@ -0,0 +1,41 @@
+from typing import Protocol, Dict, Any
+
+
+class AsyncNeo4jPersistenceAdapterProtocol(Protocol):
+    """
+    Protocol for interacting with a Neo4j persistence adapter from asyncio code.
+
+    Connection, health and schema operations of Neo4jPersistenceAdapterProtocol, as coroutines, for the web layer.
+    """
+
+    async def connect(self) -> None:
+        """
+        Establishes a connection to the Neo4j database.
+        """
+
+    async def is_connected(self) -> bool:
+        """
+        Check if the object is currently connected to the Neo4j database, from the cached health state.
+
+        :return: True if the object is connected, False otherwise.
+        :rtype: bool
+        """
+
+    async def ensure_schema(self) -> Dict[str, Any]:
+        """
+        Creates the uniqueness constraints and lookup indexes used by the adapter queries, if they do not exist.
+
+        :return: The schema drift report, as returned by check_schema.
+        """
+
+    async def check_schema(self) -> Dict[str, Any]:
+        """
+        Compares the database schema with the constraints and indexes expected by the adapter.
+
+        :return: The names of the missing, not yet online and unexpected constraints and indexes.
+        """
+
+    async def close_neo4j(self) -> None:
+        """
+        Closes the connection to the Neo4j database.
+        """
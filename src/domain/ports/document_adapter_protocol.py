@@ -1,5 +1,5 @@
 # src/domain/ports/document_adapter_protocol.py
-from typing import List, Any, Protocol
+from typing import List, Any, Protocol, Iterable, Iterator
 
 
 class DocumentAdapterProtocol(Protocol):
@@ -9,8 +9,12 @@ class DocumentAdapterProtocol(Protocol):
 
     Methods:
         - load_document(file_path: str) -> str: Loads a document from the specified file path and returns its contents as a string.
+        - stream_document(file_path: str) -> Iterator[str]: Yields the pages or paragraphs of a document as they are read.
         - split_text(text: str, chunk_size: int = None, chunk_overlap: int = None) -> List[Any]: Splits the given text into chunks of specified size with a specified overlap and returns a list of chunks.
-        - process_document(doc: Any) -> str: Processes the given document and returns a processed version as a string.
+        - split_stream(segments: Iterable[str]) -> Iterator[Any]: Splits a stream of text segments into chunks, yielding each chunk as soon as it is complete.
+        - process_document(doc: Any, use_cache: bool = True) -> str: Processes the given document and returns a processed version as a string.
+        - summarize_texts(texts: List[str], use_cache: bool = True) -> str: Summarizes several texts into one summary.
+        - count_tokens(text: str) -> int: Returns the number of model tokens of a text.
 
     Note:
         This is an abstract class and should not be instantiated directly. Concrete classes should extend this class and implement the required methods.
@@ -23,7 +27,7 @@ class DocumentAdapterProtocol(Protocol):
             def split_text(self, text: str, chunk_size: int = None, chunk_overlap: int = None) -> List[Any]:
                 # Implementation goes here
 
-            def process_document(self, doc: Any) -> str:
+            def process_document(self, doc: Any, use_cache: bool = True) -> str:
                 # Implementation goes here
     """
     def load_document(self, file_path: str) -> str:
@@ -35,6 +39,15 @@ class DocumentAdapterProtocol(Protocol):
         """
         raise NotImplementedError("This method should be overridden")
 
+    def stream_document(self, file_path: str) -> Iterator[str]:
+        """
+        Stream a document from the given file path.
+
+        :param file_path: The path to the document file.
+        :return: An iterator over the pages or paragraphs of the document.
+        """
+        raise NotImplementedError("This method should be overridden")
+
     def split_text(self, text: str, chunk_size: int = None, chunk_overlap: int = None) -> List[Any]:
         """
         Split the given text into chunks of specified size, with optional overlap.
@@ -53,11 +66,40 @@ class DocumentAdapterProtocol(Protocol):
         """
         raise NotImplementedError("This method should be overridden")
 
-    def process_document(self, doc: Any) -> str:
+    def split_stream(self, segments: Iterable[str]) -> Iterator[Any]:
+        """
+        Split a stream of text segments into chunks.
+
+        :param segments: The pages or paragraphs of a document, in order.
+        :return: An iterator over the chunks, each yielded as soon as it is complete.
+        """
+        raise NotImplementedError("This method should be overridden")
+
+    def process_document(self, doc: Any, use_cache: bool = True) -> str:
         """
 
         :param doc: The document to be processed.
+        :param use_cache: Whether a cached result for the same document may be reused.
         :return: The result of processing the document.
 
         """
         raise NotImplementedError("This method should be overridden")
+
+    def summarize_texts(self, texts: List[str], use_cache: bool = True) -> str:
+        """
+        Summarize several texts into a single summary.
+
+        :param texts: The texts to be summarized together, in order.
+        :param use_cache: Whether a cached summary of the same texts may be reused.
+        :return: The summary.
+        """
+        raise NotImplementedError("This method should be overridden")
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Count the model tokens of a text.
+
+        :param text: The text to be measured.
+        :return: The number of tokens.
+        """
+        raise NotImplementedError("This method should be overridden")
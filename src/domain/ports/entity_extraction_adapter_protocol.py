@@ -1,6 +1,6 @@
 # src/domain/ports/entity_extraction_adapter_protocol.py
 
-from typing import Dict, Any, Protocol
+from typing import Dict, Any, Protocol, Iterator, Tuple
 
 
 class EntityExtractionAdapterProtocol(Protocol):
@@ -10,20 +10,36 @@ class EntityExtractionAdapterProtocol(Protocol):
     Protocol that defines the interface for extracting entities and relationships from a diagram content.
 
     Methods:
-        extract_entities_and_relationships(diagram_content: str) -> Dict[str, Any]
+        extract_entities_and_relationships(diagram_content: str, use_cache: bool = True) -> Dict[str, Any]
             Extracts entities and relationships from the given diagram content.
 
     Parameters:
         - diagram_content (str): The content of the diagram to be processed.
+        - use_cache (bool): Whether a cached extraction of the same content may be reused.
+
+        stream_entities_and_relationships(diagram_content: str, use_cache: bool = True) -> Iterator[Tuple[str, Dict]]
+            Yields ("entity", ...) and ("relationship", ...) records as soon as they are extracted.
 
     Returns:
         - Dict[str, Any]: A dictionary containing the extracted entities and relationships.
     """
-    def extract_entities_and_relationships(self, diagram_content: str) -> Dict[str, Any]:
+    def extract_entities_and_relationships(self, diagram_content: str, use_cache: bool = True) -> Dict[str, Any]:
         """
         Extracts entities and relationships from diagram content.
 
         :param diagram_content: The content of the diagram.
+        :param use_cache: Whether a cached extraction of the same content may be reused.
         :return: A dictionary containing the extracted entities and relationships.
         """
         ...
+
+    def stream_entities_and_relationships(self, diagram_content: str,
+                                          use_cache: bool = True) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Extracts entities and relationships from diagram content, record by record.
+
+        :param diagram_content: The content of the diagram.
+        :param use_cache: Whether a cached extraction of the same content may be reused.
+        :return: An iterator of ("entity", entity) and ("relationship", relationship) tuples.
+        """
+        ...
@@ -26,11 +26,24 @@ class Neo4jPersistenceAdapterProtocol(Protocol):
         :rtype: bool
         """
     
+    def get_session(self):
+        """
+        Opens a session on the Neo4j database.
+
+        :return: A session, or None when Neo4j is not connected or its circuit breaker is open.
+        """
+    
     def ensure_vector_index(self) -> None:
         """
         Ensures that the vector index is created in the Neo4j database.
         """
     
+    def unit_of_work(self):
+        """
+        Returns a unit of work collecting graph mutations (project, diagram, entities, embeddings, relationships,
+        similarities) that are written in a single transaction by its commit method.
+        """
+    
     def create_or_update_project(self, project_name: str, project_type: str) -> None:
         """
         Creates or updates a project in the Neo4j database.
@@ -62,6 +75,31 @@ class Neo4jPersistenceAdapterProtocol(Protocol):
         :return: A list of dictionaries representing entities.
         """
     
+    def get_entity_matrix(self, project_name: str = None, exclude_diagram_type: str = None, reserve: int = 0):
+        """
+        Retrieves entities for similarity calculation as an EntityMatrix, with float32 embeddings.
+
+        :param project_name: Optional. The name of the project to filter entities.
+        :param exclude_diagram_type: Optional. A diagram type whose entities are left out.
+        :param reserve: Rows preallocated for entities appended afterwards.
+        :return: The entities in columnar form.
+        """
+    
+    def get_similarity_fingerprints(self, project_name: str, diagram_type: str) -> Dict[str, str]:
+        """
+        Retrieves the similarity fingerprints of the entities of a diagram that have an embedding.
+
+        :return: Fingerprints (None when not computed yet) by entity id.
+        """
+    
+    def get_diagram_state(self, project_name: str, diagram_type: str) -> Dict[str, Any]:
+        """
+        Retrieves the stored entities (properties without embedding, linked keywords) and relationships of a diagram.
+
+        :return: A dictionary with 'exists' (whether the diagram node exists), 'entities' by graph id and
+                 'relationships' as source name, type and target name.
+        """
+    
     def rollback(self, project_name: str) -> None:
         """
         Rolls back changes for a specific project in the Neo4j database.
@@ -4,11 +4,12 @@ from typing import List, Tuple, Optional, Protocol
 
 
 class RAGAdapterProtocol(Protocol):
-    def hybrid_search_with_fallback(self, query: str, semantic_top_k: int , graph_depth: int ) -> List[Tuple[str, str]]:
+    def hybrid_search_with_fallback(self, query: str, semantic_top_k: int, graph_depth: int,
+                                    with_scores: bool = False) -> List[Tuple]:
         ...
     
-    def rag_pipeline(self, content: str, prompt_template: str) -> Tuple[Optional[str], bool]:
+    def rag_pipeline(self, content: str, prompt_template: str, use_cache: bool = True) -> Tuple[Optional[str], bool]:
         ...
     
-    def fallback_generation(self, prompt_template: str, content: str) -> str:
+    def fallback_generation(self, prompt_template: str, content: str, use_cache: bool = True) -> str:
         ...
\ No newline at end of file
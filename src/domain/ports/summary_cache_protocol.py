@@ -0,0 +1,29 @@
+# src/domain/ports/summary_cache_protocol.py
+
+from typing import Optional, Protocol
+
+
+class SummaryCacheProtocol(Protocol):
+    """
+    Protocol for summary caches.
+
+    Summaries are stored under content-addressed keys: whole documents by the hash of their file, chunks by the hash
+    of their text, so that an edited document only needs its changed chunks to be summarized again.
+
+    Methods:
+    - document_key(file_path: str) -> str: Returns the key of the summary of a document file.
+    - chunk_key(text: str) -> str: Returns the key of the summary of a chunk of text.
+    - get(key: str) -> Optional[str]: Returns a cached summary, or None.
+    - set(key: str, summary: str) -> None: Stores a summary.
+    """
+    def document_key(self, file_path: str) -> str:
+        ...
+
+    def chunk_key(self, text: str) -> str:
+        ...
+
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    def set(self, key: str, summary: str) -> None:
+        ...
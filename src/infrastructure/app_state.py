@@ -6,6 +6,7 @@ from src.application.factories.embedding_service_factory import EmbeddingService
 from src.application.factories.similarity_service_factory import SimilarityServiceFactory
 from src.infrastructure.config import config
 from src.adapters.persistence.neo4j_persistence_adapter import Neo4jPersistenceAdapter
+from src.adapters.persistence.async_neo4j_persistence_adapter import AsyncNeo4jPersistenceAdapter
 from src.adapters.web.rag_adapter import RAGAdapter
 from src.application.services.project_management_service import ProjectManagementService
 from src.application.services.similarity_processing_service import SimilarityService
@@ -18,6 +19,7 @@ class AppState:
         self.config = config
         self._project_manager = None
         self._neo4j_adapter = None
+        self._async_neo4j_adapter = None
         self._embedding_adapter = None
         self._rag_adapter = None
         self._similarity_service = None
@@ -35,6 +37,13 @@ class AppState:
             self._neo4j_adapter = Neo4jPersistenceAdapter()
         return self._neo4j_adapter
     
+    @cached_property
+    def async_neo4j_adapter(self):
+        # Request path: does not block the event loop (Celery workers use neo4j_adapter)
+        if not self._async_neo4j_adapter:
+            self._async_neo4j_adapter = AsyncNeo4jPersistenceAdapter()
+        return self._async_neo4j_adapter
+    
     @cached_property
     def embedding_adapter(self):
         if not self._embedding_adapter:
@@ -66,9 +75,14 @@ class AppState:
         if self._neo4j_adapter:
             self._neo4j_adapter.close_neo4j()
     
+    async def close_async_neo4j(self):
+        if self._async_neo4j_adapter:
+            await self._async_neo4j_adapter.close_neo4j()
+    
     def get_service_status(self):
         return {
             "neo4j_adapter": self.neo4j_adapter.is_connected() if self._neo4j_adapter else False,
+            "neo4j_health": self.neo4j_adapter.health.state() if self._neo4j_adapter else None,
             "project_manager": self._project_manager is not None,
             "embedding_adapter": self._embedding_adapter is not None,
             "rag_adapter": self._rag_adapter is not None,
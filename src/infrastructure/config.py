@@ -62,9 +62,36 @@ class ProjectConfig:
     def get_text_splitter_config(self) -> Dict[str, int]:
         return self.yaml_config.get("text_splitter", {})
     
-    def get_similarity_config(self) -> Dict[str, float]:
+    def get_processing_config(self) -> Dict[str, Any]:
+        return self.yaml_config.get("processing", {})
+    
+    def get_similarity_config(self) -> Dict[str, Any]:
         return self.yaml_config.get("similarity", {})
     
+    def get_embedding_config(self) -> Dict[str, Any]:
+        return self.yaml_config.get("embedding", {})
+    
+    def get_embedding_cache_config(self) -> Dict[str, Any]:
+        return self.yaml_config.get("embedding_cache", {})
+    
+    def get_completion_cache_config(self) -> Dict[str, Any]:
+        return self.yaml_config.get("completion_cache", {})
+    
+    def get_summarization_config(self) -> Dict[str, Any]:
+        return self.yaml_config.get("summarization", {})
+    
+    def get_summary_cache_config(self) -> Dict[str, Any]:
+        return self.yaml_config.get("summary_cache", {})
+    
+    def get_entity_extraction_config(self) -> Dict[str, Any]:
+        return self.yaml_config.get("entity_extraction", {})
+    
+    def get_neo4j_config(self) -> Dict[str, Any]:
+        return self.yaml_config.get("neo4j", {})
+    
+    def get_rag_config(self) -> Dict[str, Any]:
+        return self.yaml_config.get("rag", {})
+    
     def get_celery_config(self) -> Dict[str, Any]:
         return self.yaml_config.get("celery", {})
     
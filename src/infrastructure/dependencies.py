@@ -16,6 +16,10 @@ def get_neo4j_adapter():
     return app_state.neo4j_adapter
 
 
+def get_async_neo4j_adapter():
+    return app_state.async_neo4j_adapter
+
+
 def get_embedding_adapter():
     return app_state.embedding_adapter
 
@@ -0,0 +1,134 @@
+from src.application.services.graph_diff import StoredIdAssigner, assign_stored_ids, diff_diagram
+from src.domain.models.entity import build_entity_id
+
+PROJECT = "p"
+DIAGRAM = "UC"
+
+
+class _Graph:
+    """In-memory diagram applying the statements of the unit of work, with entities matched like in Cypher."""
+
+    def __init__(self):
+        self.nodes = {}
+        self.edges = set()
+
+    def _ids_named(self, name):
+        return [node_id for node_id, node in self.nodes.items() if node['name'] == name]
+
+    def state(self):
+        return {
+            'exists': bool(self.nodes),
+            'entities': {node_id: {'id': node_id, 'properties': dict(node), 'keywords': node.get('keywords', []),
+                                   'has_embedding': True} for node_id, node in self.nodes.items()},
+            'relationships': [{'source': self.nodes[source]['name'], 'type': rel_type,
+                               'target': self.nodes[target]['name']} for source, rel_type, target in self.edges]
+        }
+
+    def named_edges(self):
+        return {(self.nodes[source]['name'], rel_type, self.nodes[target]['name'])
+                for source, rel_type, target in self.edges}
+
+    def apply(self, diff):
+        for relationship in diff.deleted_relationships:
+            self.edges = {(source, rel_type, target) for source, rel_type, target in self.edges
+                          if not (self.nodes[source]['name'] == relationship['source']
+                                  and rel_type == relationship['type']
+                                  and self.nodes[target]['name'] == relationship['target'])}
+        for node_id in diff.deleted_ids:
+            del self.nodes[node_id]
+            self.edges = {edge for edge in self.edges if node_id not in (edge[0], edge[2])}
+        for entity in diff.created + diff.updated:
+            self.nodes.setdefault(build_entity_id(PROJECT, DIAGRAM, entity['id']), {}).update(entity)
+        for relationship in diff.created_relationships:
+            for source in self._ids_named(relationship['source']):
+                for target in self._ids_named(relationship['target']):
+                    self.edges.add((source, relationship['type'], target))
+
+
+def _entity(name, description="", entity_type="actor"):
+    return {'name': name, 'type': entity_type, 'description': description, 'keywords': []}
+
+
+def _relationship(source, target):
+    return {'source': source, 'type': 'USES', 'target': target}
+
+
+def _sync(graph, entities, relationships):
+    entities = [{**entity, 'id': f"{DIAGRAM}_{index}"} for index, entity in enumerate(entities)]
+    stored = graph.state()
+    entities = assign_stored_ids(PROJECT, DIAGRAM, stored, entities)
+    diff = diff_diagram(PROJECT, DIAGRAM, stored, entities, relationships)
+    graph.apply(diff)
+    return diff
+
+
+def test_insertion_keeps_existing_entities_and_relationships():
+    graph = _Graph()
+    _sync(graph, [_entity("A"), _entity("B")], [_relationship("A", "B")])
+
+    diff = _sync(graph, [_entity("C"), _entity("A"), _entity("B")], [_relationship("A", "B")])
+
+    assert [entity['name'] for entity in diff.created] == ["C"]
+    assert diff.updated == [] and diff.deleted_ids == []
+    assert graph.named_edges() == {("A", "USES", "B")}
+    assert sorted(node['name'] for node in graph.nodes.values()) == ["A", "B", "C"]
+
+
+def test_removal_keeps_relationships_of_remaining_entities():
+    graph = _Graph()
+    _sync(graph, [_entity("A"), _entity("B"), _entity("C")], [_relationship("A", "B"), _relationship("B", "C")])
+
+    diff = _sync(graph, [_entity("B"), _entity("C")], [_relationship("B", "C")])
+
+    assert diff.created == [] and diff.updated == []
+    assert len(diff.deleted_ids) == 1
+    assert graph.named_edges() == {("B", "USES", "C")}
+    assert sorted(node['name'] for node in graph.nodes.values()) == ["B", "C"]
+
+
+def test_updated_entity_keeps_its_id():
+    graph = _Graph()
+    _sync(graph, [_entity("A"), _entity("B")], [])
+
+    diff = _sync(graph, [_entity("B", "new description"), _entity("A")], [])
+
+    assert [entity['name'] for entity in diff.updated] == ["B"]
+    assert diff.updated[0]['id'] == f"{DIAGRAM}_1"
+    assert diff.created == [] and diff.deleted_ids == []
+
+
+def test_type_change_recreates_relationships_of_the_name():
+    graph = _Graph()
+    _sync(graph, [_entity("A"), _entity("B")], [_relationship("A", "B")])
+
+    diff = _sync(graph, [_entity("A", entity_type="system"), _entity("B")], [_relationship("A", "B")])
+
+    assert [entity['id'] for entity in diff.created] == [f"{DIAGRAM}_2"]
+    assert diff.created_relationships == [{'source': "A", 'type': "USES", 'target': "B"}]
+    assert graph.named_edges() == {("A", "USES", "B")}
+    assert graph.nodes[build_entity_id(PROJECT, DIAGRAM, f"{DIAGRAM}_2")]['type'] == "system"
+
+
+def test_unchanged_diagram_has_no_writes():
+    graph = _Graph()
+    entities = [_entity("A"), _entity("B")]
+    _sync(graph, entities, [_relationship("A", "B")])
+
+    diff = _sync(graph, entities, [_relationship("A", "B")])
+
+    assert diff.summary() == {'created': 0, 'updated': 0, 'deleted': 0, 'unlinked_keywords': 0,
+                              'created_relationships': 0, 'deleted_relationships': 0}
+
+
+def test_batched_assignment_gives_the_ids_of_a_single_call():
+    graph = _Graph()
+    _sync(graph, [_entity("A"), _entity("B"), _entity("A", entity_type="system")], [])
+    stored = graph.state()
+    entities = [{**entity, 'id': f"{DIAGRAM}_{index}"} for index, entity in enumerate(
+        [_entity("C"), _entity("A"), _entity("D"), _entity("B"), _entity("A"), _entity("E")])]
+
+    assigner = StoredIdAssigner(PROJECT, DIAGRAM, stored)
+    batched = [entity for start in range(0, len(entities), 2) for entity in assigner.assign(entities[start:start + 2])]
+
+    assert batched == assign_stored_ids(PROJECT, DIAGRAM, stored, entities)
+    assert len({entity['id'] for entity in batched}) == len(batched)
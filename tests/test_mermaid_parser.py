@@ -0,0 +1,38 @@
+import pytest
+
+from src.adapters.parsing.mermaid_parser import parse_mermaid
+
+
+def _flowchart(*statements):
+    result = parse_mermaid("\n".join(("flowchart LR",) + statements))
+    names = sorted(entity['name'] for entity in result['entities'])
+    edges = [(r['source'], r['type'], r['target']) for r in result['relationships']]
+    return names, edges
+
+
+@pytest.mark.parametrize("statement", ["A-->B", "A --> B", "A---B", "A-.->B", "A -.-> B", "A==>B", "A ==> B"])
+def test_unlabelled_links(statement):
+    assert _flowchart(statement) == (["A", "B"], [("A", "link", "B")])
+
+
+@pytest.mark.parametrize("statement", ["A-->|yes|B", "A -->|yes| B", "A-- yes -->B", "A -- yes --> B",
+                                       "A-. yes .->B", "A== yes ==>B", "A==>|yes|B"])
+def test_labelled_links(statement):
+    assert _flowchart(statement) == (["A", "B"], [("A", "yes", "B")])
+
+
+def test_dashed_identifiers_are_kept():
+    names, edges = _flowchart("Client-->Server", "order-service-->payment-db[(Paiements)]")
+
+    assert names == ["Client", "Server", "order-service", "payment-db"]
+    assert edges == [("Client", "link", "Server"), ("order-service", "link", "payment-db")]
+
+
+def test_shaped_nodes_and_chains():
+    result = parse_mermaid("flowchart LR\n    u((Utilisateur))-->|passe|c([Commander])-.->p[Payer]")
+
+    entities = {entity['name']: entity for entity in result['entities']}
+    assert entities['u']['type'] == "actor" and entities['u']['description'] == "Utilisateur"
+    assert entities['c']['type'] == "useCase" and entities['c']['description'] == "Commander"
+    assert [(r['source'], r['type'], r['target']) for r in result['relationships']] == [
+        ("u", "passe", "c"), ("c", "link", "p")]
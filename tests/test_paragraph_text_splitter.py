@@ -0,0 +1,50 @@
+import random
+
+from src.adapters.web.paragraph_text_splitter import ParagraphTextSplitter
+from src.adapters.web.token_text_splitter import TiktokenTextSplitter
+from tests.test_token_text_splitter import _ByteEncoding
+
+
+def _splitter(chunk_size=200):
+    return ParagraphTextSplitter(TiktokenTextSplitter(_ByteEncoding(), chunk_size, 10), len, chunk_size)
+
+
+def _paragraphs(count, seed=7):
+    words = ["système", "capteur", "broyeur", "données", "alarme", "moteur", "vitesse", "opérateur", "seuil"]
+    generator = random.Random(seed)
+    return [" ".join(generator.choice(words) for _ in range(generator.randint(3, 15))) + "." for _ in range(count)]
+
+
+def test_chunks_are_whole_paragraphs_within_chunk_size():
+    paragraphs = _paragraphs(120)
+    chunks = _splitter().split_text("\n".join(paragraphs))
+
+    assert len(chunks) > 5
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert "\n".join(chunks).split("\n") == paragraphs
+
+
+def test_insertion_only_changes_the_chunk_that_holds_it():
+    paragraphs = _paragraphs(120)
+    before = _splitter().split_text("\n".join(paragraphs))
+    after = _splitter().split_text("\n".join(paragraphs[:60] + ["Le broyeur s'arrête si la vitesse chute."]
+                                             + paragraphs[60:]))
+
+    changed = set(after) - set(before)
+    assert len(changed) <= 2
+    assert len(set(before) - set(after)) <= 2
+    assert after[-len(before) // 3:] == before[-len(before) // 3:]
+
+
+def test_headings_start_a_chunk():
+    chunks = _splitter().split_text("Introduction.\n# Exigences\nLe système doit alerter.\n2.1 Sécurité\nArrêt.")
+
+    assert [chunk.split("\n")[0] for chunk in chunks][1:] == ["# Exigences", "2.1 Sécurité"]
+
+
+def test_long_paragraphs_are_cut_into_windows():
+    long_paragraph = " ".join(_paragraphs(40))
+    chunks = _splitter(100).split_text(f"Avant.\n{long_paragraph}\nAprès.")
+
+    assert chunks[0] == "Avant." and chunks[-1] == "Après."
+    assert len(chunks) > 3 and all(len(chunk) <= 100 for chunk in chunks[1:-1])
@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+
+from src.application.services.entity_ann_index import EntityANNIndex
+from src.application.services.similarity_engine import SimilarityEngine
+from src.domain.models.entity_matrix import EntityMatrix
+
+EMBEDDING_WEIGHT = 0.7
+KEYWORD_WEIGHT = 0.3
+
+
+def _pairwise_similarities(entities, threshold):
+    """Reference implementation: the pairwise loop the engine replaced."""
+    similarities = []
+    for i, entity1 in enumerate(entities):
+        for entity2 in entities[i + 1:]:
+            if entity1['id'] == entity2['id']:
+                continue
+            v1, v2 = entity1['embedding'], entity2['embedding']
+            embedding_similarity = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
+            set1, set2 = _contextual_set(entity1), _contextual_set(entity2)
+            jaccard_similarity = len(set1 & set2) / len(set1 | set2)
+            combined_similarity = (EMBEDDING_WEIGHT * embedding_similarity + KEYWORD_WEIGHT * jaccard_similarity) / (
+                    EMBEDDING_WEIGHT + KEYWORD_WEIGHT)
+            if combined_similarity > threshold:
+                similarities.append({
+                    'id1': entity1['id'],
+                    'id2': entity2['id'],
+                    'combined_similarity': combined_similarity,
+                    'embedding_similarity': embedding_similarity,
+                    'jaccard_similarity': jaccard_similarity
+                })
+    return similarities
+
+
+def _contextual_set(entity):
+    return ({f"project:{entity['project_name']}", f"diagram:{entity['diagram_type']}", f"entity:{entity['name']}"}
+            | {f"keyword:{kw}" for kw in entity['keywords']})
+
+
+def _entities(count, dimension=16, seed=0):
+    rng = np.random.default_rng(seed)
+    # A few clusters so that some pairs pass the threshold
+    centers = rng.normal(size=(4, dimension))
+    vocabulary = [f"kw{i}" for i in range(12)]
+    return [{
+        'id': f"p_{index % 3}_{index}",
+        'name': f"entity{index % 7}",
+        'project_name': "p",
+        'diagram_type': ["UC", "CLASS", "SEQ"][index % 3],
+        'keywords': list(rng.choice(vocabulary, size=rng.integers(0, 5), replace=False)),
+        'embedding': (centers[index % 4] + 0.3 * rng.normal(size=dimension)).tolist()
+    } for index in range(count)]
+
+
+def _by_pair(similarities):
+    return {(s['id1'], s['id2']): s for s in similarities}
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 512])
+def test_engine_matches_pairwise_formula(block_size):
+    entities = _entities(60)
+    threshold = 0.5
+    engine = SimilarityEngine(EMBEDDING_WEIGHT, KEYWORD_WEIGHT, threshold, block_size)
+
+    expected = _by_pair(_pairwise_similarities(entities, threshold))
+    actual = _by_pair(engine.calculate_similarities(EntityMatrix.from_entities(entities)))
+
+    assert expected
+    assert actual.keys() == expected.keys()
+    for pair, similarity in expected.items():
+        for key in ('combined_similarity', 'embedding_similarity', 'jaccard_similarity'):
+            assert actual[pair][key] == pytest.approx(similarity[key], abs=1e-12)
+
+
+def test_float32_matrix_matches_pairwise_formula():
+    entities = _entities(40, seed=1)
+    threshold = 0.5
+    matrix = EntityMatrix.allocate(4)
+    for entity in entities:
+        matrix.append(entity)
+
+    expected = _by_pair(_pairwise_similarities(entities, threshold))
+    actual = _by_pair(SimilarityEngine(EMBEDDING_WEIGHT, KEYWORD_WEIGHT, threshold).calculate_similarities(matrix))
+
+    assert matrix.vectors.dtype == np.float32
+    assert actual.keys() == expected.keys()
+    for pair, similarity in expected.items():
+        assert actual[pair]['combined_similarity'] == pytest.approx(similarity['combined_similarity'], abs=1e-6)
+
+
+def test_row_similarities_cover_every_pair_of_the_rows():
+    entities = _entities(30, seed=2)
+    engine = SimilarityEngine(EMBEDDING_WEIGHT, KEYWORD_WEIGHT, 0.5, block_size=4)
+    matrix = EntityMatrix.from_entities(entities)
+    rows = np.array([3, 0, 17, 3])
+
+    changed_ids = {entities[row]['id'] for row in rows.tolist()}
+    expected = {pair for pair in _by_pair(_pairwise_similarities(entities, 0.5))
+                if pair[0] in changed_ids or pair[1] in changed_ids}
+    actual = [(s['id1'], s['id2']) for s in engine.calculate_row_similarities(matrix, rows)]
+
+    assert len(actual) == len(set(actual))
+    assert set(actual) == expected
+
+
+def test_candidate_similarities_of_rows_match_row_similarities_with_an_exhaustive_index():
+    entities = _entities(40, seed=4)
+    engine = SimilarityEngine(EMBEDDING_WEIGHT, KEYWORD_WEIGHT, 0.5)
+    matrix = EntityMatrix.from_entities(entities)
+    rows = np.array([5, 1, 33])
+
+    expected = _by_pair(engine.calculate_row_similarities(matrix, rows))
+    # Probing every list with top_k above the corpus size is an exact search
+    index = EntityANNIndex(n_lists=4, n_probe=4)
+    actual = _by_pair(engine.calculate_candidate_similarities(matrix, index, top_k=len(entities), rows=rows))
+
+    assert expected
+    assert actual.keys() == expected.keys()
+
+
+def test_invalid_embeddings_are_skipped():
+    entities = _entities(5, seed=3)
+    entities[0]['embedding'] = [0.0] * 16
+    entities[1]['embedding'] = [1.0] * 8
+    engine = SimilarityEngine(EMBEDDING_WEIGHT, KEYWORD_WEIGHT, -1.0)
+
+    ids = {entities[0]['id'], entities[1]['id']}
+    similarities = engine.calculate_similarities(EntityMatrix.from_entities(entities))
+
+    assert len(similarities) == 3
+    assert not any(s['id1'] in ids or s['id2'] in ids for s in similarities)
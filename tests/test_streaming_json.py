@@ -0,0 +1,50 @@
+import json
+
+from src.adapters.parsing.streaming_json import ExtractionStreamParser
+
+COMPLETION = json.dumps({
+    "entities": [
+        {"name": "Client", "type": "actor", "description": "Passe une commande {urgente}", "keywords": ["client"]},
+        {"name": "Commande", "type": "class", "description": "Contient des \"lignes\"", "keywords": []}
+    ],
+    "relationships": [
+        {"source": "Client", "type": "places", "target": "Commande"}
+    ]
+}, ensure_ascii=False)
+
+
+def _parse(chunks):
+    parser = ExtractionStreamParser()
+    records = []
+    for chunk in chunks:
+        records.extend(parser.feed(chunk))
+    return records
+
+
+def test_records_are_independent_of_chunk_boundaries():
+    expected = _parse([COMPLETION])
+
+    assert [kind for kind, _ in expected] == ["entity", "entity", "relationship"]
+    assert expected[1][1]["description"] == 'Contient des "lignes"'
+    assert _parse(COMPLETION) == expected
+    assert _parse([COMPLETION[i:i + 7] for i in range(0, len(COMPLETION), 7)]) == expected
+
+
+def test_truncated_completion_yields_its_complete_records():
+    cut = COMPLETION.index('"Commande", "type"') + 5
+    records = _parse([COMPLETION[:cut]])
+
+    assert records == [("entity", json.loads(COMPLETION)["entities"][0])]
+
+
+def test_text_around_the_json_object_is_ignored():
+    records = _parse(["Voici le résultat :\n```json\n", COMPLETION, "\n```\nJ'espère que cela aide {"])
+
+    assert len(records) == 3
+    assert records[2] == ("relationship", {"source": "Client", "type": "places", "target": "Commande"})
+
+
+def test_nested_objects_of_other_keys_are_not_records():
+    completion = '{"metadata": {"entities": [{"name": "x"}]}, "entities": [{"name": "y", "attributes": {"a": 1}}]}'
+
+    assert _parse([completion]) == [("entity", {"name": "y", "attributes": {"a": 1}})]
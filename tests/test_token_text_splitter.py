@@ -0,0 +1,38 @@
+import pytest
+
+from src.adapters.web.token_text_splitter import TiktokenTextSplitter
+
+
+class _ByteEncoding:
+    """One token per UTF-8 byte: every multi-byte character is split across tokens, like rare cl100k characters."""
+
+    @staticmethod
+    def encode(text, disallowed_special=()):
+        return list(text.encode("utf-8"))
+
+    @staticmethod
+    def decode_tokens_bytes(tokens):
+        return [bytes([token]) for token in tokens]
+
+
+TEXT = "Le système gère la sécurité des données — café, crème brûlée et 🚀 fusée."
+
+
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(5, 0), (7, 2), (16, 4), (200, 10)])
+def test_chunks_never_split_a_character(chunk_size, chunk_overlap):
+    chunks = TiktokenTextSplitter(_ByteEncoding(), chunk_size, chunk_overlap).split_text(TEXT)
+
+    assert chunks
+    assert not any("�" in chunk for chunk in chunks)
+    assert all(chunk in TEXT for chunk in chunks)
+
+
+def test_chunks_cover_the_text_without_overlap():
+    chunks = TiktokenTextSplitter(_ByteEncoding(), 9, 0).split_text(TEXT)
+
+    assert "".join(chunks).replace(" ", "") == TEXT.replace(" ", "")
+
+
+def test_overlap_must_be_smaller_than_chunk_size():
+    with pytest.raises(ValueError):
+        TiktokenTextSplitter(_ByteEncoding(), 10, 10)